@@ -0,0 +1,312 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from os import makedirs
+from os.path import join, dirname
+import numpy as np
+import pandas as pd
+
+from value_assessment.core.opex import Opex
+from value_assessment.core.capex import Capex
+from value_assessment.core.value_blocks.manufacturer_VB import ManufacturerVB
+from value_assessment.core.toolbox.IRR import IRR
+from value_assessment.core.toolbox.data_pack import open_usecase_data
+from value_assessment.benchmarks.import_time import measure_import, DISCIPLINE_MODULES
+from value_assessment.benchmarks.generators import generate_opex_inputs, generate_capex_inputs, \
+    generate_manufacturer_inputs, generate_cashflow
+
+RESULTS_DIR = join(dirname(__file__), 'results')
+
+# size of the synthetic inputs of each scale
+SCALES = {
+    'tiny': {'nb_products': 1, 'nb_years': 15, 'nb_opex_components': 3, 'nb_capex_categories': 2,
+             'nb_lc_segments': 1, 'quantity_per_year': 10},
+    'small': {'nb_products': 2, 'nb_years': 30, 'nb_opex_components': 5, 'nb_capex_categories': 2,
+              'nb_lc_segments': 2, 'quantity_per_year': 50},
+    'medium': {'nb_products': 10, 'nb_years': 60, 'nb_opex_components': 50, 'nb_capex_categories': 10,
+               'nb_lc_segments': 5, 'quantity_per_year': 1000},
+    'large': {'nb_products': 50, 'nb_years': 120, 'nb_opex_components': 500, 'nb_capex_categories': 50,
+              'nb_lc_segments': 10, 'quantity_per_year': 50000},
+}
+
+
+def get_git_commit():
+    """
+    Commit of the repository the suite is run from, None if git is not available
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=dirname(__file__), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkSuite():
+    '''
+    Timings of the value assessment hot paths on synthetic inputs of a given scale
+
+    Each case has a setup building the inputs of all products, which is not timed, and a run timed repeat times
+    '''
+
+    def __init__(self, scale='medium', repeat=5, periods_per_year=1):
+        """
+        Init of the BenchmarkSuite class
+        ::params:: scale : name of the scale of the inputs in SCALES
+        ::params:: repeat : number of timed runs of each case
+        ::params:: periods_per_year : number of periods in a year of the model cases, 4 for quarterly inputs
+        """
+        if scale not in SCALES:
+            raise Exception(
+                f'Unknown benchmark scale {scale}, available scales are {list(SCALES.keys())}')
+
+        self.scale = scale
+        self.params = dict(SCALES[scale], periods_per_year=periods_per_year)
+        self.repeat = repeat
+
+        self.cases = {
+            'Opex.compute_opex_by_category': (self.setup_opex, self.run_opex),
+            'Capex.compute_capex_by_category': (self.setup_capex, self.run_capex),
+            'ManufacturerVB.compute_cashflow': (self.setup_manufacturer, self.run_manufacturer),
+            'IRR.compute_irr': (self.setup_irr, self.run_irr),
+            'usecase_RATATOUILLE': (self.setup_usecase, self.run_usecase),
+            'grid search 1 process': (self.setup_grid_search, self.run_grid_search_serial),
+            'grid search 4 processes': (self.setup_grid_search, self.run_grid_search_parallel),
+            'grid search multiplier sweep': (self.setup_grid_search, self.run_grid_search_sweep),
+            'worker startup': (self.setup_worker, self.run_worker),
+        }
+
+    def setup_opex(self):
+        setups = []
+        for seed in range(self.params['nb_products']):
+            model_args, compute_args = generate_opex_inputs(self.params['nb_years'], self.params['nb_opex_components'],
+                                                            self.params['nb_lc_segments'],
+                                                            self.params['quantity_per_year'], seed=seed,
+                                                            periods_per_year=self.params['periods_per_year'])
+            setups.append((Opex(**model_args), compute_args))
+
+        return setups
+
+    def run_opex(self, setups):
+        for opex_model, compute_args in setups:
+            opex_model.compute_opex_by_category(**compute_args)
+
+    def setup_capex(self):
+        setups = []
+        for seed in range(self.params['nb_products']):
+            model_args, compute_args = generate_capex_inputs(self.params['nb_years'], self.params['nb_capex_categories'],
+                                                             seed=seed,
+                                                             periods_per_year=self.params['periods_per_year'])
+            setups.append((Capex(**model_args), compute_args))
+
+        return setups
+
+    def run_capex(self, setups):
+        for capex_model, compute_args in setups:
+            capex_model.compute_capex_by_category(**compute_args)
+
+    def setup_manufacturer(self):
+        value_blocks = []
+        for seed in range(self.params['nb_products']):
+            model_args, data_args = generate_manufacturer_inputs(self.params['nb_years'], self.params['nb_opex_components'],
+                                                                 self.params['nb_capex_categories'],
+                                                                 self.params['quantity_per_year'], seed=seed,
+                                                                 periods_per_year=self.params['periods_per_year'])
+            value_block = ManufacturerVB(**model_args)
+            value_block.configure_data(**data_args)
+            value_blocks.append(value_block)
+
+        return value_blocks
+
+    def run_manufacturer(self, value_blocks):
+        for value_block in value_blocks:
+            value_block.compute_cashflow()
+
+    def setup_irr(self):
+        return [IRR(generate_cashflow(self.params['nb_years'], seed=seed,
+                                      periods_per_year=self.params['periods_per_year']))
+                for seed in range(self.params['nb_products'])]
+
+    def run_irr(self, irr_models):
+        for irr_model in irr_models:
+            irr_model.compute_irr()
+
+    def setup_usecase(self):
+        """
+        Study of the usecase with its data loaded, the execution engine is needed
+        """
+        from value_assessment.sos_processes.generic_value_assessment.usecase_RATATOUILLE import Study
+
+        study = Study()
+        study.load_data()
+
+        return study
+
+    def run_usecase(self, study):
+        study.run()
+
+    def setup_grid_search(self):
+        """
+        Offline grid search of the grid search sensitivity process data, the execution engine is needed
+        """
+        from value_assessment.sos_processes.generic_value_assessment_grid_search_sensitivity import parallel_grid_search
+
+        usecase_data = open_usecase_data(
+            join(dirname(parallel_grid_search.__file__), 'data'))
+
+        return parallel_grid_search, usecase_data.get_table('design_space'), usecase_data.get_table('eval_outputs')
+
+    def run_grid_search_serial(self, grid_search):
+        module, design_space, eval_outputs = grid_search
+        module.run_parallel_grid_search(design_space, eval_outputs, n_processes=1,
+                                        use_multiplier_sweep=False)
+
+    def run_grid_search_parallel(self, grid_search):
+        module, design_space, eval_outputs = grid_search
+        module.run_parallel_grid_search(design_space, eval_outputs, n_processes=4,
+                                        use_multiplier_sweep=False)
+
+    def run_grid_search_sweep(self, grid_search):
+        module, design_space, eval_outputs = grid_search
+        module.run_parallel_grid_search(design_space, eval_outputs)
+
+    def setup_worker(self):
+        return DISCIPLINE_MODULES
+
+    def run_worker(self, modules):
+        """
+        New python process importing the disciplines, as a computing worker does
+        """
+        measure_import(modules)
+
+    def run_case(self, name):
+        """
+        Time the case name, returns its result dict
+        """
+        setup, run = self.cases[name]
+        result = {'name': name, 'scale': self.scale, 'params': self.params}
+
+        times = []
+        try:
+            for _ in range(self.repeat):
+                setup_data = setup()
+                start = time.perf_counter()
+                run(setup_data)
+                times.append(time.perf_counter() - start)
+        except ImportError as error:
+            # cases needing packages that are not installed are skipped
+            result.update({'status': 'skipped', 'message': str(error)})
+            return result
+
+        result.update({'status': 'ok', 'times': times, 'min': min(times),
+                       'median': float(np.median(times)), 'mean': float(np.mean(times))})
+
+        return result
+
+    def run(self, case_names=None):
+        """
+        Run the cases case_names, all cases if None
+        Returns the dict of the results, with the metadata of the run
+        """
+        if case_names is None:
+            case_names = list(self.cases.keys())
+
+        return {'metadata': {'commit': get_git_commit(),
+                             'date': datetime.now().isoformat(timespec='seconds'),
+                             'python': platform.python_version(),
+                             'numpy': np.__version__,
+                             'pandas': pd.__version__,
+                             'machine': platform.machine(),
+                             'scale': self.scale,
+                             'periods_per_year': self.params['periods_per_year'],
+                             'repeat': self.repeat},
+                'results': [self.run_case(name) for name in case_names]}
+
+
+def save_results(results, path):
+    makedirs(dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+
+
+def load_results(path):
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def compare_results(baseline, current, tolerance=0.2):
+    """
+    Compare the minimum times of the cases run in both baseline and current results
+    A case is a regression if its time increased by more than tolerance (relative)
+    Returns a list of dicts (name, baseline, current, ratio, regression)
+    """
+    baseline_times = {result['name']: result['min'] for result in baseline['results']
+                      if result['status'] == 'ok'}
+    comparison = []
+    for result in current['results']:
+        if result['status'] == 'ok' and result['name'] in baseline_times:
+            ratio = result['min'] / baseline_times[result['name']]
+            comparison.append({'name': result['name'], 'baseline': baseline_times[result['name']],
+                               'current': result['min'], 'ratio': ratio, 'regression': ratio > 1. + tolerance})
+
+    return comparison
+
+
+if '__main__' == __name__:
+    parser = argparse.ArgumentParser(
+        description='Run the value assessment benchmark suite')
+    parser.add_argument('--scale', default='medium', choices=list(SCALES.keys()))
+    parser.add_argument('--repeat', default=5, type=int)
+    parser.add_argument('--periods-per-year', default=1, type=int,
+                        help='number of periods in a year of the model cases, 4 for quarterly inputs')
+    parser.add_argument('--cases', nargs='*', default=None,
+                        help='names of the cases to run, all by default')
+    parser.add_argument('--output', default=None,
+                        help='JSON results file, in the results directory by default')
+    parser.add_argument('--compare', default=None,
+                        help='JSON results file of a previous run to compare with')
+    parser.add_argument('--tolerance', default=0.2, type=float)
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(scale=args.scale, repeat=args.repeat, periods_per_year=args.periods_per_year)
+    results = suite.run(args.cases)
+
+    output = args.output
+    if output is None:
+        commit = results['metadata']['commit'] or 'nocommit'
+        periods_suffix = '' if args.periods_per_year == 1 else f'_{args.periods_per_year}ppy'
+        output = join(RESULTS_DIR, f'benchmark_{commit[:10]}_{args.scale}{periods_suffix}.json')
+    save_results(results, output)
+
+    for result in results['results']:
+        if result['status'] == 'ok':
+            print(f"{result['name']:<40} min {result['min'] * 1000.:10.3f} ms   median {result['median'] * 1000.:10.3f} ms")
+        else:
+            print(f"{result['name']:<40} {result['status']}: {result['message']}")
+    print(f'Results stored in {output}')
+
+    if args.compare is not None:
+        for case in compare_results(load_results(args.compare), results, args.tolerance):
+            flag = 'REGRESSION' if case['regression'] else ''
+            print(f"{case['name']:<40} x{case['ratio']:6.2f} {flag}")
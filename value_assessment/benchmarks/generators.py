@@ -0,0 +1,196 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+import pandas as pd
+from value_assessment.core.toolbox.period_index import PeriodIndex
+
+YEAR_START = 2020
+ESCALATION_RATE = 0.02
+YEAR_START_ESCALATION_RATE = 2020
+
+# after sales opex distribution from launch_year to launch_year+10 onwards, as in the usecases
+AFTER_SALES_DISTRIBUTION = np.array(
+    [19., 11., 8., 7., 6., 5., 5., 5., 5., 5., 5.]) / 100.
+
+# capex distribution columns from launch_year-6 to launch_year+4 onwards
+CAPEX_DISTRIBUTION_COLUMNS = [f'launch_year-{i}' for i in range(6, 0, -1)] + \
+    ['launch_year'] + [f'launch_year+{i}' for i in range(1, 4)] + \
+    ['launch_year+4 onwards']
+
+
+def get_years(nb_years):
+    return np.arange(YEAR_START, YEAR_START + nb_years)
+
+
+def get_launch_year(nb_years):
+    """
+    Launch year after the first tenth of the years, leaving room for development capex
+    """
+    return YEAR_START + min(6, nb_years // 10 + 1)
+
+
+def generate_learning_curve_dict(nb_lc_segments, cumulative_quantity, rng, percentage_make=50.):
+    """
+    Learning curve with nb_lc_segments segments up to the cumulative quantity
+    """
+    coefficients = np.sort(rng.uniform(0.8, 0.98, nb_lc_segments))
+    until_product_rank = np.geomspace(
+        50., max(cumulative_quantity, 100.), nb_lc_segments)
+
+    return {'percentage_make': percentage_make,
+            'learning_curve_coefficient': coefficients.tolist(),
+            'until_product_rank': np.round(until_product_rank).tolist()}
+
+
+def generate_sales(nb_years, quantity_per_year, rng, periods_per_year=1):
+    """
+    Sales quantity by period, 0 before the launch year then around quantity_per_year split evenly over the periods
+    """
+    years = get_years(nb_years)
+    # yearly quantities are multiples of the number of periods so that quantities by period are whole numbers
+    quantity = np.round(rng.uniform(0.5, 1.5, nb_years) *
+                        quantity_per_year / periods_per_year) * periods_per_year
+    quantity[years < get_launch_year(nb_years)] = 0.
+
+    return get_period_index(nb_years, periods_per_year).split_dataframe(
+        pd.DataFrame({'years': years, 'quantity': quantity}), ['quantity'])
+
+
+def get_period_index(nb_years, periods_per_year):
+    return PeriodIndex(YEAR_START, YEAR_START + nb_years - 1, periods_per_year)
+
+
+def generate_opex_inputs(nb_years, nb_opex_components, nb_lc_segments, quantity_per_year, seed=0, periods_per_year=1):
+    """
+    Arguments of Opex and of Opex.compute_opex_by_category for one product
+    """
+    rng = np.random.default_rng(seed)
+    sales = generate_sales(nb_years, quantity_per_year, rng, periods_per_year)
+
+    model_args = {'escalation_rate': ESCALATION_RATE,
+                  'year_start_escalation_rate': YEAR_START_ESCALATION_RATE,
+                  'launch_year': get_launch_year(nb_years),
+                  'year_start': YEAR_START,
+                  'year_end': YEAR_START + nb_years - 1,
+                  'learning_curve_dict': generate_learning_curve_dict(nb_lc_segments, sales['quantity'].sum(), rng),
+                  'periods_per_year': periods_per_year}
+    compute_args = {'opex_by_category': pd.DataFrame({'components': [f'comp{i}' for i in range(nb_opex_components)],
+                                                      'opex': rng.uniform(100., 2000., nb_opex_components)}),
+                    'sales': sales,
+                    'distrib_after_sales_opex_unit': AFTER_SALES_DISTRIBUTION,
+                    'opex_multiplier': 1.}
+
+    return model_args, compute_args
+
+
+def generate_capex_inputs(nb_years, nb_capex_categories, nb_components_by_category=3, seed=0, periods_per_year=1):
+    """
+    Arguments of Capex and of Capex.compute_capex_by_category for one product
+    """
+    rng = np.random.default_rng(seed)
+    categories = [f'category{i}' for i in range(nb_capex_categories)]
+
+    distribution = rng.uniform(0., 1., (nb_capex_categories,
+                                        len(CAPEX_DISTRIBUTION_COLUMNS)))
+    distribution[:, -1] = 0.
+    distribution = 100. * distribution / \
+        distribution.sum(axis=1, keepdims=True)
+    capex_distrib_categories = pd.DataFrame(
+        distribution, columns=CAPEX_DISTRIBUTION_COLUMNS)
+    capex_distrib_categories.insert(0, 'Distribution Category', categories)
+
+    nb_components = nb_capex_categories * nb_components_by_category
+    capex_input_values = pd.DataFrame({'Distribution Category': np.repeat(categories, nb_components_by_category),
+                                       'Capex Component': [f'comp{i}' for i in range(nb_components)],
+                                       'Capex value': rng.uniform(1.e6, 1.e9, nb_components),
+                                       'Contingency (%)': rng.uniform(0., 20., nb_components)})
+
+    model_args = {'escalation_rate': ESCALATION_RATE,
+                  'year_start_escalation_rate': YEAR_START_ESCALATION_RATE,
+                  'launch_year': get_launch_year(nb_years),
+                  'year_start': YEAR_START,
+                  'year_end': YEAR_START + nb_years - 1,
+                  'periods_per_year': periods_per_year}
+    compute_args = {'capex_input_values': capex_input_values,
+                    'capex_distrib_categories': capex_distrib_categories}
+
+    return model_args, compute_args
+
+
+def generate_manufacturer_inputs(nb_years, nb_opex_components, nb_capex_categories, quantity_per_year, seed=0,
+                                 periods_per_year=1):
+    """
+    Arguments of ManufacturerVB and of ManufacturerVB.configure_data for one product
+    Opex and prices by product unit are the same for the periods of a year, capex of a year are split over its periods
+    """
+    rng = np.random.default_rng(seed)
+    years = get_years(nb_years)
+    categories = [f'category{i}' for i in range(nb_capex_categories)]
+
+    opex = pd.DataFrame({'years': years,
+                         'opex': rng.uniform(1.e3, 1.e4, nb_years),
+                         'opex_wo_escalation': rng.uniform(1.e3, 1.e4, nb_years),
+                         'opex_after_sales': rng.uniform(10., 100., nb_years)})
+    for i in range(nb_opex_components):
+        opex[f'opex_comp{i}'] = rng.uniform(0., 100., nb_years)
+
+    capex = pd.DataFrame({'years': years,
+                          'capex': rng.uniform(0., 1.e8, nb_years),
+                          'contingency': rng.uniform(0., 1.e6, nb_years)})
+    for category in categories:
+        capex[f'capex_{category}'] = rng.uniform(0., 1.e7, nb_years)
+
+    manufacturer_dict = {
+        'opex_payment_term_percentage': pd.DataFrame({'percentage_at_delivery_year-1': [20.],
+                                                      'percentage_at_delivery_year-2': [10.]}),
+        'nb_years_capex_amort': pd.DataFrame({'Distribution Category': categories,
+                                              'Nb years': rng.integers(0, 15, nb_capex_categories)})}
+
+    model_args = {'year_start': YEAR_START,
+                  'year_end': YEAR_START + nb_years - 1,
+                  'launch_year': get_launch_year(nb_years),
+                  'manufacturer_dict': manufacturer_dict,
+                  'actor_name': None,
+                  'actor_wacc': 0.08,
+                  'exchange_rate_USD_EUR': 1.,
+                  'periods_per_year': periods_per_year}
+    period_index = get_period_index(nb_years, periods_per_year)
+    sales = generate_sales(nb_years, quantity_per_year, rng, periods_per_year)
+    price = pd.DataFrame({'years': years,
+                          'sale_price': rng.uniform(2.e4, 5.e4, nb_years)})
+    data_args = {'sales_qty_product': sales,
+                 'opex_product': period_index.split_dataframe(opex, []),
+                 'capex_product': period_index.split_dataframe(capex, [name for name in capex.columns if name != 'years']),
+                 'price_product': period_index.split_dataframe(price, [])}
+
+    return model_args, data_args
+
+
+def generate_cashflow(nb_years, seed=0, periods_per_year=1):
+    """
+    Cashflow by period with a development phase of negative values followed by positive values, with an IRR
+    """
+    rng = np.random.default_rng(seed)
+    nb_years = nb_years * periods_per_year
+    nb_development_years = max(1, nb_years // 5)
+    cashflow = rng.uniform(1., 3., nb_years)
+    cashflow[:nb_development_years] *= - nb_years / nb_development_years
+
+    return cashflow
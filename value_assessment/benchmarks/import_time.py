@@ -0,0 +1,85 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import argparse
+import json
+import subprocess
+import sys
+
+# modules imported by a computing worker of the generic value assessment process
+DISCIPLINE_MODULES = ['value_assessment.sos_wrapping.opex.opex_discipline',
+                      'value_assessment.sos_wrapping.capex.capex_discipline',
+                      'value_assessment.sos_wrapping.valueblock_disciplines.manufacturer_vb_discipline',
+                      'value_assessment.sos_wrapping.valueblock_disciplines.sum_discipline',
+                      'value_assessment.sos_wrapping.valueblock_disciplines.sum_actor_discipline']
+
+# modules that computing workers should not load
+CHART_MODULES = ['plotly.graph_objects',
+                 'value_assessment.sos_wrapping.post_processing.post_proc_output']
+
+IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+for module in {modules!r}:
+    __import__(module)
+print(json.dumps({{'import_time': time.perf_counter() - start,
+                  'loaded': [module for module in {chart_modules!r} if module in sys.modules]}}))
+'''
+
+
+def measure_import(modules, chart_modules=None):
+    """
+    Import modules in a new python process
+    Returns the import time and the chart modules loaded, raises ImportError if a module cannot be imported
+    """
+    if chart_modules is None:
+        chart_modules = CHART_MODULES
+
+    process = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT.format(modules=modules, chart_modules=chart_modules)],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise ImportError(process.stderr.strip().splitlines()[-1])
+
+    return json.loads(process.stdout)
+
+
+def measure_import_times(modules=None, repeat=5):
+    """
+    Minimum over repeat new processes of the import time of each module, with the chart modules it loads
+    """
+    if modules is None:
+        modules = DISCIPLINE_MODULES
+
+    results = {}
+    for module in modules:
+        measures = [measure_import([module]) for _ in range(repeat)]
+        results[module] = {'import_time': min(measure['import_time'] for measure in measures),
+                           'loaded': measures[0]['loaded']}
+
+    return results
+
+
+if '__main__' == __name__:
+    parser = argparse.ArgumentParser(
+        description='Measure the import time of the value assessment disciplines in new processes')
+    parser.add_argument('--repeat', default=5, type=int)
+    args = parser.parse_args()
+
+    for module, result in measure_import_times(repeat=args.repeat).items():
+        print(f"{module:<85} {result['import_time'] * 1000.:8.1f} ms   loaded: {', '.join(result['loaded'])}")
@@ -22,6 +22,10 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 import numpy as np
 import pandas as pd
+from value_assessment.core.toolbox.escalation import get_escalation_factor
+from value_assessment.core.toolbox.period_index import PeriodIndex
+
+
 class Capex():
     '''
     Class that implements CAPEX model
@@ -29,7 +33,8 @@ class Capex():
     MODEL_NAME = ""
     model_type = "CAPEX"
 
-    def __init__(self, escalation_rate, year_start_escalation_rate, launch_year, year_start, year_end, logger=None):
+    def __init__(self, escalation_rate, year_start_escalation_rate, launch_year, year_start, year_end, logger=None,
+                 periods_per_year=1):
 
         # init dataframes
         self.year_end = year_end
@@ -37,16 +42,57 @@ class Capex():
         self.launch_year = launch_year
         self.escalation_rate = escalation_rate
         self.year_start_escalation_rate = year_start_escalation_rate
-        self.years = self.year_end - self.year_start + 1
-        self.year_vector = np.arange(self.year_start, self.year_end + 1)
+        # capex are computed by period, the capex of a year are split evenly over its periods
+        self.period_index = PeriodIndex(year_start, year_end, periods_per_year)
+        self.years = len(self.period_index)
+        self.year_vector = self.period_index.times
         self.capex_df = pd.DataFrame({'years': self.year_vector})
         self.logger = logger
 
     def compute_capex_by_category(self, capex_input_values, capex_distrib_categories):
-        capex_df = self.capex_df
-        capex_df['capex'] = 0
-        capex_df['contingency'] = 0
         # calculate capex for each defined category
+        self.check_categories(capex_input_values, capex_distrib_categories)
+        categories_list = capex_distrib_categories['Distribution Category'].values.tolist(
+        )
+
+        # capex value and contingency-weighted value summed once by category
+        grouped_values = pd.DataFrame({
+            'Distribution Category': capex_input_values['Distribution Category'],
+            'capex_value': capex_input_values['Capex value'],
+            'contingency_value': capex_input_values['Capex value'] * capex_input_values['Contingency (%)'] / 100,
+        }).groupby('Distribution Category', sort=False).sum().reindex(categories_list, fill_value=0.)
+        capex_category_values = grouped_values['capex_value'].values.astype(
+            float)
+        contingency_values = grouped_values['contingency_value'].values.astype(
+            float)
+        contingency_cat = np.divide(contingency_values, capex_category_values,
+                                    out=np.zeros(len(categories_list)), where=capex_category_values != 0)
+
+        # categories x years distribution matrix (convert percentage)
+        category_distribution = capex_distrib_categories.loc[:, capex_distrib_categories.columns !=
+                                                             'Distribution Category'].values.astype(float) / 100.
+        category_by_year = np.dot(
+            category_distribution, self.distribution_by_year(category_distribution.shape[1]))
+
+        capex_category = capex_category_values[:, np.newaxis] * \
+            category_by_year * self.escalation_factor()
+
+        contingency = np.dot(contingency_cat, capex_category)
+
+        capex_dict = {'years': self.year_vector,
+                      # apply contingency
+                      'capex': capex_category.sum(axis=0) + contingency,
+                      'contingency': contingency}
+        capex_dict.update({f'capex_{category}': capex_category[i]
+                           for i, category in enumerate(categories_list)})
+        self.capex_df = pd.DataFrame(capex_dict)
+
+        return self.capex_df
+
+    def check_categories(self, capex_input_values, capex_distrib_categories):
+        '''
+        Log the capex categories without distribution and raise if a distribution category is duplicated
+        '''
         categories_list = capex_distrib_categories['Distribution Category'].values.tolist(
         )
 
@@ -55,46 +101,26 @@ class Capex():
                 self.logger.info(
                     f'capex Distribution Category <<{category}>> does not exist in inputcapex_input_values dataframe')
 
-        for category in categories_list:
-            capex_sum = capex_input_values.loc[capex_input_values[
-                'Distribution Category'] == category, 'Capex value'].sum()
-            capex_category_value = capex_input_values.loc[capex_input_values[
-                'Distribution Category'] == category, 'Capex value'].sum()
-            category_distribution_records = capex_distrib_categories.loc[capex_distrib_categories['Distribution Category']
-                                                                         == category, capex_distrib_categories.columns != 'Distribution Category']
-
-            if capex_sum != 0:
-                contingency_cat = (capex_input_values.loc[capex_input_values[
-                    'Distribution Category'] == category, 'Capex value'] * capex_input_values.loc[capex_input_values[
-                        'Distribution Category'] == category, 'Contingency (%)'] / 100).sum() / capex_sum
-            else:
-                contingency_cat = 0
-
-            if len(category_distribution_records) == 1:
-                # convert percentage
-                category_distribution_records /= 100.
-                capex_category_distribution = category_distribution_records.values.tolist()[
-                    0]
-            else:
-                raise Exception(
-                    f'There is an issue with the inputs for capex category {category}')
+        duplicated_categories = capex_distrib_categories.loc[capex_distrib_categories['Distribution Category'].duplicated(
+        ), 'Distribution Category'].values.tolist()
+        if len(duplicated_categories) > 0:
+            raise Exception(
+                f'There is an issue with the inputs for capex category {duplicated_categories[0]}')
 
-            capex_df[f'capex_{category}'] = self.value_vs_time(
-                capex_category_value, capex_category_distribution)
-
-            # apply escalation
-            capex_df[f'capex_{category}'] = self.apply_escalation(
-                capex_df[f'capex_{category}'])
-
-            capex_df['capex'] += capex_df[f'capex_{category}']
-
-            capex_df['contingency'] += capex_df[f'capex_{category}'] * \
-                contingency_cat
+    def distribution_by_year(self, nb_distribution_years):
+        '''
+        Matrix (distribution columns x periods) mapping each distribution column on the periods of its years,
+        columns start at launch_year-6 and the last one is used for all following years
+        '''
+        distribution_index = self.period_index.years_since(self.launch_year) + 6
+        last_index = nb_distribution_years - 1
 
-        # apply contingency
-        capex_df['capex'] += capex_df['contingency']
+        mapping = np.zeros((nb_distribution_years, self.years))
+        in_distribution = distribution_index >= 0
+        mapping[np.minimum(distribution_index[in_distribution], last_index),
+                np.arange(self.years)[in_distribution]] = 1. / self.period_index.periods_per_year
 
-        return capex_df
+        return mapping
 
     def value_vs_time(self, value, distribution):
 
@@ -114,17 +140,14 @@ class Capex():
         Apply escalation_rate starting at year_start_escalation_rate
         '''
 
-        if isinstance(serie_before_escalation, np.ndarray):
-            serie_before_escalation = pd.Series(serie_before_escalation)
+        return np.asarray(serie_before_escalation, dtype=float) * self.escalation_factor()
 
-        df = pd.DataFrame({'years': range(
-            int(self.year_start), int(self.year_end) + 1)})
-
-        df['escalated_list'] = serie_before_escalation.values.tolist()
-        df['escalated_list'] = df['escalated_list'] * (1.0 + self.escalation_rate) ** \
-            (df['years'] - self.year_start_escalation_rate)
-
-        return np.array(df['escalated_list'])
+    def escalation_factor(self):
+        '''
+        Escalation factor of each period, the one of its year, shared between models with the same years and escalation
+        '''
+        return self.period_index.expand(get_escalation_factor(self.year_start, self.year_end, self.escalation_rate,
+                                                              self.year_start_escalation_rate))
 
     def apply_ratio(self, capex_input_values, capex_ratio):
         # apply ratio on column 'Capex value'
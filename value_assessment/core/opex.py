@@ -20,8 +20,10 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 import numpy as np
 import pandas as pd
-import math
 from copy import deepcopy
+from value_assessment.core.toolbox.learning_curve import LearningCurve, LearningCurveBatch
+from value_assessment.core.toolbox.escalation import get_escalation_factor
+from value_assessment.core.toolbox.period_index import PeriodIndex
 
 
 class Opex():
@@ -32,7 +34,7 @@ class Opex():
     model_type = 'OpEx'
 
     def __init__(self, escalation_rate, year_start_escalation_rate, launch_year, year_start, year_end,
-                 learning_curve_dict):
+                 learning_curve_dict, periods_per_year=1):
 
         # init dataframes
         self.year_end = year_end
@@ -40,8 +42,10 @@ class Opex():
         self.launch_year = launch_year
         self.escalation_rate = escalation_rate
         self.year_start_escalation_rate = year_start_escalation_rate
-        self.years = self.year_end - self.year_start + 1
-        self.year_vector = np.arange(self.year_start, self.year_end + 1)
+        # opex are computed by period, sales are given by period and opex by product unit
+        self.period_index = PeriodIndex(year_start, year_end, periods_per_year)
+        self.years = len(self.period_index)
+        self.year_vector = self.period_index.times
         self.opex_df = pd.DataFrame({'years': self.year_vector})
         self.learning_curve_dict = learning_curve_dict
         self.sales_df = None
@@ -51,7 +55,7 @@ class Opex():
         updated_value = np.ones(self.years) * value
 
         if self.launch_year > self.year_start:
-            updated_value[0:self.launch_year - self.year_start] = 0
+            updated_value[self.period_index.periods_since(self.launch_year) < 0] = 0
 
         return updated_value
 
@@ -60,17 +64,14 @@ class Opex():
         Apply escalation_rate starting at year_start_escalation_rate
         '''
 
-        if isinstance(serie_before_escalation, np.ndarray):
-            serie_before_escalation = pd.Series(serie_before_escalation)
-
-        df = pd.DataFrame({'years': range(
-            int(self.year_start), int(self.year_end) + 1)})
+        return np.asarray(serie_before_escalation, dtype=float) * self.escalation_factor()
 
-        df['escalated_list'] = serie_before_escalation.values.tolist()
-        df['escalated_list'] = df['escalated_list'] * (1.0 + self.escalation_rate) ** \
-            (df['years'] - self.year_start_escalation_rate)
-
-        return np.array(df['escalated_list'])
+    def escalation_factor(self):
+        '''
+        Escalation factor of each period, the one of its year, shared between models with the same years and escalation
+        '''
+        return self.period_index.expand(get_escalation_factor(self.year_start, self.year_end, self.escalation_rate,
+                                                              self.year_start_escalation_rate))
 
     def compute_opex(self, sales):
 
@@ -87,8 +88,8 @@ class Opex():
 
         list_name_lc = ['opex_Make', 'opex_Buy', 'opex_Make_wo_LC']
 
-        self.opex_df[list_name_lc] = self.opex_df[list_name_lc].apply(
-            lambda x: self.apply_escalation(x))
+        self.opex_df[list_name_lc] = self.opex_df[list_name_lc].values * \
+            self.escalation_factor()[:, np.newaxis]
 
         return self.opex_df
 
@@ -140,89 +141,208 @@ class Opex():
         self.opex_df = self.compute_after_sales(
             opex_df=self.opex_df, distrib_after_sales_opex_unit=distrib_after_sales_opex_unit)
 
-        # apply escalation on after sales
-        self.opex_df['opex_after_sales'] = self.apply_escalation(
-            self.opex_df['opex_after_sales'])
-
         return self.opex_df
 
     def compute_learning_curve_coef(self, lc_dict):
         '''
         Compute learning curve coefficient :
+            average coefficient of the products delivered each year, computed in closed form
+            from the learning curve segments so that cost does not depend on the number of products
         '''
 
         if not 'cumulative_quantity' in self.sales_df:
             self.sales_df['cumulative_quantity'] = self.sales_df['quantity'].cumsum()
 
-        # create a file with one rank per line
-        final_df = pd.DataFrame(
-            {'until_product_rank': range(1, int(max(self.sales_df['cumulative_quantity'].max(), max(lc_dict['until_product_rank']))) + 1)})
-        final_df = final_df.merge(
-            self.sales_df, how='left',  left_on='until_product_rank', right_on='cumulative_quantity')
-        final_df = final_df.fillna(method='bfill')
-        final_df = final_df[final_df['quantity'] != 0]
-
-        # compute learning curve from dictionnary data
-        final_df['learning_curve_coef'] = np.NaN
-        for i in range(len(lc_dict['until_product_rank'])):
-            if i == 0:
-                final_df.loc[final_df['until_product_rank'] <= lc_dict['until_product_rank'][i], 'learning_curve_coef'] = final_df.loc[(
-                    final_df['until_product_rank'] <= lc_dict['until_product_rank'][i]), 'until_product_rank']**(math.log(lc_dict['learning_curve_coefficient'][i]) / math.log(2))
-            else:
-
-                index_i = (final_df['until_product_rank'] <= lc_dict['until_product_rank'][i]) & (
-                    final_df['until_product_rank'] > lc_dict['until_product_rank'][i - 1])
-
-                # calculate learning curve coef (optimised version)
-                def calc_lc_coef(s):
-                    newColumn = [final_df.loc[(
-                        final_df['until_product_rank'] == lc_dict['until_product_rank'][i - 1]), 'learning_curve_coef'].values[0]]
-
-                    for j, val in enumerate(s):
-                        newColumn.append((val)**(math.log(lc_dict['learning_curve_coefficient'][i]) / math.log(2)) /
-                                         (val - 1)**(math.log(lc_dict['learning_curve_coefficient'][i]) / math.log(2)) * newColumn[j])
-                    return newColumn[1:]
-
-                final_df.loc[index_i, 'learning_curve_coef'] = final_df.loc[index_i][[
-                    'until_product_rank']].apply(calc_lc_coef).values
-
-        final_df = final_df.fillna(method='ffill')
-        rank_ref_costing = max(lc_dict['until_product_rank'])
-        if len(final_df['until_product_rank']) >= rank_ref_costing:
-            final_df['learning_curve_coef'] = (final_df['learning_curve_coef'] / final_df.loc[final_df['until_product_rank']
-                                                                                              == rank_ref_costing, 'learning_curve_coef'].values).expanding().mean()
-
-        df = self.sales_df.merge(final_df[['until_product_rank', 'learning_curve_coef']], how='left',
-                                 left_on='cumulative_quantity', right_on='until_product_rank').drop(['until_product_rank'], axis=1)
-
-        df['learning_curve_coef'] = (((df['learning_curve_coef'] * df['cumulative_quantity']) - (
-            df['learning_curve_coef'].shift(1).fillna(0) * df['cumulative_quantity'].shift(1).fillna(0))) / df['quantity']).fillna(0)
+        learning_curve = LearningCurve(
+            lc_dict['learning_curve_coefficient'], lc_dict['until_product_rank'])
+
+        df = self.sales_df.copy()
+        df['learning_curve_coef'] = learning_curve.compute_yearly_coef(
+            df['quantity'].values, df['cumulative_quantity'].values)
 
         return df
 
     def compute_after_sales(self, opex_df, distrib_after_sales_opex_unit):
+        '''
+        Compute escalated after sales opex : opex_wo_escalation weighted by the after sales distribution of each year
+        '''
+        opex_df['opex_after_sales'] = self.apply_escalation(
+            opex_df['opex_wo_escalation'].values * self.after_sales_distribution_by_year(distrib_after_sales_opex_unit))
 
-        # Initialise dataframe
-        after_sales_df = pd.DataFrame({'years': range(
-            min(self.year_start, self.launch_year - 1), max(self.year_end + 1, self.launch_year + 11))})
-        after_sales_df.insert(after_sales_df.columns.size,
-                              'opex_after_sales', 0)
+        return opex_df
 
-        after_sales_df = after_sales_df.merge(
-            opex_df[['years', 'opex_wo_escalation']], how='left').fillna(0)
+    def after_sales_distribution_by_year(self, distrib_after_sales_opex_unit):
+        '''
+        After sales distribution of each period from launch_year, the last element is used from launch_year+10 onwards
+        and 0 before launch_year
+        '''
+        distrib = np.asarray(distrib_after_sales_opex_unit, dtype=float)
+        offset = self.period_index.years_since(self.launch_year)
 
-        # compute values on the opex and distribution of opex unit
-        after_sales_df.loc[(self.launch_year + 9 >= after_sales_df['years']) & (after_sales_df['years'] >= self.launch_year), 'opex_after_sales'] = after_sales_df.loc[(
-            self.launch_year + 9 >= after_sales_df['years']) & (after_sales_df['years'] >= self.launch_year), 'opex_wo_escalation'] * np.array(distrib_after_sales_opex_unit[:-1])
+        return np.where(offset >= 0, distrib[np.clip(offset, 0, len(distrib) - 1)], 0.)
 
-        # from launch_year+10 to year_end use the last element of the
-        # distribution
-        if self.year_end >= (self.launch_year + 10):
-            after_sales_df.loc[after_sales_df['years'] >= self.launch_year + 10, 'opex_after_sales'] = after_sales_df.loc[after_sales_df['years'] >= self.launch_year + 10, 'opex_wo_escalation'] * \
-                distrib_after_sales_opex_unit[-1]
 
-        # keep values only between year_start and year_end
-        opex_df = opex_df.merge(after_sales_df.loc[(self.year_end >= after_sales_df['years']) & (
-            after_sales_df['years'] >= self.year_start), ['years', 'opex_after_sales']])
+class OpexBatch():
+    '''
+    Class that implements OPEX model for a batch of products sharing the same years and escalation
 
-        return opex_df
+    OPEXDiscipline computes one product, OPEXDiscipline.compute_outputs_batch uses this class to compute the outputs
+    of many OPEX disciplines inputs at once, for drivers evaluating many products outside the execution engine
+    '''
+    MODEL_NAME = ''
+    model_type = 'OpEx'
+    # columns of the opex dataframes before the components columns
+    OPEX_COLUMNS = ['opex_wo_escalation', 'quantity', 'cumulative_quantity', 'learning_curve_coef',
+                    'opex_Make', 'opex_Buy', 'opex_Make_wo_LC', 'opex']
+
+    def __init__(self, escalation_rate, year_start_escalation_rate, launch_years, year_start, year_end,
+                 learning_curve_dicts):
+
+        self.year_end = year_end
+        self.year_start = year_start
+        self.launch_years = np.asarray(launch_years, dtype=int)
+        self.escalation_rate = escalation_rate
+        self.year_start_escalation_rate = year_start_escalation_rate
+        self.years = self.year_end - self.year_start + 1
+        self.year_vector = np.arange(self.year_start, self.year_end + 1)
+        self.learning_curve_dicts = learning_curve_dicts
+        self.opex_arrays = None
+
+    def value_vs_time(self, values):
+        '''
+        Values of each product (one per row) from its launch year, 0 before
+        '''
+        active = self.year_vector[np.newaxis,
+                                  :] >= self.launch_years[:, np.newaxis]
+
+        return active * np.asarray(values, dtype=float)[:, np.newaxis]
+
+    def escalation_factor(self):
+        '''
+        Escalation factor of each year starting at year_start_escalation_rate
+        '''
+        return get_escalation_factor(self.year_start, self.year_end, self.escalation_rate,
+                                     self.year_start_escalation_rate)
+
+    def compute_learning_curve_coef(self, sales_years, sales_quantity):
+        '''
+        Compute learning curve coefficient of each product on opex years (0 for years without sales)
+        '''
+        cumulative_quantity = np.cumsum(sales_quantity, axis=1)
+        learning_curve = LearningCurveBatch([lc_dict['learning_curve_coefficient'] for lc_dict in self.learning_curve_dicts],
+                                            [lc_dict['until_product_rank'] for lc_dict in self.learning_curve_dicts])
+        lc_coef = learning_curve.compute_yearly_coef(
+            sales_quantity, cumulative_quantity)
+
+        # align sales years on opex years
+        year_index = np.searchsorted(sales_years, self.year_vector)
+        in_sales = year_index < len(sales_years)
+        in_sales[in_sales] = sales_years[year_index[in_sales]
+                                         ] == self.year_vector[in_sales]
+
+        aligned = {}
+        for name, values in (('quantity', sales_quantity), ('cumulative_quantity', cumulative_quantity),
+                             ('learning_curve_coef', lc_coef)):
+            aligned[name] = np.zeros((len(values), self.years))
+            aligned[name][:, in_sales] = values[:, year_index[in_sales]]
+
+        return aligned
+
+    def compute_after_sales(self, opex_wo_escalation, distrib_after_sales_opex_unit):
+        '''
+        Apply the after sales distribution from launch_year, the last element is used from launch_year+10 onwards
+        '''
+        distrib = np.atleast_2d(np.asarray(
+            distrib_after_sales_opex_unit, dtype=float))
+        offset = self.year_vector[np.newaxis, :] - \
+            self.launch_years[:, np.newaxis]
+        index = np.clip(offset, 0, distrib.shape[1] - 1)
+        distrib_by_year = np.where(offset >= 0, np.take_along_axis(
+            np.broadcast_to(distrib, (len(self.launch_years), distrib.shape[1])), index, axis=1), 0.)
+
+        return opex_wo_escalation * distrib_by_year
+
+    def compute_opex_arrays(self, opex_by_category, sales_years, sales_quantity, distrib_after_sales_opex_unit,
+                            opex_multiplier=1.0):
+        '''
+        Compute opex of all products at once
+        ::params:: opex_by_category : array (products x components) of opex, NaN if the component is not used by the product
+        ::params:: sales_years : array of years of sales_quantity
+        ::params:: sales_quantity : array (products x sales_years) of quantities
+        ::params:: distrib_after_sales_opex_unit : array of the after sales distribution, shared or one row per product
+        ::params:: opex_multiplier : float or array of one multiplier per product
+        Returns the dict of the arrays (products x years) of the opex columns, with the array
+        (products x components x years) of the components opex in 'components'
+        '''
+        opex_by_category = np.asarray(opex_by_category, dtype=float)
+        sales_years = np.asarray(sales_years)
+        sales_quantity = np.asarray(sales_quantity, dtype=float)
+        escalation = self.escalation_factor()
+
+        opex_total = np.nansum(opex_by_category, axis=1) * \
+            np.asarray(opex_multiplier, dtype=float)
+        opex_wo_escalation = self.value_vs_time(opex_total)
+
+        arrays = self.compute_learning_curve_coef(
+            sales_years, sales_quantity)
+
+        percentage_make = np.array([lc_dict['percentage_make']
+                                    for lc_dict in self.learning_curve_dicts])[:, np.newaxis] / 100.
+        opex_make_wo_lc = percentage_make * opex_wo_escalation
+        opex_buy = (1 - percentage_make) * opex_wo_escalation
+        opex_make = opex_make_wo_lc * arrays['learning_curve_coef']
+        opex_wo_escalation = opex_make + opex_buy
+
+        arrays['opex_wo_escalation'] = opex_wo_escalation
+        arrays['opex_Make'] = opex_make * escalation
+        arrays['opex_Buy'] = opex_buy * escalation
+        arrays['opex_Make_wo_LC'] = opex_make_wo_lc * escalation
+        arrays['opex'] = opex_wo_escalation * escalation
+        arrays['opex_after_sales'] = self.compute_after_sales(
+            opex_wo_escalation, distrib_after_sales_opex_unit) * escalation
+        arrays['components'] = self.value_vs_time(np.ones(len(self.launch_years)))[:, np.newaxis, :] * \
+            np.nan_to_num(opex_by_category)[:, :, np.newaxis] * escalation
+
+        self.opex_arrays = arrays
+
+        return arrays
+
+    def get_opex_dataframes(self, arrays, components, product_components):
+        '''
+        Opex dataframe of each product from the arrays of compute_opex_arrays, with the columns of
+        Opex.compute_opex_by_category
+        ::params:: components : list of component names, the columns of the opex_by_category array
+        ::params:: product_components : list of the components used by each product, in the order of its columns
+        '''
+        # all columns in one array (products x years x columns), each dataframe is built from a single block
+        values = np.concatenate([np.stack([arrays[name] for name in self.OPEX_COLUMNS], axis=2),
+                                 np.transpose(arrays['components'], (0, 2, 1)),
+                                 arrays['opex_after_sales'][:, :, np.newaxis]], axis=2)
+        nb_columns = len(self.OPEX_COLUMNS)
+        component_index = {component: nb_columns + j for j, component in enumerate(components)}
+
+        opex_df_list = []
+        for product_values, used_components in zip(values, product_components):
+            column_index = list(range(nb_columns)) + \
+                [component_index[component] for component in used_components] + [values.shape[2] - 1]
+            opex_df = pd.DataFrame(product_values[:, column_index],
+                                   columns=self.OPEX_COLUMNS + [f'opex_{component}' for component in used_components] +
+                                   ['opex_after_sales'])
+            opex_df.insert(0, 'years', self.year_vector)
+            opex_df_list.append(opex_df)
+
+        return opex_df_list
+
+    def compute_opex_by_category(self, opex_by_category, components, sales_years, sales_quantity,
+                                 distrib_after_sales_opex_unit, opex_multiplier=1.0):
+        '''
+        Compute opex of all products at once, see compute_opex_arrays
+        ::params:: components : list of component names
+        Returns the list of opex dataframes of each product, the same as Opex.compute_opex_by_category
+        '''
+        opex_by_category = np.asarray(opex_by_category, dtype=float)
+        arrays = self.compute_opex_arrays(opex_by_category, sales_years, sales_quantity,
+                                          distrib_after_sales_opex_unit, opex_multiplier)
+
+        return self.get_opex_dataframes(arrays, components, [[component for component, used in zip(components, product_used)
+                                                               if used] for product_used in ~np.isnan(opex_by_category)])
@@ -24,18 +24,40 @@ class IRR():
     """
     Class to compute IRR
     """
+    # bracket the rate with sign changes of the NPV then refine with a safeguarded Newton
+    BRACKET = 'bracket'
+    # roots of the cash flow polynomial from the companion matrix eigenvalues
+    ROOTS = 'roots'
 
-    def __init__(self, cashflow):
+    # number of points of x = 1 / (1 + rate) in [0, 1] scanned to bracket the rate
+    GRID_SIZE = 400
+    XTOL = 1e-15
+    MAX_ITER = 200
+
+    def __init__(self, cashflow, method=BRACKET):
         """
         Init of the IRR class 
         ::params:: cashflow : array of cashflow 
+        ::params:: method : IRR.BRACKET or IRR.ROOTS
         """
         self.cashflow = cashflow
+        self.method = method
 
     def compute_irr(self):
         """
         Method to compute internal rate of return, returns the first real positive root of the npv, 'NA' if no positive value / no solution
         """
+        if self.method == self.BRACKET:
+            return self.compute_irr_bracket()
+        elif self.method == self.ROOTS:
+            return self.compute_irr_roots()
+        else:
+            raise Exception(f'Unknown IRR method {self.method}')
+
+    def compute_irr_roots(self):
+        """
+        Method to compute internal rate of return from all the roots of the npv polynomial
+        """
         res = np.roots(self.cashflow[::-1])
         mask = (res.imag == 0) & (res.real > 0)
         # if no root is real, return NA
@@ -52,3 +74,212 @@ class IRR():
             return filtered_rates[0]
         else:
             return 'NA'
+
+    def compute_irr_bracket(self):
+        """
+        Method to compute internal rate of return as the largest root x = 1 / (1 + rate) in ]0, 1] of
+        npv(x) = sum(cashflow[t] * x**t), falls back on compute_irr_roots if no root can be bracketed
+        """
+        cashflow = np.asarray(self.cashflow, dtype=float)
+
+        # leading and trailing zeros do not change the positive roots
+        non_zero = np.flatnonzero(cashflow)
+        if len(non_zero) < 2:
+            return 'NA'
+        cashflow = cashflow[non_zero[0]:non_zero[-1] + 1]
+
+        signs = np.sign(cashflow[cashflow != 0])
+        sign_changes = np.count_nonzero(signs[1:] != signs[:-1])
+        # Descartes rule of signs : no sign change, no positive root
+        if sign_changes == 0:
+            return 'NA'
+
+        npv_rate_zero = cashflow.sum()
+        if npv_rate_zero == 0:
+            return 0.
+
+        if sign_changes == 1:
+            # only one positive root, lower than 1 if npv changes sign between x=0 and x=1
+            if np.sign(npv_rate_zero) == np.sign(cashflow[0]):
+                return 'NA'
+            x = self.refine_root(cashflow, 0., 1.)
+        else:
+            x_grid = np.linspace(1., 0., self.GRID_SIZE + 1)
+            npv_grid = np.dot(
+                np.vander(x_grid, len(cashflow), increasing=True), cashflow)
+            bracket = np.flatnonzero(
+                np.sign(npv_grid[1:]) != np.sign(npv_grid[:-1]))
+            if len(bracket) == 0:
+                # the polynomial roots cost grows as the cube of the number of periods, skip them if the grid
+                # proves npv has no root
+                if self.has_no_root(cashflow, x_grid, npv_grid):
+                    return 'NA'
+                return self.compute_irr_roots()
+            x = self.refine_root(
+                cashflow, x_grid[bracket[0] + 1], x_grid[bracket[0]])
+
+        return 1. / x - 1.
+
+    def has_no_root(self, cashflow, x_grid, npv_grid):
+        """
+        True if npv has no root in [0, 1], checked on each cell [x_low, x_high] of the decreasing x_grid with
+        |npv(x)| >= |npv(x_high)| - (x_high - x_low) * sum(t * |cashflow[t]| * x_high**(t - 1))
+        """
+        periods = np.arange(1, len(cashflow))
+        derivative_bound = np.dot(np.vander(x_grid[:-1], len(cashflow) - 1, increasing=True),
+                                  periods * np.abs(cashflow[1:]))
+
+        return bool(np.all(np.abs(npv_grid[:-1]) > (x_grid[:-1] - x_grid[1:]) * derivative_bound))
+
+    def refine_root(self, cashflow, x_low, x_high):
+        """
+        Safeguarded Newton iteration on npv(x) in [x_low, x_high] where npv changes sign
+        """
+        periods = np.arange(1, len(cashflow))
+        derivative_coef = periods * cashflow[1:]
+
+        def npv(x):
+            return cashflow[0] + np.dot(cashflow[1:], x ** periods)
+
+        npv_low = npv(x_low)
+        if npv(x_high) == 0:
+            return x_high
+        x = 0.5 * (x_low + x_high)
+
+        for _ in range(self.MAX_ITER):
+            npv_x = npv(x)
+            if npv_x == 0:
+                return x
+            if np.sign(npv_x) == np.sign(npv_low):
+                x_low, npv_low = x, npv_x
+            else:
+                x_high = x
+
+            npv_derivative = np.dot(derivative_coef, x ** (periods - 1))
+            if npv_derivative != 0:
+                x_new = x - npv_x / npv_derivative
+                if abs(x_new - x) <= self.XTOL * x_high:
+                    return x_new
+            if npv_derivative == 0 or not x_low < x_new < x_high:
+                # Newton step out of the bracket, bisect instead
+                x_new = 0.5 * (x_low + x_high)
+                if x_high - x_low <= self.XTOL * x_high:
+                    return x_new
+            x = x_new
+
+        return x
+
+
+class IRRBatch():
+    """
+    Class to compute IRR of many cash flows at once, with the same results as IRR with method IRR.BRACKET
+    """
+
+    def __init__(self, cashflow):
+        """
+        Init of the IRRBatch class
+        ::params:: cashflow : array (scenarios x periods) of cashflow
+        """
+        self.cashflow = np.atleast_2d(np.asarray(cashflow, dtype=float))
+
+    def compute_irr(self):
+        """
+        Method to compute internal rate of return of each scenario, NaN if no positive value / no solution
+        """
+        nb_scenarios, nb_periods = self.cashflow.shape
+        irr = np.full(nb_scenarios, np.nan)
+        if nb_periods == 0:
+            return irr
+
+        # shift each cashflow so that it starts with its first non zero value
+        non_zero = self.cashflow != 0
+        has_values = non_zero.any(axis=1)
+        first_non_zero = np.argmax(non_zero, axis=1)
+        shifted_index = np.arange(nb_periods) + first_non_zero[:, np.newaxis]
+        cashflow = np.where(shifted_index < nb_periods, np.take_along_axis(
+            self.cashflow, np.minimum(shifted_index, nb_periods - 1), axis=1), 0.)
+
+        # sign changes ignoring zeros (Descartes rule of signs)
+        signs = np.sign(cashflow)
+        last_sign_index = np.maximum.accumulate(
+            np.where(signs != 0, np.arange(nb_periods), 0), axis=1)
+        filled_signs = np.take_along_axis(signs, last_sign_index, axis=1)
+        sign_changes = np.count_nonzero(
+            filled_signs[:, 1:] != filled_signs[:, :-1], axis=1)
+
+        npv_rate_zero = cashflow.sum(axis=1)
+        irr[has_values & (sign_changes > 0) & (npv_rate_zero == 0)] = 0.
+        to_solve = has_values & (sign_changes > 0) & (npv_rate_zero != 0) & ~(
+            (sign_changes == 1) & (np.sign(npv_rate_zero) == np.sign(cashflow[:, 0])))
+        if not to_solve.any():
+            return irr
+
+        # bracket the largest root x = 1 / (1 + rate) in ]0, 1] on the same grid as IRR
+        x_grid = np.linspace(1., 0., IRR.GRID_SIZE + 1)
+        npv_grid = np.dot(cashflow[to_solve], np.vander(
+            x_grid, nb_periods, increasing=True).T)
+        sign_grid = np.sign(npv_grid)
+        change = sign_grid[:, 1:] != sign_grid[:, :-1]
+        bracketed = change.any(axis=1)
+        bracket = np.argmax(change, axis=1)
+
+        solve_index = np.flatnonzero(to_solve)
+        for i in solve_index[~bracketed]:
+            # no bracket found, scalar fallback on the polynomial roots
+            irr_value = IRR(self.cashflow[i]).compute_irr()
+            irr[i] = np.nan if irr_value == 'NA' else irr_value
+
+        solve_index = solve_index[bracketed]
+        x = self.refine_root(cashflow[solve_index], x_grid[bracket[bracketed] + 1],
+                             x_grid[bracket[bracketed]])
+        irr[solve_index] = 1. / x - 1.
+
+        return irr
+
+    def refine_root(self, cashflow, x_low, x_high):
+        """
+        Safeguarded Newton iteration on npv(x) of each row in [x_low, x_high] where npv changes sign
+        """
+        periods = np.arange(cashflow.shape[1])
+        derivative_coef = periods[1:] * cashflow[:, 1:]
+
+        def npv(x, rows):
+            return np.sum(cashflow[rows] * x[:, np.newaxis] ** periods, axis=1)
+
+        all_rows = np.arange(len(cashflow))
+        npv_low = npv(x_low, all_rows)
+        x = np.where(npv(x_high, all_rows) == 0, x_high, 0.5 * (x_low + x_high))
+        converged = npv(x_high, all_rows) == 0
+
+        for _ in range(IRR.MAX_ITER):
+            rows = np.flatnonzero(~converged)
+            if len(rows) == 0:
+                break
+            x_row = x[rows]
+            powers = x_row[:, np.newaxis] ** periods
+            npv_x = np.sum(cashflow[rows] * powers, axis=1)
+
+            same_sign = np.sign(npv_x) == np.sign(npv_low[rows])
+            x_low[rows] = np.where(same_sign, x_row, x_low[rows])
+            npv_low[rows] = np.where(same_sign, npv_x, npv_low[rows])
+            x_high[rows] = np.where(same_sign, x_high[rows], x_row)
+
+            npv_derivative = np.sum(
+                derivative_coef[rows] * powers[:, :-1], axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_newton = x_row - npv_x / npv_derivative
+            newton_ok = npv_derivative != 0
+            newton_converged = newton_ok & (
+                np.abs(x_newton - x_row) <= IRR.XTOL * x_high[rows])
+            bisect = ~newton_converged & (~newton_ok | ~(
+                (x_low[rows] < x_newton) & (x_newton < x_high[rows])))
+            x_bisect = 0.5 * (x_low[rows] + x_high[rows])
+            bisect_converged = bisect & (
+                x_high[rows] - x_low[rows] <= IRR.XTOL * x_high[rows])
+
+            root_found = npv_x == 0
+            x[rows] = np.where(root_found, x_row,
+                               np.where(bisect, x_bisect, x_newton))
+            converged[rows] = root_found | newton_converged | bisect_converged
+
+        return x
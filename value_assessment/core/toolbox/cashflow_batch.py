@@ -0,0 +1,69 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+from value_assessment.core.toolbox.IRR import IRRBatch
+
+
+class CashflowBatch():
+    """
+    Class to compute cashflow infos of many scenarios at once
+    """
+
+    def __init__(self, cashflow, years, wacc):
+        """
+        Init of the CashflowBatch class
+        ::params:: cashflow : array (scenarios x years) of cash flow
+        ::params:: years : array of years
+        ::params:: wacc : float or array of one wacc per scenario
+        """
+        self.cashflow = np.atleast_2d(np.asarray(cashflow, dtype=float))
+        self.years = np.asarray(years)
+        self.wacc = np.asarray(wacc, dtype=float)
+
+    def compute_cf_infos(self):
+        """
+        Method to compute irr, npv, break even years, peak exposure and total free cash flow of each scenario
+        Returns a dict of arrays with the keys of ValueBlock cf_infos, NaN where the value block gives 'NA'
+        """
+        cashflow = self.cashflow
+        discount = (1 / (1 + np.atleast_1d(self.wacc)[:, np.newaxis])
+                    ) ** np.arange(cashflow.shape[1])
+
+        cumulative_cash_flow = np.cumsum(cashflow, axis=1)
+        cumulative_discounted_cf = np.cumsum(cashflow * discount, axis=1)
+
+        cf_infos = {
+            'irr': IRRBatch(cashflow).compute_irr(),
+            'npv': cumulative_discounted_cf[:, -1],
+            'year_break_even_discounted_cashflow': self.first_positive_year(cumulative_discounted_cf),
+            'year_break_even_cashflow': self.first_positive_year(cumulative_cash_flow),
+            'peak_exposure': cumulative_cash_flow.min(axis=1),
+            'total_free_cash_flow': cumulative_cash_flow[:, -1],
+        }
+
+        return cf_infos
+
+    def first_positive_year(self, values):
+        """
+        First year with a positive value of each scenario, NaN if there is none
+        """
+        positive = values > 0
+
+        return np.where(positive.any(axis=1), self.years[np.argmax(positive, axis=1)], np.nan)
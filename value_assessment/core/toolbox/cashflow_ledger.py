@@ -0,0 +1,95 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+import pandas as pd
+
+
+class CashflowLedger():
+    """
+    Preallocated float64 storage of the cash flow columns of a value block, one row per column
+    Columns are fixed at creation, each one is accessed by name as a view on its row
+    """
+    __slots__ = ('years', 'columns', 'values', '_index', '_written')
+
+    def __init__(self, years, columns):
+        """
+        Init of the CashflowLedger class
+        ::params:: years : array of years
+        ::params:: columns : list of column names, the order of the materialized dataframe
+        """
+        self.years = np.asarray(years)
+        self.columns = list(dict.fromkeys(columns))
+        self.values = np.zeros((len(self.columns), len(self.years)))
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._written = np.zeros(len(self.columns), dtype=bool)
+
+    def __getitem__(self, name):
+        return self.values[self._index[name]]
+
+    def __setitem__(self, name, values):
+        index = self._index[name]
+        self.values[index] = values
+        self._written[index] = True
+
+    def __contains__(self, name):
+        """
+        A column is in the ledger once it has been written
+        """
+        return name in self._index and self._written[self._index[name]]
+
+    def __len__(self):
+        return len(self.years)
+
+    def load_dataframe(self, df, fill_value=0.):
+        """
+        Write numeric columns of df aligned on the ledger years, fill_value for missing years
+        """
+        df_years = df['years'].values
+        position = np.searchsorted(self.years, df_years)
+        in_years = position < len(self.years)
+        in_years[in_years] = self.years[position[in_years]
+                                        ] == df_years[in_years]
+
+        for name in df.columns:
+            if name != 'years' and name in self._index:
+                column = np.full(len(self.years), fill_value, dtype=float)
+                column[position[in_years]] = df[name].values[in_years]
+                self[name] = column
+
+    def to_dataframe(self, columns=None):
+        """
+        Materialize written columns (or the given ones) in a dataframe starting with years
+        """
+        if columns is None:
+            index = np.flatnonzero(self._written)
+        else:
+            index = [self._index[name] for name in columns]
+        df = pd.DataFrame(self.values[index].T, columns=[
+                          self.columns[i] for i in index])
+        df.insert(0, 'years', self.years)
+
+        return df
+
+    @staticmethod
+    def numeric_columns(df):
+        """
+        Names of the numeric columns of df except years
+        """
+        return [name for name in df.select_dtypes(include=np.number).columns if name != 'years']
@@ -0,0 +1,74 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+import pandas as pd
+
+
+def get_rollup_layout(df_dict):
+    """
+    Sorted union of years and union of numeric columns other than years of all dataframes, in order of appearance
+    """
+    if len(df_dict) == 0:
+        return np.array([], dtype=int), []
+
+    years = np.unique(np.concatenate(
+        [np.asarray(df['years']) for df in df_dict.values()]))
+    columns = []
+    for df in df_dict.values():
+        columns.extend([col for col in df.columns if col != 'years' and col not in columns
+                        and pd.api.types.is_numeric_dtype(df[col])])
+
+    return years, columns
+
+
+class CashflowRollup():
+    '''
+    Class that stacks the dataframes of children (one per key) into a (children x years x metrics) array
+    aligned on the union of their years, used by the charts to reduce many children at once
+    '''
+
+    def __init__(self, df_dict):
+        """
+        Init of the CashflowRollup class
+        ::params:: df_dict : dict {child key: dataframe with a years column}
+        """
+        self.keys = list(df_dict.keys())
+        self.years, self.metrics = get_rollup_layout(df_dict)
+
+        self.values = np.zeros(
+            (len(self.keys), len(self.years), len(self.metrics)))
+        if len(self.keys) > 0:
+            # all children concatenated once, each row is added at its (child, year) position
+            df_list = list(df_dict.values())
+            stacked_df = pd.concat(df_list, ignore_index=True, sort=False)
+            child_index = np.repeat(np.arange(len(df_list)), [
+                                    len(df) for df in df_list])
+            year_index = np.searchsorted(
+                self.years, stacked_df['years'].to_numpy())
+            np.add.at(self.values, (child_index, year_index), np.nan_to_num(
+                stacked_df.reindex(columns=self.metrics).to_numpy(dtype=float)))
+
+    def get_metric(self, metric):
+        """
+        Values (children x years) of a metric, 0 for children without it
+        """
+        if metric not in self.metrics:
+            return np.zeros((len(self.keys), len(self.years)))
+        return self.values[:, :, self.metrics.index(metric)]
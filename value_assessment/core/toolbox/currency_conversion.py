@@ -0,0 +1,60 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import pandas as pd
+
+
+def get_exchange_rate(exchange_rate_USD_EUR, currency_from='USD', currency_to='EUR'):
+    """
+    Rate to multiply values in currency_from by to get values in currency_to
+    """
+    if currency_from == 'USD' and currency_to == 'EUR':
+        return exchange_rate_USD_EUR
+    elif currency_from == 'EUR' and currency_to == 'USD':
+        return 1 / exchange_rate_USD_EUR
+
+    return 1
+
+
+def is_identity_rate(exchange_rate):
+    return exchange_rate is None or exchange_rate == 1
+
+
+def monetary_columns(df, to_ignore=None):
+    """
+    Columns of df to convert, all columns not in to_ignore
+    """
+    if to_ignore is None:
+        return list(df.columns)
+    return [col for col in df.columns if col not in to_ignore]
+
+
+def scale_dataframe(df, exchange_rate, to_ignore=None):
+    """
+    Return a new dataframe with monetary columns multiplied by exchange_rate, df is not modified
+    Nothing is copied for an identity rate, the result is a shallow copy of df
+    """
+    if is_identity_rate(exchange_rate):
+        return df.copy(deep=False)
+
+    columns = set(monetary_columns(df, to_ignore))
+    # the dataframe is built from its columns : assigning scaled columns on a shallow copy of df can write in the
+    # blocks it shares with df depending on the pandas version
+    return pd.DataFrame({column: df[column].to_numpy(dtype=float) * exchange_rate if column in columns
+                         else df[column].values for column in df.columns}, index=df.index)
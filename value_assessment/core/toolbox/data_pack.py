@@ -0,0 +1,213 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import argparse
+import json
+from glob import glob
+from os import makedirs
+from os.path import join, isdir, isfile, basename, splitext
+import numpy as np
+import pandas as pd
+
+DATA_PACK_VERSION = 1
+# data pack looked for in the data directory of a usecase
+DATA_PACK_NAME = 'data.vapack'
+INDEX_FILE = 'index.json'
+# tables stored in one csv file by product, named <product>_<table>.csv
+PRODUCT_TABLES = ['product_sales_df', 'product_sale_price']
+CSV_ENCODING = 'latin-1'
+
+
+def write_data_pack(tables, path):
+    """
+    Write tables in a data pack directory, with one .npy file by table column whatever the number of products
+    ::params:: tables : dict {table name: {key: DataFrame}}, key is the product name or None for tables without product
+    The DataFrames of a table must have the same columns, their rows are concatenated in the order of the keys
+    """
+    makedirs(path, exist_ok=True)
+    index = {'version': DATA_PACK_VERSION, 'tables': {}}
+
+    for table_number, (table, dfs) in enumerate(tables.items()):
+        keys = list(dfs.keys())
+        columns = list(dfs[keys[0]].columns)
+        for key in keys:
+            if list(dfs[key].columns) != columns:
+                raise Exception(
+                    f'Columns of table {table} for {key} differ from the columns for {keys[0]}')
+
+        offsets = np.cumsum([0] + [len(dfs[key]) for key in keys]).tolist()
+        table_index = {'keys': keys, 'offsets': offsets, 'columns': []}
+        for column_number, column in enumerate(columns):
+            values = pd.concat([dfs[key][column] for key in keys], ignore_index=True) \
+                if len(keys) > 1 else dfs[keys[0]][column]
+            column_index = {'name': column,
+                            'file': f'table{table_number}_column{column_number}.npy'}
+
+            if values.dtype == object:
+                # strings are stored as fixed width unicode to be memory-mapped, missing values in a mask
+                mask = values.isna().values
+                if mask.any():
+                    column_index['mask'] = f'table{table_number}_column{column_number}_mask.npy'
+                    np.save(join(path, column_index['mask']), mask)
+                array = values.fillna('').astype(str).values.astype(str)
+            else:
+                array = values.values
+            np.save(join(path, column_index['file']), array)
+            table_index['columns'].append(column_index)
+
+        index['tables'][table] = table_index
+
+    with open(join(path, INDEX_FILE), 'w') as index_file:
+        json.dump(index, index_file, indent=2)
+
+
+class DataPack():
+    '''
+    Tables of a data pack written by write_data_pack, columns are memory-mapped and only the rows of the
+    requested product are read
+    '''
+
+    def __init__(self, path, mmap_mode='r'):
+        """
+        Init of the DataPack class
+        ::params:: path : data pack directory
+        ::params:: mmap_mode : mode of np.load for the columns, None to read them in memory
+        """
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(join(path, INDEX_FILE)) as index_file:
+            self.index = json.load(index_file)
+        if self.index['version'] != DATA_PACK_VERSION:
+            raise Exception(
+                f"Data pack {path} has version {self.index['version']}, version {DATA_PACK_VERSION} is expected")
+        self.arrays = {}
+        self.positions = {}
+
+    @property
+    def tables(self):
+        return list(self.index['tables'].keys())
+
+    def get_keys(self, table):
+        return self.index['tables'][table]['keys']
+
+    def _get_array(self, file_name):
+        if file_name not in self.arrays:
+            self.arrays[file_name] = np.load(
+                join(self.path, file_name), mmap_mode=self.mmap_mode)
+        return self.arrays[file_name]
+
+    def get_table(self, table, key=None):
+        """
+        DataFrame of table for key
+        """
+        if table not in self.index['tables']:
+            raise Exception(f'Table {table} is not in data pack {self.path}')
+        table_index = self.index['tables'][table]
+        if table not in self.positions:
+            self.positions[table] = {table_key: position for position,
+                                     table_key in enumerate(table_index['keys'])}
+        position = self.positions[table].get(key)
+        if position is None:
+            raise Exception(
+                f'Table {table} of data pack {self.path} has no data for {key}')
+
+        start, end = table_index['offsets'][position], table_index['offsets'][position + 1]
+
+        columns = {}
+        for column_index in table_index['columns']:
+            values = np.array(self._get_array(column_index['file'])[start:end])
+            if values.dtype.kind == 'U':
+                values = values.astype(object)
+                if 'mask' in column_index:
+                    values[self._get_array(column_index['mask'])[start:end]] = np.nan
+            columns[column_index['name']] = values
+
+        # columns are in the order of the dict, passing them again makes pandas reindex the frame
+        return pd.DataFrame(columns)
+
+
+class CsvDataDir():
+    '''
+    Tables of a usecase data directory in csv files, with the same interface as DataPack
+    '''
+
+    def __init__(self, path, encoding=CSV_ENCODING):
+        self.path = path
+        self.encoding = encoding
+
+    def get_table(self, table, key=None):
+        file_name = f'{table}.csv' if key is None else f'{key}_{table}.csv'
+        return pd.read_csv(join(self.path, file_name), encoding=self.encoding)
+
+
+def read_csv_tables(data_dir, product_tables=None, encoding=CSV_ENCODING):
+    """
+    Tables of the csv files of data_dir, as {table name: {key: DataFrame}}
+    Files <product>_<table>.csv of product tables are gathered by table, other files are tables without product
+    """
+    if product_tables is None:
+        product_tables = PRODUCT_TABLES
+
+    tables = {}
+    for file_path in sorted(glob(join(data_dir, '*.csv'))):
+        file_name = splitext(basename(file_path))[0]
+        table, key = file_name, None
+        for product_table in product_tables:
+            if file_name.endswith(f'_{product_table}'):
+                table, key = product_table, file_name[:-len(product_table) - 1]
+                break
+        tables.setdefault(table, {})[key] = pd.read_csv(
+            file_path, encoding=encoding)
+
+    return tables
+
+
+def convert_csv_to_data_pack(data_dir, path=None, product_tables=None, encoding=CSV_ENCODING):
+    """
+    Write the csv files of the usecase data directory data_dir in a data pack, in data_dir by default
+    Returns the path of the data pack
+    """
+    if path is None:
+        path = join(data_dir, DATA_PACK_NAME)
+    tables = read_csv_tables(data_dir, product_tables, encoding)
+    if len(tables) == 0:
+        raise Exception(f'No csv file in {data_dir}')
+    write_data_pack(tables, path)
+
+    return path
+
+
+def open_usecase_data(data_dir):
+    """
+    Tables of a usecase data directory, from its data pack if it has one, from its csv files otherwise
+    """
+    path = join(data_dir, DATA_PACK_NAME)
+    if isdir(path) and isfile(join(path, INDEX_FILE)):
+        return DataPack(path)
+    return CsvDataDir(data_dir)
+
+
+if '__main__' == __name__:
+    parser = argparse.ArgumentParser(
+        description='Convert the csv files of usecase data directories to data packs')
+    parser.add_argument('data_dirs', nargs='+')
+    args = parser.parse_args()
+
+    for data_dir in args.data_dirs:
+        print(f'Data pack written in {convert_csv_to_data_pack(data_dir)}')
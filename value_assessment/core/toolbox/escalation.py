@@ -0,0 +1,59 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+from functools import lru_cache
+import numpy as np
+
+# number of (year_start, year_end, rate, year_ref) escalation vectors kept in memory
+ESCALATION_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=ESCALATION_CACHE_SIZE)
+def _compute_escalation_factor(year_start, year_end, escalation_rate, year_start_escalation_rate):
+    years = np.arange(year_start, year_end + 1)
+    factor = (1.0 + escalation_rate) ** (years - year_start_escalation_rate)
+    # shared between all callers, must not be modified in place
+    factor.flags.writeable = False
+
+    return factor
+
+
+def get_escalation_factor(year_start, year_end, escalation_rate, year_start_escalation_rate):
+    """
+    Return the read-only vector (1 + escalation_rate)**(years - year_start_escalation_rate) for years
+    from year_start to year_end, computed once per process for each set of arguments
+    """
+    if float(year_start_escalation_rate).is_integer():
+        year_start_escalation_rate = int(year_start_escalation_rate)
+    else:
+        year_start_escalation_rate = float(year_start_escalation_rate)
+
+    return _compute_escalation_factor(int(year_start), int(year_end), float(escalation_rate),
+                                      year_start_escalation_rate)
+
+
+def escalation_cache_info():
+    """
+    Return hits, misses, maxsize and currsize of the escalation factor cache
+    """
+    return _compute_escalation_factor.cache_info()
+
+
+def clear_escalation_cache():
+    _compute_escalation_factor.cache_clear()
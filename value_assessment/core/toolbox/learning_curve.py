@@ -0,0 +1,249 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import math
+import numpy as np
+
+
+class LearningCurve():
+    """
+    Class to compute learning curve coefficients in closed form from the segment breakpoints
+    """
+    # below this rank power sums are read from an exact prefix table,
+    # above it the Euler-Maclaurin expansion is used
+    EXACT_RANK_LIMIT = 64
+
+    # Bernoulli terms B2/2!, B4/4!, B6/6! of the Euler-Maclaurin expansion
+    EULER_MACLAURIN_TERMS = (1. / 12., -1. / 720., 1. / 30240.)
+
+    def __init__(self, learning_curve_coefficient, until_product_rank):
+        """
+        Init of the LearningCurve class
+        ::params:: learning_curve_coefficient : list of learning curve coefficients, one per segment
+        ::params:: until_product_rank : list of last product rank of each segment
+        """
+        self.until_product_rank = np.array(until_product_rank, dtype=float)
+        self.exponents = np.array([math.log(coef) / math.log(2)
+                                   for coef in learning_curve_coefficient])
+
+        # segment i covers ranks in ]lower_rank[i], until_product_rank[i]]
+        # with coef(k) = scale[i] * k**exponents[i]
+        self.lower_rank = np.concatenate(
+            ([0.], self.until_product_rank[:-1]))
+        self.scale = np.ones(len(self.until_product_rank))
+        coef_at_rank = self.until_product_rank[0] ** self.exponents[0]
+        for i in range(1, len(self.until_product_rank)):
+            self.scale[i] = coef_at_rank / \
+                self.lower_rank[i] ** self.exponents[i]
+            coef_at_rank = self.scale[i] * \
+                self.until_product_rank[i] ** self.exponents[i]
+
+        # coefficients are normalised on the last rank of the learning curve
+        self.coef_ref = coef_at_rank
+        self.rank_ref = self.until_product_rank.max()
+
+    def power_prefix_sum(self, n, exponent):
+        """
+        Method to compute sum(k**exponent for k in 1..n) for an array of integer ranks n
+        """
+        n = np.asarray(n, dtype=float)
+        limit = self.EXACT_RANK_LIMIT
+        table = np.concatenate(
+            ([0.], np.cumsum(np.arange(1, limit + 1, dtype=float) ** exponent)))
+
+        result = np.empty_like(n)
+        exact = n <= limit
+        result[exact] = table[n[exact].astype(int)]
+
+        x = n[~exact]
+        m = float(limit + 1)
+        if exponent == -1:
+            integral = np.log(x / m)
+        else:
+            integral = (x ** (exponent + 1) - m **
+                        (exponent + 1)) / (exponent + 1)
+        tail = integral + (m ** exponent + x ** exponent) / 2.
+
+        # odd derivatives of k**exponent
+        derivative_factor = exponent
+        for order, term in enumerate(self.EULER_MACLAURIN_TERMS):
+            power = exponent - 2 * order - 1
+            tail += term * derivative_factor * (x ** power - m ** power)
+            derivative_factor *= (power) * (power - 1)
+
+        result[~exact] = table[limit] + tail
+
+        return result
+
+    def cumulative_coef(self, ranks):
+        """
+        Method to compute the sum of normalised learning curve coefficients of products 1 to rank
+        """
+        ranks = np.asarray(ranks, dtype=float)
+        cumulative = np.zeros_like(ranks)
+
+        for i in range(len(self.until_product_rank)):
+            low = self.lower_rank[i]
+            high = np.clip(ranks, low, self.until_product_rank[i])
+            segment_ranks = ranks > low
+            if segment_ranks.any():
+                cumulative[segment_ranks] += self.scale[i] * (
+                    self.power_prefix_sum(high[segment_ranks], self.exponents[i]) -
+                    self.power_prefix_sum(np.array([low]), self.exponents[i])[0])
+
+        cumulative /= self.coef_ref
+
+        # after the last rank the coefficient stays at its reference value
+        cumulative += np.maximum(ranks - self.rank_ref, 0.)
+
+        return cumulative
+
+    def compute_yearly_coef(self, quantity, cumulative_quantity):
+        """
+        Method to compute the average learning curve coefficient of the products delivered each year
+        Years whose cumulative quantity is not a whole positive rank get a null coefficient
+        """
+        quantity = np.asarray(quantity, dtype=float)
+        cumulative_quantity = np.asarray(cumulative_quantity, dtype=float)
+
+        valid = (cumulative_quantity >= 1) & (
+            cumulative_quantity == np.floor(cumulative_quantity))
+        cumulative_coef = np.full(len(cumulative_quantity), np.nan)
+        cumulative_coef[valid] = self.cumulative_coef(
+            cumulative_quantity[valid])
+
+        previous_cumulative_coef = np.concatenate(
+            ([0.], np.nan_to_num(cumulative_coef[:-1], nan=0.)))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            yearly_coef = (cumulative_coef -
+                           previous_cumulative_coef) / quantity
+
+        return np.where(np.isnan(yearly_coef), 0., yearly_coef)
+
+
+class LearningCurveBatch():
+    """
+    Class to compute learning curve coefficients of several products at once, the segments of each product are
+    padded to the largest number of segments with empty segments at its last rank
+    """
+
+    def __init__(self, learning_curve_coefficients, until_product_ranks):
+        """
+        Init of the LearningCurveBatch class
+        ::params:: learning_curve_coefficients : list of the lists of learning curve coefficients of each product
+        ::params:: until_product_ranks : list of the lists of last product rank of the segments of each product
+        """
+        nb_segments = max(len(ranks) for ranks in until_product_ranks)
+        coefficients = np.array([list(coefs) + [1.] * (nb_segments - len(coefs))
+                                 for coefs in learning_curve_coefficients], dtype=float)
+        ranks = np.array([list(ranks) + [ranks[-1]] * (nb_segments - len(ranks))
+                          for ranks in until_product_ranks], dtype=float)
+
+        # arrays (products x segments), padded segments have a null exponent and cover no rank
+        self.until_product_rank = ranks
+        self.exponents = np.log(coefficients) / np.log(2)
+        self.lower_rank = np.concatenate(
+            (np.zeros((len(ranks), 1)), ranks[:, :-1]), axis=1)
+
+        # coef(k) is continuous at each segment start, so the log of the coefficient at the last rank of a segment
+        # is the sum of exponents * log(until_product_rank / lower_rank) of the segments up to it
+        log_lower_rank = np.log(np.maximum(self.lower_rank, 1.))
+        log_coef_at_rank = np.cumsum(
+            self.exponents * (np.log(ranks) - log_lower_rank), axis=1)
+        previous_log_coef = np.concatenate(
+            (np.zeros((len(ranks), 1)), log_coef_at_rank[:, :-1]), axis=1)
+        self.scale = np.exp(previous_log_coef -
+                            self.exponents * log_lower_rank)
+
+        # coefficients are normalised on the last rank of the learning curve of each product
+        self.coef_ref = np.exp(log_coef_at_rank[:, -1])
+        self.rank_ref = ranks.max(axis=1)
+
+    def power_prefix_sum(self, n, exponent):
+        """
+        Method to compute sum(k**exponent for k in 1..n) for an array (products x segments x years) of integer
+        ranks n and an array (products x segments) of exponents, as LearningCurve.power_prefix_sum
+        """
+        n = np.asarray(n, dtype=float)
+        exponent = exponent[:, :, np.newaxis]
+        limit = LearningCurve.EXACT_RANK_LIMIT
+        table = np.concatenate((np.zeros(exponent.shape), np.cumsum(
+            np.arange(1, limit + 1, dtype=float) ** exponent, axis=2)), axis=2)
+        exact = np.take_along_axis(
+            table, np.minimum(n, limit).astype(int), axis=2)
+
+        # Euler-Maclaurin tail above the exact table, evaluated on ranks above the limit only
+        x = np.maximum(n, limit + 1)
+        m = float(limit + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            integral = np.where(exponent == -1, np.log(x / m),
+                                (x ** (exponent + 1) - m ** (exponent + 1)) / (exponent + 1))
+        tail = integral + (m ** exponent + x ** exponent) / 2.
+
+        derivative_factor = exponent
+        for order, term in enumerate(LearningCurve.EULER_MACLAURIN_TERMS):
+            power = exponent - 2 * order - 1
+            tail = tail + term * derivative_factor * \
+                (x ** power - m ** power)
+            derivative_factor = derivative_factor * power * (power - 1)
+
+        return np.where(n <= limit, exact, table[:, :, limit:] + tail)
+
+    def cumulative_coef(self, ranks):
+        """
+        Method to compute the sum of normalised learning curve coefficients of products 1 to rank
+        for an array (products x years) of ranks
+        """
+        ranks = np.asarray(ranks, dtype=float)
+        low = self.lower_rank[:, :, np.newaxis]
+        high = np.clip(ranks[:, np.newaxis, :], low,
+                       self.until_product_rank[:, :, np.newaxis])
+        segment_sums = self.power_prefix_sum(high, self.exponents) - \
+            self.power_prefix_sum(np.broadcast_to(low, high.shape), self.exponents)
+
+        cumulative = (self.scale[:, :, np.newaxis] * segment_sums).sum(axis=1) / \
+            self.coef_ref[:, np.newaxis]
+
+        # after the last rank the coefficient stays at its reference value
+        cumulative += np.maximum(ranks - self.rank_ref[:, np.newaxis], 0.)
+
+        return cumulative
+
+    def compute_yearly_coef(self, quantity, cumulative_quantity):
+        """
+        Method to compute the average learning curve coefficient of the products delivered each year
+        for arrays (products x years), as LearningCurve.compute_yearly_coef
+        """
+        quantity = np.asarray(quantity, dtype=float)
+        cumulative_quantity = np.asarray(cumulative_quantity, dtype=float)
+
+        valid = (cumulative_quantity >= 1) & (
+            cumulative_quantity == np.floor(cumulative_quantity))
+        cumulative_coef = np.where(valid, self.cumulative_coef(
+            np.where(valid, cumulative_quantity, 1.)), np.nan)
+
+        previous_cumulative_coef = np.concatenate(
+            (np.zeros((len(cumulative_coef), 1)), np.nan_to_num(cumulative_coef[:, :-1], nan=0.)), axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            yearly_coef = (cumulative_coef -
+                           previous_cumulative_coef) / quantity
+
+        return np.where(np.isnan(yearly_coef), 0., yearly_coef)
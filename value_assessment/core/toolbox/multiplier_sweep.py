@@ -0,0 +1,189 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+import pandas as pd
+from value_assessment.core.toolbox.cashflow_batch import CashflowBatch
+from value_assessment.core.toolbox.toolboxsumCF import toolboxsumCF
+
+
+class MultiplierSweep():
+    '''
+    Class to evaluate a value block on many opex_multiplier and capex_multiplier samples at once
+
+    opex and capex schedules are proportional to their multiplier and the value block cash flows are linear
+    in opex and capex, so every ledger column is constant + opex_ratio * opex_part + capex_ratio * capex_part.
+    The value block is run three times to get these parts, samples are then linear combinations of them.
+    '''
+    # columns of opex and capex dataframes proportional to the multipliers,
+    # opex_<component> columns do not depend on opex_multiplier
+    OPEX_COLUMNS = ['opex_wo_escalation', 'opex', 'opex_Make', 'opex_Buy', 'opex_Make_wo_LC',
+                    'opex_after_sales']
+    CAPEX_PREFIX = 'capex'
+    CAPEX_COLUMNS = ['contingency']
+
+    def __init__(self, value_block, sales, opex, capex, price, opex_multiplier=100., capex_multiplier=100.):
+        """
+        Init of the MultiplierSweep class
+        ::params:: value_block : value block with configure_data(sales, opex, capex, price), ManufacturerVB
+        ::params:: sales, opex, capex, price : inputs of the value block
+        ::params:: opex_multiplier, capex_multiplier : multipliers (%) used to compute opex and capex
+        """
+        if opex_multiplier == 0 or capex_multiplier == 0:
+            raise Exception(
+                'Multiplier sweep needs opex and capex computed with a non zero multiplier')
+
+        self.value_block = value_block
+        self.sales = sales
+        self.opex = opex
+        self.capex = capex
+        self.price = price
+        self.opex_multiplier = opex_multiplier
+        self.capex_multiplier = capex_multiplier
+
+        self.years = None
+        self.columns = None
+        self.constant = None
+        self.opex_part = None
+        self.capex_part = None
+
+    def compute_parts(self):
+        """
+        Run the value block for (opex, capex) ratios (1, 1), (0, 1) and (1, 0) and deduce the constant,
+        opex and capex parts (columns x years) of its ledger
+        """
+        values_11 = self._run_value_block(1., 1.)
+        values_01 = self._run_value_block(0., 1.)
+        values_10 = self._run_value_block(1., 0.)
+
+        self.years = self.value_block.ledger.years
+        self.columns = list(self.value_block.ledger.columns)
+        self.constant = values_01 + values_10 - values_11
+        self.opex_part = values_11 - values_01
+        self.capex_part = values_11 - values_10
+
+    def compute_column(self, opex_multipliers, capex_multipliers, column='cash_flow'):
+        """
+        Method to compute a ledger column for each sample
+        ::params:: opex_multipliers, capex_multipliers : arrays of multipliers (%) of each sample
+        Returns an array (samples x years)
+        """
+        if self.constant is None:
+            self.compute_parts()
+
+        opex_ratio, capex_ratio = self.get_ratios(
+            opex_multipliers, capex_multipliers)
+        index = self.columns.index(column)
+
+        return self.constant[index] + opex_ratio[:, np.newaxis] * self.opex_part[index] + \
+            capex_ratio[:, np.newaxis] * self.capex_part[index]
+
+    def compute_cf_infos(self, opex_multipliers, capex_multipliers):
+        """
+        Method to compute cashflow infos of each sample
+        Returns a dict of arrays with the keys of ValueBlock cf_infos, NaN where the value block gives 'NA'
+        """
+        cashflow = self.compute_column(
+            opex_multipliers, capex_multipliers, 'cash_flow')
+
+        return CashflowBatch(cashflow, self.years, self.value_block.actor_wacc).compute_cf_infos()
+
+    def get_ratios(self, opex_multipliers, capex_multipliers):
+        opex_ratio, capex_ratio = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(opex_multipliers, dtype=float)) / self.opex_multiplier,
+            np.atleast_1d(np.asarray(capex_multipliers, dtype=float)) / self.capex_multiplier)
+
+        return opex_ratio, capex_ratio
+
+    def _run_value_block(self, opex_ratio, capex_ratio):
+        opex = self.opex.copy()
+        opex_columns = [
+            col for col in opex.columns if col in self.OPEX_COLUMNS]
+        opex[opex_columns] = opex[opex_columns] * opex_ratio
+
+        capex = self.capex.copy()
+        capex_columns = [col for col in capex.columns if col.startswith(
+            self.CAPEX_PREFIX) or col in self.CAPEX_COLUMNS]
+        capex[capex_columns] = capex[capex_columns] * capex_ratio
+
+        self.value_block.configure_data(
+            self.sales.copy(), opex, capex, self.price.copy())
+        self.value_block.compute_cashflow_and_pnl()
+
+        return self.value_block.ledger.values.copy()
+
+
+class MultiplierSweepSum():
+    '''
+    Class to evaluate the sum of several value blocks on opex_multiplier and capex_multiplier samples
+
+    Each value block is swept with its own MultiplierSweep, the cash flows of the value blocks are summed
+    and cashflow infos computed on the sum as in the Sum value block disciplines
+    '''
+    # summed columns used by the cashflow infos of the Sum value block disciplines
+    SUM_COLUMNS = ['cash_flow', 'cumulative_cash_flow',
+                   'cumulative_discounted_cf']
+
+    def __init__(self, sweeps):
+        """
+        Init of the MultiplierSweepSum class
+        ::params:: sweeps : dict {value block name: MultiplierSweep}
+        """
+        if len(sweeps) == 0:
+            raise Exception('Multiplier sweep sum needs at least one value block')
+
+        self.sweeps = sweeps
+
+    def compute_sum_columns(self, opex_multipliers, capex_multipliers):
+        """
+        Method to compute the summed columns for each sample
+        ::params:: opex_multipliers, capex_multipliers : dicts {value block name: array of multipliers (%) of each sample}
+        Returns the years and a dict {column: array (samples x years)}
+        """
+        sum_columns = {}
+        years = None
+        for name, sweep in self.sweeps.items():
+            for column in self.SUM_COLUMNS:
+                values = sweep.compute_column(
+                    opex_multipliers[name], capex_multipliers[name], column)
+                if column in sum_columns:
+                    sum_columns[column] = sum_columns[column] + values
+                else:
+                    sum_columns[column] = values
+            if years is None:
+                years = sweep.years
+            elif not np.array_equal(years, sweep.years):
+                raise Exception(
+                    f'Multiplier sweep sum needs value blocks on the same years, {name} differs')
+
+        return years, sum_columns
+
+    def compute_cf_infos(self, opex_multipliers, capex_multipliers):
+        """
+        Method to compute the cashflow infos of the sum for each sample
+        Returns the list of cashflow infos dicts, one per sample
+        """
+        years, sum_columns = self.compute_sum_columns(
+            opex_multipliers, capex_multipliers)
+        toolbox = toolboxsumCF()
+        nb_samples = len(sum_columns['cash_flow'])
+
+        return [toolbox.compute_cf_df_info(pd.DataFrame(
+            {'years': years, **{column: values[i] for column, values in sum_columns.items()}}))
+            for i in range(nb_samples)]
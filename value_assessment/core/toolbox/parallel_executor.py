@@ -0,0 +1,87 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# sample evaluator built once in each worker process
+_worker_evaluator = None
+
+
+def _init_worker(evaluator_builder, builder_args):
+    global _worker_evaluator
+    _worker_evaluator = evaluator_builder(*builder_args)
+
+
+def _evaluate_sample(sample):
+    return _worker_evaluator.evaluate(sample)
+
+
+class ParallelSampleExecutor():
+    '''
+    Class to evaluate independent samples in a pool of worker processes
+
+    The evaluator is built once in each worker with evaluator_builder(*builder_args), then samples are
+    sent to the workers in chunks and evaluated with evaluator.evaluate(sample).
+    evaluator_builder and builder_args must be picklable (module level class or function).
+    '''
+
+    # number of chunks sent to each worker when chunk_size is not given
+    CHUNKS_BY_PROCESS = 4
+
+    def __init__(self, evaluator_builder, builder_args=(), n_processes=1, chunk_size=None):
+        """
+        Init of the ParallelSampleExecutor class
+        ::params:: evaluator_builder : callable returning an object with an evaluate(sample) method
+        ::params:: builder_args : tuple of arguments of evaluator_builder
+        ::params:: n_processes : number of worker processes, samples are evaluated in this process if 1
+        ::params:: chunk_size : number of samples sent at once to a worker
+        """
+        if n_processes < 1:
+            raise Exception(
+                f'Number of processes must be at least 1, got {n_processes}')
+
+        self.evaluator_builder = evaluator_builder
+        self.builder_args = tuple(builder_args)
+        self.n_processes = n_processes
+        self.chunk_size = chunk_size
+
+    def get_chunk_size(self, nb_samples):
+        if self.chunk_size is not None:
+            return self.chunk_size
+        return max(1, math.ceil(nb_samples / (self.n_processes * self.CHUNKS_BY_PROCESS)))
+
+    def execute(self, samples):
+        """
+        Method to evaluate all samples
+        Returns the list of results in the order of samples
+        """
+        samples = list(samples)
+
+        if self.n_processes == 1 or len(samples) <= 1:
+            evaluator = self.evaluator_builder(*self.builder_args)
+            return [evaluator.evaluate(sample) for sample in samples]
+
+        n_processes = min(self.n_processes, len(samples))
+        with ProcessPoolExecutor(max_workers=n_processes, initializer=_init_worker,
+                                 initargs=(self.evaluator_builder, self.builder_args)) as executor:
+            results = list(executor.map(_evaluate_sample, samples,
+                                        chunksize=self.get_chunk_size(len(samples))))
+
+        return results
@@ -0,0 +1,118 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import numpy as np
+import pandas as pd
+
+YEARLY = 1
+QUARTERLY = 4
+MONTHLY = 12
+
+
+class PeriodIndex():
+    """
+    Periods of the years from year_start to year_end, periods_per_year periods per year
+
+    The 'years' column of the models holds the start of each period in years: the years themselves for yearly
+    periods (integers), year + k / periods_per_year otherwise. Inputs given by year (distributions, payment terms,
+    amortization durations) are converted to periods, yearly flows are split evenly over the periods of the year.
+    """
+
+    def __init__(self, year_start, year_end, periods_per_year=YEARLY):
+        """
+        Init of the PeriodIndex class
+        ::params:: year_start : first year
+        ::params:: year_end : last year, included
+        ::params:: periods_per_year : number of periods in a year, 1 for yearly, 4 for quarterly, 12 for monthly
+        """
+        if int(periods_per_year) != periods_per_year or periods_per_year < 1:
+            raise Exception(
+                f'Number of periods per year must be a positive integer, got {periods_per_year}')
+
+        self.year_start = int(year_start)
+        self.year_end = int(year_end)
+        self.periods_per_year = int(periods_per_year)
+        self.nb_years = self.year_end - self.year_start + 1
+        self.nb_periods = self.nb_years * self.periods_per_year
+
+        # year of each period
+        self.years = np.repeat(np.arange(self.year_start, self.year_end + 1), self.periods_per_year)
+        if self.periods_per_year == YEARLY:
+            self.times = self.years
+        else:
+            self.times = self.year_start + \
+                np.arange(self.nb_periods) / self.periods_per_year
+
+    def __len__(self):
+        return self.nb_periods
+
+    def periods_since(self, year):
+        """
+        Number of periods between the start of year and each period, negative before year
+        """
+        return np.arange(self.nb_periods) - (int(year) - self.year_start) * self.periods_per_year
+
+    def years_since(self, year):
+        """
+        Number of whole years between year and the year of each period, negative before year
+        """
+        return self.years - int(year)
+
+    def nb_periods_in(self, nb_years):
+        return int(round(nb_years * self.periods_per_year))
+
+    def expand(self, yearly_values):
+        """
+        Value of its year for each period, for rates and factors
+        """
+        if self.periods_per_year == YEARLY:
+            return np.asarray(yearly_values)
+        return np.repeat(np.asarray(yearly_values), self.periods_per_year, axis=-1)
+
+    def periodic_rate(self, yearly_rate):
+        """
+        Rate of a period equivalent to yearly_rate compounded over the year
+        """
+        if self.periods_per_year == YEARLY:
+            return yearly_rate
+        return (1. + yearly_rate) ** (1. / self.periods_per_year) - 1.
+
+    def yearly_rate(self, periodic_rate):
+        """
+        Yearly rate equivalent to periodic_rate compounded over the periods of a year
+        """
+        if self.periods_per_year == YEARLY:
+            return periodic_rate
+        return (1. + periodic_rate) ** self.periods_per_year - 1.
+
+    def split_dataframe(self, df, flow_columns):
+        """
+        Dataframe by period from a dataframe by year (with a years column)
+        Columns in flow_columns are split evenly over the periods of their year, the others are repeated
+        """
+        if self.periods_per_year == YEARLY:
+            return df.copy()
+
+        period_df = pd.DataFrame({name: self.expand(df[name].values) for name in df.columns})
+        period_df['years'] = np.repeat(df['years'].values, self.periods_per_year) + \
+            np.tile(np.arange(self.periods_per_year), len(df)) / self.periods_per_year
+        for name in flow_columns:
+            period_df[name] = period_df[name] / self.periods_per_year
+
+        return period_df
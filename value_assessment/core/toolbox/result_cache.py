@@ -0,0 +1,112 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import hashlib
+from collections import OrderedDict, namedtuple
+from copy import deepcopy
+import numpy as np
+import pandas as pd
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _update_hash(hasher, value):
+    if isinstance(value, pd.DataFrame):
+        hasher.update(b'DataFrame')
+        _update_hash(hasher, [str(col) for col in value.columns])
+        _update_hash(hasher, [str(dtype) for dtype in value.dtypes])
+        hasher.update(pd.util.hash_pandas_object(
+            value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        hasher.update(b'Series')
+        _update_hash(hasher, [str(value.name), str(value.dtype)])
+        hasher.update(pd.util.hash_pandas_object(
+            value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        hasher.update(b'ndarray')
+        _update_hash(hasher, [str(value.dtype), value.shape])
+        if value.dtype == object:
+            _update_hash(hasher, value.tolist())
+        else:
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        hasher.update(b'dict')
+        for key in sorted(value, key=repr):
+            _update_hash(hasher, key)
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(type(value).__name__.encode())
+        hasher.update(str(len(value)).encode())
+        for element in value:
+            _update_hash(hasher, element)
+    else:
+        # scalars, strings and None, other objects are hashed by repr
+        hasher.update(f'{type(value).__name__}:{value!r};'.encode())
+
+
+def hash_inputs(*values):
+    """
+    Stable hash of DataFrames, arrays, dicts, lists and scalars, equal for equal contents
+    """
+    hasher = hashlib.sha256()
+    for value in values:
+        _update_hash(hasher, value)
+
+    return hasher.hexdigest()
+
+
+class ResultCache():
+    '''
+    Size-bounded LRU cache of results keyed by the hash of their inputs
+    Results are stored as given and copied once when returned, a stored result must not be modified afterwards
+    '''
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return the result stored for key, None if there is none
+        """
+        if key not in self.results:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.results.move_to_end(key)
+        return deepcopy(self.results[key])
+
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.results))
+
+    def clear(self):
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,166 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import cProfile
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from os import makedirs
+from os.path import join
+import pandas as pd
+
+REPORT_COLUMNS = ['discipline', 'stage', 'calls', 'wall_time', 'cpu_time',
+                  'peak_memory', 'dataframes']
+
+
+class StageProfiler():
+    '''
+    Opt-in recorder of the wall and CPU times of the stages of discipline runs
+
+    When enabled, each stage also records its peak of allocated memory (trace_memory) and the number of
+    DataFrames built (count_dataframes), and whole runs are profiled with cProfile if cprofile_dir is given.
+    Nothing is recorded while disabled.
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.count_dataframes = False
+        self.cprofile_dir = None
+        self.records = {}
+        self.profiles = {}
+        self.dataframe_count = 0
+        self._dataframe_init = None
+        self._started_tracemalloc = False
+
+    def enable(self, trace_memory=False, count_dataframes=False, cprofile_dir=None):
+        """
+        Start recording
+        ::params:: trace_memory : record the peak memory allocated in each stage with tracemalloc
+        ::params:: count_dataframes : record the number of DataFrames built in each stage
+        ::params:: cprofile_dir : directory of the cProfile dump of each discipline, no dump if None
+        """
+        self.disable()
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.count_dataframes = count_dataframes
+        self.cprofile_dir = cprofile_dir
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if count_dataframes:
+            self._count_dataframe_init()
+        if cprofile_dir is not None:
+            makedirs(cprofile_dir, exist_ok=True)
+
+    def disable(self):
+        """
+        Stop recording, recorded stages are kept until reset
+        """
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self._dataframe_init is not None:
+            pd.DataFrame.__init__ = self._dataframe_init
+            self._dataframe_init = None
+
+    def reset(self):
+        self.records = {}
+        self.profiles = {}
+        self.dataframe_count = 0
+
+    def _count_dataframe_init(self):
+        dataframe_init = pd.DataFrame.__init__
+        profiler = self
+
+        @wraps(dataframe_init)
+        def counting_init(*args, **kwargs):
+            profiler.dataframe_count += 1
+            dataframe_init(*args, **kwargs)
+
+        self._dataframe_init = dataframe_init
+        pd.DataFrame.__init__ = counting_init
+
+    @contextmanager
+    def stage(self, discipline, stage):
+        """
+        Record the stage of the run of discipline executed in the with block
+        """
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        dataframe_count_start = self.dataframe_count
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            record = self.records.setdefault((discipline, stage), {
+                'calls': 0, 'wall_time': 0., 'cpu_time': 0., 'peak_memory': 0, 'dataframes': 0})
+            record['calls'] += 1
+            record['wall_time'] += time.perf_counter() - wall_start
+            record['cpu_time'] += time.process_time() - cpu_start
+            record['dataframes'] += self.dataframe_count - dataframe_count_start
+            if self.trace_memory:
+                record['peak_memory'] = max(
+                    record['peak_memory'], tracemalloc.get_traced_memory()[1] - memory_start)
+
+    @contextmanager
+    def profile(self, discipline):
+        """
+        Profile the run of discipline executed in the with block with cProfile
+        Profiles of successive runs are accumulated and dumped in cprofile_dir/<discipline>.prof
+        """
+        if not self.enabled or self.cprofile_dir is None:
+            yield
+            return
+
+        profile = self.profiles.setdefault(discipline, cProfile.Profile())
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(self.get_cprofile_path(discipline))
+
+    def get_cprofile_path(self, discipline):
+        file_name = re.sub(r'[^\w.-]', '_', discipline)
+        return join(self.cprofile_dir, f'{file_name}.prof')
+
+    def get_report(self):
+        """
+        DataFrame of the recorded stages, one row by discipline and stage
+        Times are in seconds, peak memory in bytes
+        """
+        return pd.DataFrame([{'discipline': discipline, 'stage': stage, **record}
+                             for (discipline, stage), record in self.records.items()],
+                            columns=REPORT_COLUMNS)
+
+
+# profiler shared by the value assessment disciplines
+PROFILER = StageProfiler()
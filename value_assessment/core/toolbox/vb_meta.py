@@ -21,14 +21,24 @@ import numpy as np
 import pandas as pd
 from copy import deepcopy
 from value_assessment.core.toolbox.IRR import IRR
+from value_assessment.core.toolbox.cashflow_ledger import CashflowLedger
+from value_assessment.core.toolbox.period_index import PeriodIndex
+from value_assessment.core.toolbox.currency_conversion import get_exchange_rate, is_identity_rate, \
+    scale_dataframe
 
 
 class ValueBlock(object):
     '''
     classdocs
     '''
-
-    def __init__(self, year_start, year_end, actor_name, actor_wacc, exchange_rate_USD_EUR):
+    # cash flow columns computed by the value block, subclasses add their own columns before these ones
+    LEDGER_COLUMNS = ['cash_flow', 'cumulative_cash_flow', 'discounted_cf', 'cumulative_discounted_cf',
+                      'EBIT', 'cumulative_EBIT']
+    # columns not converted by convert_cf_USD_EUR
+    CF_COLUMNS_NOT_TO_CONVERT = ['years', 'year', 'quantity', 'cumulative_quantity',
+                                 'discount',  'pdp_perc',  'lc_coef_new', 'lc_coef_mod', 'Quarters']
+
+    def __init__(self, year_start, year_end, actor_name, actor_wacc, exchange_rate_USD_EUR, periods_per_year=1):
         '''
         Constructor
         '''
@@ -36,18 +46,38 @@ class ValueBlock(object):
 
         self.year_start = year_start
         self.year_end = year_end
+        # cash flows are computed by period, actor_wacc and IRR are yearly rates
+        self.period_index = PeriodIndex(year_start, year_end, periods_per_year)
         self.actor_wacc = actor_wacc
         self.exchange_rate_USD_EUR = exchange_rate_USD_EUR
-        self.cf_df = None
+        self.ledger = None
         self.cf_infos = None
         self.quarterly_rate = None
         self.init_dataframe()
 
+    @property
+    def cf_df(self):
+        """
+        Cash flow dataframe materialized from the ledger
+        """
+        return self.ledger.to_dataframe()
+
     def init_dataframe(self):
-        self.cf_df = pd.DataFrame(
-            {'years': np.arange(self.year_start, self.year_end + 1)})
+        self.init_ledger()
         self.init_additional_column()
 
+    def init_ledger(self, input_columns=None):
+        """
+        Allocate the ledger with input_columns followed by the columns computed by the value block
+        """
+        if input_columns is None:
+            input_columns = []
+        self.ledger = CashflowLedger(self.period_index.times,
+                                     input_columns + self.get_ledger_columns())
+
+    def get_ledger_columns(self):
+        return list(self.LEDGER_COLUMNS)
+
     def configure_actor_wacc(self, wacc):
         self.actor_wacc = wacc
 
@@ -61,16 +91,8 @@ class ValueBlock(object):
         self._compute_costs()
         self._compute_revenues()
 
-        self.cf_df['cash_flow'] = self.cf_df['cash_in'] + \
-            self.cf_df['cash_out']
-
-        self.cf_df['cumulative_cash_flow'] = self.cf_df['cash_flow'].cumsum()
-        years = self.cf_df['years'].astype(int)
-        year_range = pd.Series(
-            range(int(years.values[-1]) - int(years.values[0]) + 1))
-        self.cf_df['discounted_cf'] = self.cf_df['cash_flow'] * \
-            (1 / (1 + self.actor_wacc))**year_range
-        self.cf_df['cumulative_discounted_cf'] = self.cf_df['discounted_cf'].cumsum()
+        self._compute_discounted_cashflow(
+            self.period_index.periodic_rate(self.actor_wacc))
 
         self.compute_cf_df_info()
 
@@ -84,19 +106,19 @@ class ValueBlock(object):
         self._compute_costs()
         self._compute_revenues()
 
-        self.cf_df['cash_flow'] = self.cf_df['cash_in'] + \
-            self.cf_df['cash_out']
+        self._compute_discounted_cashflow(self.quarterly_rate)
+
+        self.compute_cf_df_info()
 
-        self.cf_df['cumulative_cash_flow'] = self.cf_df['cash_flow'].cumsum()
-        # years = self.cf_df['years'].astype(int)
-        year_size = len(list(self.cf_df['years']))
-        year_range = pd.Series(range(year_size))
+    def _compute_discounted_cashflow(self, rate):
+        ledger = self.ledger
 
-        self.cf_df['discounted_cf'] = self.cf_df['cash_flow'] * \
-            (1 / (1 + self.quarterly_rate))**year_range
-        self.cf_df['cumulative_discounted_cf'] = self.cf_df['discounted_cf'].cumsum()
+        ledger['cash_flow'] = ledger['cash_in'] + ledger['cash_out']
 
-        self.compute_cf_df_info()
+        ledger['cumulative_cash_flow'] = np.cumsum(ledger['cash_flow'])
+        ledger['discounted_cf'] = ledger['cash_flow'] * \
+            (1 / (1 + rate))**np.arange(len(ledger))
+        ledger['cumulative_discounted_cf'] = np.cumsum(ledger['discounted_cf'])
 
     def compute_PnL(self):
         """
@@ -105,18 +127,47 @@ class ValueBlock(object):
         self._compute_costs()
         self._compute_revenues()
 
-        self.cf_df['EBIT'] = self.cf_df['cash_in_PnL'] + \
-            self.cf_df['cash_out_PnL']
+        self._compute_EBIT()
 
-        self.cf_df['cumulative_EBIT'] = self.cf_df['EBIT'].cumsum()
+    def _compute_EBIT(self):
+        ledger = self.ledger
+        ledger['EBIT'] = ledger['cash_in_PnL'] + ledger['cash_out_PnL']
+
+        ledger['cumulative_EBIT'] = np.cumsum(ledger['EBIT'])
+
+    def compute_cashflow_and_pnl(self):
+        """
+        Method to compute cashflow and PnL for the value block from one cost and revenue pass,
+        same results as compute_cashflow followed by compute_PnL
+        """
+        self._compute_costs()
+        self._compute_revenues()
+
+        self._compute_discounted_cashflow(
+            self.period_index.periodic_rate(self.actor_wacc))
+        self._compute_EBIT()
+
+        self.compute_cf_df_info()
+
+    def convert_cashflow_and_pnl(self, cashflow_columns, pnl_columns):
+        """
+        Method to convert the computed cashflow and PnL with a single currency conversion
+        Returns the cashflow and PnL dataframes restricted to their columns and the cashflow infos
+        """
+        cf_df = self.convert_cf_USD_EUR(
+            columns=set(cashflow_columns) | set(pnl_columns))
+        cashflow_df = cf_df.loc[:, cf_df.columns.isin(cashflow_columns)]
+        pnl_df = cf_df.loc[:, cf_df.columns.isin(pnl_columns)]
+
+        return cashflow_df, pnl_df, self.convert_cf_infos_USD_EUR()
 
     def compute_cf_df_info(self):
         # define it at value block level
-        cf_df = self.cf_df
+        ledger = self.ledger
 
         cf_info = {}
         # IRR on all years
-        irr_ob = IRR(cf_df['cash_flow'])
+        irr_ob = IRR(ledger['cash_flow'])
         cf_info['irr'] = irr_ob.compute_irr()
         # cf_info['year_min_irr'] = cf_df['years'].values[0]
         # cf_info['year_max_irr'] = cf_df['years'].values[-1]
@@ -124,25 +175,30 @@ class ValueBlock(object):
         if cf_info['irr'] is np.nan:
             # if irr is nan return -99999
             cf_info['irr'] = -99999.
+        elif isinstance(cf_info['irr'], float):
+            # IRR of the periods cash flow is a rate by period
+            cf_info['irr'] = self.period_index.yearly_rate(cf_info['irr'])
 
-        cf_info['npv'] = cf_df['cumulative_discounted_cf'].values[-1]
+        cf_info['npv'] = ledger['cumulative_discounted_cf'][-1]
 
-        if cf_df['years'][cf_df['cumulative_discounted_cf'] > 0].empty:
+        discounted_positive = ledger['cumulative_discounted_cf'] > 0
+        if not discounted_positive.any():
             cf_info['year_break_even_discounted_cashflow'] = 'NA'
         else:
             cf_info['year_break_even_discounted_cashflow'] = int(
-                min(cf_df['years'][cf_df['cumulative_discounted_cf'] > 0])
+                min(ledger.years[discounted_positive])
             )
-        if cf_df['years'][cf_df['cumulative_cash_flow'] > 0].empty:
+        positive = ledger['cumulative_cash_flow'] > 0
+        if not positive.any():
             cf_info['year_break_even_cashflow'] = 'NA'
         else:
             cf_info['year_break_even_cashflow'] = int(
-                min(cf_df['years'][cf_df['cumulative_cash_flow'] > 0])
+                min(ledger.years[positive])
             )
 
         # cf_info['max_peak_exposure'] = min(cf_df['cumulative_cash_flow'])
-        cf_info['peak_exposure'] = min(cf_df['cumulative_cash_flow'])
-        cf_info['total_free_cash_flow'] = cf_df['cumulative_cash_flow'].values[-1]
+        cf_info['peak_exposure'] = min(ledger['cumulative_cash_flow'])
+        cf_info['total_free_cash_flow'] = ledger['cumulative_cash_flow'][-1]
 
         self.cf_infos = cf_info
 
@@ -150,56 +206,60 @@ class ValueBlock(object):
         """
         Generic conversion function for a dataframe from USD to EUR or EUR to USD
         Handle conversion of int, float, dict and DataFrame
+        Values are not copied when the exchange rate is 1
 
         """
-        exchange_rate = 1
-        if currency_from == 'USD' and currency_to == 'EUR':
-            exchange_rate = self.exchange_rate_USD_EUR
-        elif currency_from == 'EUR' and currency_to == 'USD':
-            exchange_rate = 1 / self.exchange_rate_USD_EUR
+        if to_ignore is None:
+            to_ignore = []
+        exchange_rate = get_exchange_rate(
+            self.exchange_rate_USD_EUR, currency_from, currency_to)
 
         if isinstance(initial_values, (int, float)):
             converted_values = initial_values * exchange_rate
         elif isinstance(initial_values, dict):
-            converted_values = deepcopy(initial_values)
-
             # verify df_dict
             if all(isinstance(value, pd.DataFrame) for value in initial_values.values()):
                 # it is a dict of DataFrame, we recursively call the convert
                 # function on each Dataframe
-                for key, value in initial_values.items():
-                    converted_values[key] = self.convert_values_USD_EUR(
-                        initial_values=value, to_ignore=to_ignore, currency_from=currency_from, currency_to=currency_to)
+                converted_values = {key: self.convert_values_USD_EUR(
+                    initial_values=value, to_ignore=to_ignore, currency_from=currency_from, currency_to=currency_to)
+                    for key, value in initial_values.items()}
+            elif is_identity_rate(exchange_rate):
+                converted_values = dict(initial_values)
             else:
                 # regular dict
+                converted_values = deepcopy(initial_values)
                 for key, value in initial_values.items():
                     if key not in to_ignore:
                         converted_values[key] = value * exchange_rate
         elif isinstance(initial_values, pd.DataFrame):
-            converted_values = deepcopy(initial_values)
-
-            converted_values[[col for col in converted_values.columns if col not in to_ignore]] = converted_values[[
-                col for col in converted_values.columns if col not in to_ignore]] * exchange_rate
+            converted_values = scale_dataframe(
+                initial_values, exchange_rate, to_ignore)
         else:
-            raise f'Cannot convert values of type {type(initial_values)}'
+            raise Exception(
+                f'Cannot convert values of type {type(initial_values)}')
 
         return converted_values
 
-    def convert_cf_USD_EUR(self):
+    def convert_cf_USD_EUR(self, columns=None):
         """
-
+        Convert the cash flow dataframe, restricted to columns if given
         """
-        col_not_to_convert = ['years', 'year', 'quantity', 'cumulative_quantity',
-                              'discount',  'pdp_perc',  'lc_coef_new', 'lc_coef_mod', 'Quarters']
+        return self.convert_values_USD_EUR(initial_values=self._get_cf_df(columns), to_ignore=self.CF_COLUMNS_NOT_TO_CONVERT, currency_from='USD', currency_to='EUR')
 
-        return self.convert_values_USD_EUR(initial_values=self.cf_df, to_ignore=col_not_to_convert, currency_from='USD', currency_to='EUR')
+    def _get_cf_df(self, columns=None):
+        if columns is None:
+            return self.cf_df
+        return self.ledger.to_dataframe(
+            [name for name in self.ledger.columns if name in columns and name in self.ledger])
 
     def convert_cf_infos_USD_EUR(self):
         """
 
         """
         col_not_to_convert = ['irr', 'year_min_irr',
-                              'year_max_irr', 'year_break_even']
+                              'year_max_irr', 'year_break_even',
+                              'year_break_even_discounted_cashflow', 'year_break_even_cashflow']
 
         return self.convert_values_USD_EUR(initial_values=self.cf_infos, to_ignore=col_not_to_convert, currency_from='USD', currency_to='EUR')
 
@@ -19,20 +19,26 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 import numpy as np
 from value_assessment.core.toolbox.vb_meta import ValueBlock
+from value_assessment.core.toolbox.cashflow_ledger import CashflowLedger
 
 
 class ManufacturerVB(ValueBlock):
     '''
     classdocs
     '''
+    LEDGER_COLUMNS = ['cumulative_quantity', 'opex_total', 'opex_payment_term_year-1', 'opex_payment_term_year-2',
+                      'opex_payment_term_at_delivery', 'opex_total_pay', 'capex_amort', 'capex_amort_EBIT',
+                      'capex_non_amort', 'cash_out', 'cash_out_PnL', 'Inventory', 'cash_in', 'cash_in_PnL'] + \
+        ValueBlock.LEDGER_COLUMNS
 
-    def __init__(self, year_start, year_end, launch_year, manufacturer_dict, actor_name=None, actor_wacc=None, exchange_rate_USD_EUR=None):
+    def __init__(self, year_start, year_end, launch_year, manufacturer_dict, actor_name=None, actor_wacc=None, exchange_rate_USD_EUR=None,
+                 periods_per_year=1):
         '''
         Constructor
         '''
 
         ValueBlock.__init__(self, year_start,
-                            year_end, actor_name, actor_wacc, exchange_rate_USD_EUR)
+                            year_end, actor_name, actor_wacc, exchange_rate_USD_EUR, periods_per_year)
 
         self.price_product = None
         self.opex = None
@@ -53,98 +59,161 @@ class ManufacturerVB(ValueBlock):
 
         self.sales['quantity'] = np.trunc(self.sales['quantity'])
 
+        # ledger columns : opex, capex, price and sales inputs then computed columns
+        input_df_list = [self.opex, self.capex,
+                         self.price_product, self.sales]
+        input_columns = []
+        for input_df in input_df_list:
+            input_columns.extend(CashflowLedger.numeric_columns(input_df))
+        self.init_ledger(input_columns)
+
+        # sales are loaded first : as with a merge on years and quantity, the quantity of the opex is kept when
+        # both have one, the truncated sales quantity is only used if the opex have none
+        for input_df in [self.sales, self.opex, self.capex, self.price_product]:
+            self.ledger.load_dataframe(input_df)
+        np.nan_to_num(self.ledger.values, copy=False)
+
     def _compute_revenues(self):
         '''
         Compute revenues
         '''
+        ledger = self.ledger
 
         # Test if data are not already created
-        if not 'cash_in' in self.cf_df:
+        if not 'cash_in' in ledger:
             # multiply quantity by price
-            self.cf_df['cash_in'] = self.cf_df['quantity'] * \
-                self.cf_df['sale_price']
+            ledger['cash_in'] = ledger['quantity'] * ledger['sale_price']
 
-            self.cf_df['cash_in_PnL'] = self.cf_df['cash_in']
+            ledger['cash_in_PnL'] = ledger['cash_in']
 
     def _compute_costs(self):
+        ledger = self.ledger
 
         # Test if data are not already created
-        if not 'cash_out' in self.cf_df:
-
-            # Merge dataframe with opex and capex data
-            self.cf_df = self.cf_df.merge(self.opex)
-            self.cf_df = self.cf_df.merge(self.capex)
-
-            # merge with price df
-            self.cf_df = self.cf_df.merge(
-                self.price_product, how='left').fillna(0)
-
-            # merge with sales df
-            self.cf_df = self.cf_df.merge(self.sales, how='left').fillna(0)
+        if not 'cash_out' in ledger:
 
-            self.cf_df['cumulative_quantity'] = self.cf_df['quantity'].cumsum()
+            ledger['cumulative_quantity'] = np.cumsum(ledger['quantity'])
 
             # compute opex
-            self.cf_df = self.compute_opex(self.cf_df)
+            self.compute_opex(ledger)
 
             # Capital depreciation and amort/year for capex
-            len_y = self.year_end + 1 - self.year_start
+            self.compute_capex_amort(ledger)
 
-            self.cf_df['capex_amort'] = 0.
-            self.cf_df['capex_amort_EBIT'] = 0.
-            self.cf_df['capex_non_amort'] = self.cf_df['contingency']
+            # final cash_out
+            ledger['cash_out'] = - ledger['capex_amort'] - ledger['capex_non_amort'] - \
+                ledger['opex_total_pay'] - \
+                ledger['opex_after_sales'] * ledger['quantity']
 
-            for name, values in self.capex.iteritems():
-                if name.startswith('capex_'):
-                    short_name = name.lstrip('capex_')
+            ledger['cash_out_PnL'] = - ledger['capex_non_amort'] - \
+                ledger['capex_amort_EBIT'] - \
+                ledger['opex_total'] - \
+                ledger['opex_after_sales'] * ledger['quantity']
 
-                    if (short_name in self.manufacturer_dict['nb_years_capex_amort']['Distribution Category'].to_list()):
+            # Inventory
+            ledger['Inventory'] = np.cumsum(ledger['opex_total_pay']) - \
+                np.cumsum(ledger['opex_total'])
 
-                        nb_years = self.manufacturer_dict['nb_years_capex_amort'].loc[self.manufacturer_dict[
-                            'nb_years_capex_amort']['Distribution Category'] == short_name, 'Nb years'].values[0]
+    def get_capex_amort_years(self):
+        '''
+        Map each capex Distribution Category to its number of amortization years
+        '''
+        nb_years_capex_amort = self.manufacturer_dict['nb_years_capex_amort']
+        capex_amort_years = {}
+        for category, nb_years in zip(nb_years_capex_amort['Distribution Category'].values,
+                                      nb_years_capex_amort['Nb years'].values):
+            # first definition of a category is used
+            capex_amort_years.setdefault(category, int(nb_years))
 
-                        if nb_years >= 1:
-                            self.cf_df['capex_amort'] += self.cf_df[name]
-                            # pylint: disable=no-member
-                            self.cf_df['capex_amort_EBIT'] += (np.tril(np.triu(np.ones((len_y, len_y)), k=0),
-                                                                       k=nb_years - 1).T * np.array(values / nb_years)).T.sum(axis=0)
-                            # pylint: enable=no-member
-                        else:
-                            self.cf_df['capex_non_amort'] += self.cf_df[name]
-                    else:
-                        self.cf_df['capex_non_amort'] += self.cf_df[name]
+        return capex_amort_years
 
-            # final cash_out
-            self.cf_df['cash_out'] = - self.cf_df['capex_amort'] - self.cf_df['capex_non_amort'] - \
-                self.cf_df['opex_total_pay'] - \
-                self.cf_df['opex_after_sales'] * self.cf_df['quantity']
+    def compute_capex_amort(self, ledger):
+        '''
+        Split capex categories between amortized and non amortized capex
+        and compute straight-line amortization of each amortized category over the periods of its number of years
+        '''
+        capex_amort_years = self.get_capex_amort_years()
+
+        amort_names = []
+        amort_years = []
+        non_amort_names = []
+        for name in self.capex.columns:
+            if name.startswith('capex_'):
+                nb_years = capex_amort_years.get(name.lstrip('capex_'), 0)
+                if nb_years >= 1:
+                    amort_names.append(name)
+                    amort_years.append(nb_years)
+                else:
+                    non_amort_names.append(name)
+
+        ledger['capex_non_amort'] = ledger['contingency'] + \
+            self.sum_columns(ledger, non_amort_names)
+
+        if len(amort_names) == 0:
+            ledger['capex_amort'] = 0.
+            ledger['capex_amort_EBIT'] = 0.
+        else:
+            capex_amort = np.array([ledger[name] for name in amort_names])
+            ledger['capex_amort'] = capex_amort.sum(axis=0)
+            ledger['capex_amort_EBIT'] = self.straight_line_amortization(
+                capex_amort, np.array([self.period_index.nb_periods_in(nb_years) for nb_years in amort_years])).sum(axis=0)
+
+    @staticmethod
+    def sum_columns(ledger, names):
+        total = np.zeros(len(ledger))
+        for name in names:
+            total += ledger[name]
+
+        return total
+
+    @staticmethod
+    def straight_line_amortization(capex, nb_years):
+        '''
+        Amortization (categories x periods) of capex spread over nb_years periods of each category,
+        sum of capex / nb_years over the nb_years last periods computed as a difference of cumulative sums
+        '''
+        nb_categories, nb_periods = capex.shape
+        cumulative = np.zeros((nb_categories, nb_periods + 1))
+        np.cumsum(capex / nb_years[:, np.newaxis],
+                  axis=1, out=cumulative[:, 1:])
 
-            self.cf_df['cash_out_PnL'] = - self.cf_df['capex_non_amort'] - \
-                self.cf_df['capex_amort_EBIT'] - \
-                self.cf_df['opex_total'] - \
-                self.cf_df['opex_after_sales'] * self.cf_df['quantity']
+        periods = np.arange(1, nb_periods + 1)
+        window_start = np.maximum(periods - nb_years[:, np.newaxis], 0)
 
-            # Inventory
-            self.cf_df['Inventory'] = self.cf_df['opex_total_pay'].cumsum() - \
-                self.cf_df['opex_total'].cumsum()
+        return cumulative[:, 1:] - np.take_along_axis(cumulative, window_start, axis=1)
 
-    def compute_opex(self, cf_df):
+    def compute_opex(self, ledger):
         '''
         Compute opex 
 
         '''
-        cf_df['opex_total'] = cf_df['opex'] * cf_df['quantity']
+        payment_term_percentage = self.manufacturer_dict['opex_payment_term_percentage']
+        percentage_year_1 = payment_term_percentage['percentage_at_delivery_year-1'][0] / 100.
+        percentage_year_2 = payment_term_percentage['percentage_at_delivery_year-2'][0] / 100.
 
-        # compute opex payment before deliveries
-        cf_df['opex_payment_term_year-1'] = (cf_df['opex_total'] * self.manufacturer_dict['opex_payment_term_percentage']
-                                             ['percentage_at_delivery_year-1'][0] / 100.).shift(-1).fillna(0)
-        cf_df['opex_payment_term_year-2'] = (cf_df['opex_total'] * self.manufacturer_dict['opex_payment_term_percentage']
-                                             ['percentage_at_delivery_year-2'][0] / 100.).shift(-2).fillna(0)
-        cf_df['opex_payment_term_at_delivery'] = cf_df['opex_total'] * (1 - self.manufacturer_dict['opex_payment_term_percentage']['percentage_at_delivery_year-1'][0] / 100.
-                                                                        - self.manufacturer_dict['opex_payment_term_percentage']['percentage_at_delivery_year-2'][0] / 100.)
+        ledger['opex_total'] = ledger['opex'] * ledger['quantity']
 
-        cf_df['opex_total_pay'] = cf_df['opex_payment_term_at_delivery'] + \
-            cf_df['opex_payment_term_year-1'] + \
-            cf_df['opex_payment_term_year-2']
+        # compute opex payment one and two years before deliveries
+        ledger['opex_payment_term_year-1'] = self.shift_backward(
+            ledger['opex_total'] * percentage_year_1, self.period_index.nb_periods_in(1))
+        ledger['opex_payment_term_year-2'] = self.shift_backward(
+            ledger['opex_total'] * percentage_year_2, self.period_index.nb_periods_in(2))
+        ledger['opex_payment_term_at_delivery'] = ledger['opex_total'] * \
+            (1 - percentage_year_1 - percentage_year_2)
+
+        ledger['opex_total_pay'] = ledger['opex_payment_term_at_delivery'] + \
+            ledger['opex_payment_term_year-1'] + \
+            ledger['opex_payment_term_year-2']
+
+        return ledger
+
+    @staticmethod
+    def shift_backward(values, nb_periods):
+        '''
+        Value of nb_periods later for each period, 0 for the last ones
+        '''
+        shifted = np.zeros_like(values)
+        if nb_periods < len(values):
+            shifted[:len(values) - nb_periods] = values[nb_periods:]
 
-        return cf_df
+        return shifted
@@ -19,6 +19,7 @@ limitations under the License.
 from os.path import join, dirname
 import pandas as pd
 from sos_trades_core.study_manager.study_manager import StudyManager
+from value_assessment.core.toolbox.data_pack import open_usecase_data
 
 
 class Study(StudyManager):
@@ -28,6 +29,9 @@ class Study(StudyManager):
 
     def setup_usecase(self):
 
+        # product tables from the data pack of the data directory if there is one, from its csv files otherwise
+        usecase_data = open_usecase_data(join(dirname(__file__), 'data'))
+
         setup_data_dict = {}
         setup_data_dict[f'{self.study_name}.Business_Manufacturer.Manufacturer.Product_list'] = [
             'Ratatouille', 'Tomato sauce']
@@ -95,15 +99,15 @@ class Study(StudyManager):
         setup_data_dict[f'{self.study_name}.Product_list'] = [
             'Ratatouille', 'Tomato sauce']
         setup_data_dict[f'{self.study_name}.Ratatouille.launch_year'] = 2020
-        setup_data_dict[f'{self.study_name}.Ratatouille.product_sale_price'] = pd.read_csv(
-            join(dirname(__file__), 'data', 'Ratatouille_product_sale_price.csv'))
-        setup_data_dict[f'{self.study_name}.Ratatouille.product_sales_df'] = pd.read_csv(
-            join(dirname(__file__), 'data', 'Ratatouille_product_sales_df.csv'))
+        setup_data_dict[f'{self.study_name}.Ratatouille.product_sale_price'] = usecase_data.get_table(
+            'product_sale_price', 'Ratatouille')
+        setup_data_dict[f'{self.study_name}.Ratatouille.product_sales_df'] = usecase_data.get_table(
+            'product_sales_df', 'Ratatouille')
         setup_data_dict[f'{self.study_name}.Tomato sauce.launch_year'] = 2025
-        setup_data_dict[f'{self.study_name}.Tomato sauce.product_sale_price'] = pd.read_csv(
-            join(dirname(__file__), 'data', 'Tomato sauce_product_sale_price.csv'))
-        setup_data_dict[f'{self.study_name}.Tomato sauce.product_sales_df'] = pd.read_csv(
-            join(dirname(__file__), 'data', 'Tomato sauce_product_sales_df.csv'))
+        setup_data_dict[f'{self.study_name}.Tomato sauce.product_sale_price'] = usecase_data.get_table(
+            'product_sale_price', 'Tomato sauce')
+        setup_data_dict[f'{self.study_name}.Tomato sauce.product_sales_df'] = usecase_data.get_table(
+            'product_sales_df', 'Tomato sauce')
 
         return [setup_data_dict]
 
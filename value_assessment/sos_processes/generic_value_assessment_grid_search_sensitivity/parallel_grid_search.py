@@ -0,0 +1,235 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+# mode: python; py-indent-offset: 4; tab-width: 8; coding:utf-8
+
+import argparse
+from os.path import join, dirname
+from itertools import product
+import numpy as np
+import pandas as pd
+
+from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
+from value_assessment.core.toolbox.parallel_executor import ParallelSampleExecutor
+from value_assessment.core.toolbox.multiplier_sweep import MultiplierSweep, MultiplierSweepSum
+from value_assessment.core.toolbox.data_pack import open_usecase_data
+
+GRID_SEARCH_NAME = 'GridSearch'
+# grid search inputs and outputs evaluated with the multiplier sweep instead of one process execution by sample
+SWEEP_INPUTS = {'OpEx': 'opex_multiplier', 'CapEx': 'capex_multiplier'}
+SWEEP_OUTPUTS = [f'{GRID_SEARCH_NAME}.Business_Manufacturer.cashflow_infos',
+                 f'{GRID_SEARCH_NAME}.Business_Manufacturer.Manufacturer.cashflow_infos']
+
+
+class GridSearchSampleEvaluator():
+    '''
+    Evaluate grid search samples on the generic value assessment process
+    The process is built and its usecase data loaded once, each sample only updates the evaluated inputs
+    '''
+
+    def __init__(self, study_name, usecase_module, eval_output_names,
+                 repo='value_assessment.sos_processes', process_name='generic_value_assessment'):
+        """
+        Init of the GridSearchSampleEvaluator class
+        ::params:: study_name : name of the study built in the worker
+        ::params:: usecase_module : module path of the usecase of the process, with a Study class
+        ::params:: eval_output_names : full names (GridSearch.<name>) of the outputs to return
+        """
+        self.study_name = study_name
+        self.eval_output_names = eval_output_names
+
+        self.ee = ExecutionEngine(study_name)
+        builder = self.ee.factory.get_builder_from_process(repo, process_name)
+        self.ee.factory.set_builders_to_coupling_builder(builder)
+        self.ee.configure()
+
+        usecase = __import__(usecase_module, fromlist=['Study']).Study()
+        usecase.study_name = study_name
+        for setup_data in usecase.setup_usecase():
+            self.ee.load_study_from_input_dict(setup_data)
+
+    def get_full_name(self, grid_search_name):
+        """
+        Full name in the worker study of a grid search variable GridSearch.<name>
+        """
+        return grid_search_name.replace(GRID_SEARCH_NAME, self.study_name, 1)
+
+    def evaluate(self, sample):
+        """
+        Execute the process with sample, a dict {grid search input full name: value}
+        Returns the dict {grid search output full name: value}
+        """
+        self.ee.load_study_from_input_dict(
+            {self.get_full_name(name): value for name, value in sample.items()})
+        self.ee.execute()
+
+        return {name: self.ee.dm.get_value(self.get_full_name(name)) for name in self.eval_output_names}
+
+
+class MultiplierSweepSampleEvaluator(GridSearchSampleEvaluator):
+    '''
+    Evaluate grid search samples on product opex and capex multipliers only
+
+    The process is executed once with all multipliers at 100%, each product value block is then swept with
+    MultiplierSweep and the products are summed as in the Business_Manufacturer sum value blocks.
+    Products absent from a sample keep the multipliers of the usecase.
+    '''
+    SWEEP_MULTIPLIER = 100.
+
+    def __init__(self, study_name, usecase_module, eval_output_names,
+                 repo='value_assessment.sos_processes', process_name='generic_value_assessment'):
+        GridSearchSampleEvaluator.__init__(self, study_name, usecase_module, eval_output_names,
+                                           repo=repo, process_name=process_name)
+
+        self.products = self.ee.dm.get_value(f'{study_name}.Product_list')
+        # multipliers of the usecase, then process executed with the multipliers of the sweep
+        self.usecase_multipliers = {name: self.ee.dm.get_value(self.get_full_name(name))
+                                    for name in self.get_multiplier_names()}
+        self.ee.load_study_from_input_dict({self.get_full_name(name): self.SWEEP_MULTIPLIER
+                                            for name in self.usecase_multipliers})
+        self.ee.execute()
+
+        sweeps = {}
+        for product in self.products:
+            disc = self.ee.dm.get_disciplines_with_name(
+                f'{study_name}.Business_Manufacturer.Manufacturer.{product}')[0]
+            inputs_dict = disc.get_sosdisc_inputs(in_dict=True)
+            sweeps[product] = MultiplierSweep(disc.sales_vb_model, inputs_dict['product_sales_df'],
+                                              inputs_dict['opex'], inputs_dict['capex'],
+                                              inputs_dict['product_sale_price'],
+                                              opex_multiplier=self.SWEEP_MULTIPLIER,
+                                              capex_multiplier=self.SWEEP_MULTIPLIER)
+        self.sweep_sum = MultiplierSweepSum(sweeps)
+
+    def get_multiplier_names(self):
+        """
+        Grid search names of the opex and capex multipliers of each product
+        """
+        return [f'{GRID_SEARCH_NAME}.{discipline}.{product}.{multiplier}'
+                for product in self.products for discipline, multiplier in SWEEP_INPUTS.items()]
+
+    def evaluate_samples(self, samples):
+        """
+        Evaluate all samples with the multiplier sweep
+        Returns the list of dicts {grid search output full name: value}
+        """
+        multipliers = {name: np.array([sample.get(name, value) for sample in samples], dtype=float)
+                       for name, value in self.usecase_multipliers.items()}
+        opex_multipliers = {product: multipliers[f'{GRID_SEARCH_NAME}.OpEx.{product}.opex_multiplier']
+                            for product in self.products}
+        capex_multipliers = {product: multipliers[f'{GRID_SEARCH_NAME}.CapEx.{product}.capex_multiplier']
+                             for product in self.products}
+        cf_infos_list = self.sweep_sum.compute_cf_infos(
+            opex_multipliers, capex_multipliers)
+
+        return [{name: cf_infos for name in self.eval_output_names} for cf_infos in cf_infos_list]
+
+    def evaluate(self, sample):
+        return self.evaluate_samples([sample])[0]
+
+
+def is_multiplier_sweep(design_space, output_names):
+    """
+    True if design_space only contains product opex and capex multipliers and all outputs are
+    computed by the multiplier sweep
+    """
+    for name in design_space['full_name'].values:
+        name_parts = name.split('.')
+        if len(name_parts) != 4 or SWEEP_INPUTS.get(name_parts[1]) != name_parts[-1]:
+            return False
+
+    return all(name in SWEEP_OUTPUTS for name in output_names)
+
+
+def get_grid_samples(design_space):
+    """
+    Samples of the grid defined by design_space (shortest_name, lower_bnd, upper_bnd, nb_points, full_name)
+    Returns the list of dicts {input full name: value}
+    """
+    names = design_space['full_name'].values.tolist()
+    values_list = [np.linspace(lower_bnd, upper_bnd, int(nb_points)) for lower_bnd, upper_bnd, nb_points in zip(
+        design_space['lower_bnd'].values, design_space['upper_bnd'].values, design_space['nb_points'].values)]
+
+    return [dict(zip(names, values)) for values in product(*values_list)]
+
+
+def run_parallel_grid_search(design_space, eval_outputs, n_processes=1, chunk_size=None, study_name='Study',
+                             usecase_module='value_assessment.sos_processes.generic_value_assessment.usecase_RATATOUILLE',
+                             use_multiplier_sweep=True):
+    """
+    Evaluate the grid defined by design_space in n_processes worker processes
+    Offline runner only : the GridSearch evaluator of the grid search sensitivity process is unchanged, this evaluates
+    the same design space and outputs outside of a study. No multi-core speed-up has been recorded yet, see the
+    'grid search' cases of the benchmark suite
+    ::params:: design_space : dataframe of the grid search design space
+    ::params:: eval_outputs : dataframe of the grid search outputs, selected ones are returned
+    ::params:: use_multiplier_sweep : evaluate all samples from one process execution when the design space
+    only contains opex and capex multipliers and the outputs are the Business_Manufacturer cashflow infos
+    Returns a dataframe with one row per sample, input columns then output columns
+    """
+    output_names = eval_outputs.loc[eval_outputs['selected_output'].astype(bool),
+                                    'full_name'].values.tolist()
+    samples = get_grid_samples(design_space)
+
+    if use_multiplier_sweep and is_multiplier_sweep(design_space, output_names):
+        evaluator = MultiplierSweepSampleEvaluator(
+            study_name, usecase_module, output_names)
+        results = evaluator.evaluate_samples(samples)
+
+        return pd.DataFrame([{**sample, **result} for sample, result in zip(samples, results)])
+
+    executor = ParallelSampleExecutor(GridSearchSampleEvaluator,
+                                      (study_name, usecase_module,
+                                       output_names),
+                                      n_processes=n_processes, chunk_size=chunk_size)
+    results = executor.execute(samples)
+
+    return pd.DataFrame([{**sample, **result} for sample, result in zip(samples, results)])
+
+
+def flatten_grid_results(grid_results):
+    """
+    Grid results with dict outputs split in one column <output name>.<key> by key
+    """
+    columns = {}
+    for column in grid_results.columns:
+        values = grid_results[column]
+        if len(values) > 0 and all(isinstance(value, dict) for value in values):
+            for key in values.iloc[0].keys():
+                columns[f'{column}.{key}'] = [value.get(key) for value in values]
+        else:
+            columns[column] = values.values
+
+    return pd.DataFrame(columns)
+
+
+if '__main__' == __name__:
+    parser = argparse.ArgumentParser(
+        description='Evaluate the grid search sensitivity design space outside of a study')
+    parser.add_argument('--n-processes', default=2, type=int)
+    parser.add_argument('--chunk-size', default=None, type=int)
+    parser.add_argument('--no-multiplier-sweep', action='store_true',
+                        help='execute the process for each sample even for opex and capex multipliers only')
+    parser.add_argument('--output', default='grid_search_results.csv',
+                        help='csv file of the results, one row by sample')
+    args = parser.parse_args()
+
+    usecase_data = open_usecase_data(join(dirname(__file__), 'data'))
+    grid_results = run_parallel_grid_search(
+        usecase_data.get_table('design_space'),
+        usecase_data.get_table('eval_outputs'),
+        n_processes=args.n_processes, chunk_size=args.chunk_size,
+        use_multiplier_sweep=not args.no_multiplier_sweep)
+    flatten_grid_results(grid_results).to_csv(args.output, index=False)
@@ -23,7 +23,9 @@ class ProcessBuilder(BaseProcessBuilder):
     # ontology information
     _ontology_data = {
         'label': 'Generic Value Assessment Grid Search Sensitivity Process',
-        'description': '',
+        'description': 'Grid search of the generic value assessment process, samples are executed one after '
+                       'the other in the study. parallel_grid_search.py is an offline runner of the same design '
+                       'space in several processes, outside of the study',
         'version': 'Version 1',
     }
 
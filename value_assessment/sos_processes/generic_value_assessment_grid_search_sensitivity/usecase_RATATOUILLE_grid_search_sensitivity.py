@@ -16,12 +16,12 @@ limitations under the License.
 # mode: python; py-indent-offset: 4; tab-width: 8; coding:utf-8
 
 from os.path import join, dirname
-import pandas as pd
 
 from value_assessment.sos_processes.generic_value_assessment.usecase_RATATOUILLE import (
     Study as ratatouille_usecase,
 )
 from sos_trades_core.study_manager.study_manager import StudyManager
+from value_assessment.core.toolbox.data_pack import open_usecase_data
 
 
 class Study(StudyManager):
@@ -38,19 +38,10 @@ class Study(StudyManager):
         usecase.study_name = f'{self.study_name}.{grid_search_name}'
         setup_data_list = usecase.setup_usecase()
 
-        eval_inputs = pd.read_csv(
-            join(dirname(__file__), 'data', f'eval_inputs.csv'), encoding="latin-1"
-        )
-
-        eval_outputs = pd.read_csv(
-            join(dirname(__file__), 'data', f'eval_outputs.csv'),
-            encoding="latin-1",
-        )
-
-        dspace = pd.read_csv(
-            join(dirname(__file__), 'data', f'design_space.csv'),
-            encoding="latin-1",
-        )
+        usecase_data = open_usecase_data(self.data_dir)
+        eval_inputs = usecase_data.get_table('eval_inputs')
+        eval_outputs = usecase_data.get_table('eval_outputs')
+        dspace = usecase_data.get_table('design_space')
 
         dict_values = {
             f'{self.study_name}.cache_type': 'SimpleCache',
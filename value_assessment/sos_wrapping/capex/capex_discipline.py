@@ -20,15 +20,12 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 from sos_trades_core.api import get_sos_logger
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
-from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, TwoAxesInstanciatedChart
-from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
-from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
-    InstantiatedPlotlyNativeChart
-from sos_trades_core.tools.post_processing.post_processing_tools import format_currency_legend
 from value_assessment.core.capex import Capex
+from value_assessment.core.toolbox.result_cache import ResultCache, hash_inputs
+from value_assessment.core.toolbox.stage_profiler import PROFILER
+from value_assessment.sos_wrapping.post_processing.figure_cache import FigureCache
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 
 
 class CAPEXDiscipline(SoSDiscipline):
@@ -49,6 +46,17 @@ class CAPEXDiscipline(SoSDiscipline):
 
     _maturity = 'Research'
 
+    # opt-in cache of the outputs of the last computed input sets, shared by all instances of the discipline
+    # in the python process, so by all the studies loaded in the same server process
+    RESULT_CACHE = False
+    RESULT_CACHE_SIZE = 64
+    result_cache = ResultCache(RESULT_CACHE_SIZE)
+    # charts already built, shared by all CapEx disciplines
+    FIGURE_CACHE_SIZE = 64
+    figure_cache = FigureCache(FIGURE_CACHE_SIZE)
+    # opt-in stage timers, shared by all value assessment disciplines
+    profiler = PROFILER
+
     DESC_IN = {
         'launch_year': {
             'default': 2025,
@@ -168,9 +176,59 @@ class CAPEXDiscipline(SoSDiscipline):
     }
 
     def run(self):
-        # -- retrieve input data
-        inputs_dict = self.get_sosdisc_inputs()
+        name = self.get_disc_full_name()
+        with self.profiler.profile(name):
+            # -- retrieve input data
+            with self.profiler.stage(name, 'input fetch'):
+                inputs_dict = self.get_sosdisc_inputs()
+
+            # outputs only depend on inputs, reuse them if these inputs were already computed
+            dict_values = None
+            if self.RESULT_CACHE:
+                with self.profiler.stage(name, 'result cache'):
+                    cache_key = hash_inputs(inputs_dict)
+                    dict_values = self.result_cache.get(cache_key)
+            if dict_values is None:
+                with self.profiler.stage(name, 'model compute'):
+                    dict_values = self.compute_outputs(inputs_dict)
+                if self.RESULT_CACHE:
+                    with self.profiler.stage(name, 'result cache'):
+                        self.result_cache.put(cache_key, dict_values)
+            else:
+                # the model and its messages are the ones of a computed run
+                with self.profiler.stage(name, 'model init'):
+                    self.init_model(inputs_dict)
+                    self.capex_model.check_categories(
+                        inputs_dict['capex_input_values'], inputs_dict['capex_distrib_categories'])
+
+            with self.profiler.stage(name, 'output store'):
+                self.store_sos_outputs_values(dict_values)
+
+    def compute_outputs(self, inputs_dict):
+        '''
+        Compute the discipline outputs from its inputs
+        '''
+        self.init_model(inputs_dict)
+
+        capex_input_values_modified = self.capex_model.apply_ratio(
+            inputs_dict['capex_input_values'], inputs_dict['capex_multiplier'])
+
+        capex_df = self.capex_model.compute_capex_by_category(
+            capex_input_values=capex_input_values_modified,
+            capex_distrib_categories=inputs_dict['capex_distrib_categories']
+        )
 
+        # -- Store computed data
+        dict_values = {
+            'capex': capex_df
+        }
+
+        return dict_values
+
+    def init_model(self, inputs_dict):
+        '''
+        Create the capex model of the inputs
+        '''
         if 'year_economical_conditions' in inputs_dict['escalation_capex_df']:
             year_economical_conditions = int(
                 inputs_dict['escalation_capex_df'].iloc[0]['year_economical_conditions'])
@@ -196,22 +254,9 @@ class CAPEXDiscipline(SoSDiscipline):
             logger=self.logger
         )
 
-        capex_input_values_modified = self.capex_model.apply_ratio(
-            inputs_dict['capex_input_values'], inputs_dict['capex_multiplier'])
-
-        capex_df = self.capex_model.compute_capex_by_category(
-            capex_input_values=capex_input_values_modified,
-            capex_distrib_categories=inputs_dict['capex_distrib_categories']
-        )
-
-        # -- Store computed data
-        dict_values = {
-            'capex': capex_df
-        }
-
-        self.store_sos_outputs_values(dict_values)
-
     def get_chart_filter_list(self):
+        # chart dependencies are imported at first use only, computing runs never load them
+        from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
 
         chart_filters = []
 
@@ -233,7 +278,7 @@ class CAPEXDiscipline(SoSDiscipline):
         # For the outputs, making a graph for tco vs year for each range and for specific
         # value of ToT with a shift of five year between then
 
-        instanciated_charts = []
+        chart_list = self.get_chart_filter_list()[0].selected_values
 
         # Overload default value with chart filter
         if filters is not None:
@@ -241,6 +286,24 @@ class CAPEXDiscipline(SoSDiscipline):
                 if chart_filter.filter_key == 'charts':
                     chart_list = chart_filter.selected_values
 
+        # charts only depend on the selection and on these data, reuse them if they were already built
+        chart_inputs = {
+            'capex_input_values': self.get_sosdisc_inputs('capex_input_values'),
+            'capex': self.get_sosdisc_outputs('capex'),
+        }
+
+        return self.figure_cache.get('CapEx charts', (self.sos_name, chart_list), chart_inputs,
+                                     lambda: self.build_post_processing_list(chart_list))
+
+    def build_post_processing_list(self, chart_list):
+        import plotly.graph_objects as go
+        from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, TwoAxesInstanciatedChart
+        from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
+            InstantiatedPlotlyNativeChart
+        from sos_trades_core.tools.post_processing.post_processing_tools import format_currency_legend
+
+        instanciated_charts = []
+
         capex_input_values = self.get_sosdisc_inputs('capex_input_values')
         capex = self.get_sosdisc_outputs('capex')
         total_capex = capex['capex'].sum()
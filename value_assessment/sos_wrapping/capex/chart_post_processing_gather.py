@@ -19,6 +19,7 @@ from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilte
 from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
 import plotly.graph_objects as go
+from value_assessment.sos_wrapping.post_processing.series_encoding import series_values
 
 
 def get_chart_filter_list(discipline):
@@ -149,8 +150,8 @@ def get_instanciated_charts(discipline, filters=None):
 
                     fig.add_trace(
                         go.Bar(
-                            x=years_values.tolist(),
-                            y=capex_values.tolist(),
+                            x=series_values(years_values),
+                            y=series_values(capex_values),
                             name=f'{product}',
                             xaxis='x',
                             yaxis='y',
@@ -207,8 +208,8 @@ def get_instanciated_charts(discipline, filters=None):
 
                     fig.add_trace(
                         go.Bar(
-                            x=years_values.tolist(),
-                            y=capex_values.tolist(),
+                            x=series_values(years_values),
+                            y=series_values(capex_values),
                             # name=f'{label}',
                             name=f'{category}',
                             xaxis='x',
@@ -18,6 +18,7 @@ from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilte
 from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
 import plotly.graph_objects as go
+from value_assessment.sos_wrapping.post_processing.series_encoding import series_values
 from copy import deepcopy
 
 
@@ -105,8 +106,8 @@ def get_instanciated_charts(discipline, filters=None):
 
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=opex_values.tolist(),
+                        x=series_values(years),
+                        y=series_values(opex_values),
                         visible=True,
                         name=f'OpEx {product}'
                     )
@@ -114,8 +115,8 @@ def get_instanciated_charts(discipline, filters=None):
 
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=after_sales_values.tolist(),
+                        x=series_values(years),
+                        y=series_values(after_sales_values),
                         visible=True,
                         name=f'After Sales {product}'
                     )
@@ -160,16 +161,16 @@ def get_instanciated_charts(discipline, filters=None):
 
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=opex_values.tolist(),
+                        x=series_values(years),
+                        y=series_values(opex_values),
                         visible=True,
                         name=f'Total OpEx {product}'
                     )
                 )
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=after_sales_values.tolist(),
+                        x=series_values(years),
+                        y=series_values(after_sales_values),
                         visible=True,
                         name=f'Total After Sales {product}'
                     )
@@ -19,15 +19,11 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
-from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
-from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import (
-    InstantiatedPlotlyNativeChart,
-)
-from sos_trades_core.tools.post_processing.post_processing_tools import (
-    format_currency_legend,
-)
-from value_assessment.core.opex import Opex
-import plotly.graph_objects as go
+from value_assessment.core.opex import Opex, OpexBatch
+from value_assessment.core.toolbox.result_cache import ResultCache, hash_inputs
+from value_assessment.core.toolbox.stage_profiler import PROFILER
+from value_assessment.sos_wrapping.post_processing.figure_cache import FigureCache
+from value_assessment.sos_wrapping.post_processing.series_encoding import series_values
 import pandas as pd
 import numpy as np
 from copy import deepcopy
@@ -51,6 +47,17 @@ class OPEXDiscipline(SoSDiscipline):
 
     _maturity = 'Research'
 
+    # opt-in cache of the outputs of the last computed input sets, shared by all instances of the discipline
+    # in the python process, so by all the studies loaded in the same server process
+    RESULT_CACHE = False
+    RESULT_CACHE_SIZE = 64
+    result_cache = ResultCache(RESULT_CACHE_SIZE)
+    # charts already built, shared by all OpEx disciplines
+    FIGURE_CACHE_SIZE = 64
+    figure_cache = FigureCache(FIGURE_CACHE_SIZE)
+    # opt-in stage timers, shared by all value assessment disciplines
+    profiler = PROFILER
+
     DESC_IN = {
         'launch_year': {
             'default': 2025,
@@ -184,9 +191,129 @@ class OPEXDiscipline(SoSDiscipline):
     }
 
     def run(self):
-        # -- retrieve input data
-        inputs_dict = self.get_sosdisc_inputs()
+        name = self.get_disc_full_name()
+        with self.profiler.profile(name):
+            # -- retrieve input data
+            with self.profiler.stage(name, 'input fetch'):
+                inputs_dict = self.get_sosdisc_inputs()
+
+            # outputs only depend on inputs, reuse them if these inputs were already computed
+            dict_values = None
+            if self.RESULT_CACHE:
+                with self.profiler.stage(name, 'result cache'):
+                    cache_key = hash_inputs(inputs_dict)
+                    dict_values = self.result_cache.get(cache_key)
+            if dict_values is None:
+                with self.profiler.stage(name, 'model compute'):
+                    dict_values = self.compute_outputs(inputs_dict)
+                if self.RESULT_CACHE:
+                    with self.profiler.stage(name, 'result cache'):
+                        self.result_cache.put(cache_key, dict_values)
+            else:
+                # the model is the one of a computed run
+                with self.profiler.stage(name, 'model init'):
+                    self.init_model(inputs_dict, self.get_model_inputs(inputs_dict))
+
+            with self.profiler.stage(name, 'output store'):
+                self.store_sos_outputs_values(dict_values)
+
+    def compute_outputs(self, inputs_dict):
+        '''
+        Compute the discipline outputs from its inputs
+        '''
+        model_inputs = self.get_model_inputs(inputs_dict)
+        self.init_model(inputs_dict, model_inputs)
 
+        opex_df = self.opex_model.compute_opex_by_category(
+            opex_by_category=inputs_dict['opex_by_category'],
+            sales=inputs_dict['product_sales_df'],
+            opex_multiplier=inputs_dict['opex_multiplier'] / 100.0,
+            distrib_after_sales_opex_unit=model_inputs['after_sales_opex_unit'],
+        )
+
+        return self.get_outputs(opex_df)
+
+    def init_model(self, inputs_dict, model_inputs):
+        '''
+        Create the opex model of the inputs
+        '''
+        self.opex_model = Opex(
+            escalation_rate=model_inputs['escalation_rate'],
+            year_start_escalation_rate=model_inputs['year_start_escalation_rate'],
+            launch_year=inputs_dict['launch_year'],
+            year_start=inputs_dict['year_start'],
+            year_end=inputs_dict['year_end'],
+            learning_curve_dict=model_inputs['learning_curve_dict'],
+        )
+
+    @classmethod
+    def compute_outputs_batch(cls, inputs_dict_list):
+        '''
+        Compute the outputs of the OPEX disciplines of many products from their inputs, the same as compute_outputs
+        Products sharing years, escalation and sales years are computed at once with OpexBatch
+        Standalone driver API: the process and the grid search do not call it, drivers evaluating many products
+        outside the execution engine call it with the discipline inputs dicts instead of running one discipline by product
+        Returns the list of the outputs dicts, in the order of inputs_dict_list
+        '''
+        model_inputs_list = [cls.get_model_inputs(
+            inputs_dict) for inputs_dict in inputs_dict_list]
+
+        batches = {}
+        for i, (inputs_dict, model_inputs) in enumerate(zip(inputs_dict_list, model_inputs_list)):
+            key = (inputs_dict['year_start'], inputs_dict['year_end'], model_inputs['escalation_rate'],
+                   model_inputs['year_start_escalation_rate'],
+                   tuple(inputs_dict['product_sales_df']['years'].values.tolist()))
+            batches.setdefault(key, []).append(i)
+
+        outputs = [None] * len(inputs_dict_list)
+        for (year_start, year_end, escalation_rate, year_start_escalation_rate, sales_years), indices in batches.items():
+            components = list(dict.fromkeys(
+                component for i in indices for component in inputs_dict_list[i]['opex_by_category']['components']))
+            component_index = {component: j for j,
+                               component in enumerate(components)}
+            opex_by_category = np.full((len(indices), len(components)), np.nan)
+            product_components = []
+            for row, i in enumerate(indices):
+                opex_by_category_df = inputs_dict_list[i]['opex_by_category']
+                opex_by_category[row, [component_index[component] for component in opex_by_category_df['components']]] = \
+                    opex_by_category_df['opex'].values.astype(float)
+                product_components.append(
+                    list(dict.fromkeys(opex_by_category_df['components'])))
+
+            # after sales distributions use their last value after their end, they are padded with it
+            distrib_length = max(len(model_inputs_list[i]['after_sales_opex_unit']) for i in indices)
+            after_sales_opex_unit = np.array([np.pad(model_inputs_list[i]['after_sales_opex_unit'],
+                                                     (0, distrib_length - len(model_inputs_list[i]['after_sales_opex_unit'])),
+                                                     mode='edge') for i in indices])
+
+            opex_batch_model = OpexBatch(
+                escalation_rate=escalation_rate,
+                year_start_escalation_rate=year_start_escalation_rate,
+                launch_years=[inputs_dict_list[i]['launch_year']
+                              for i in indices],
+                year_start=year_start,
+                year_end=year_end,
+                learning_curve_dicts=[model_inputs_list[i]['learning_curve_dict'] for i in indices])
+            arrays = opex_batch_model.compute_opex_arrays(
+                opex_by_category=opex_by_category,
+                sales_years=np.array(sales_years),
+                sales_quantity=np.array([inputs_dict_list[i]['product_sales_df']['quantity'].values
+                                         for i in indices], dtype=float),
+                distrib_after_sales_opex_unit=after_sales_opex_unit,
+                opex_multiplier=np.array([inputs_dict_list[i]['opex_multiplier'] / 100.0 for i in indices]))
+            opex_df_list = opex_batch_model.get_opex_dataframes(
+                arrays, components, product_components)
+
+            for i, opex_df in zip(indices, opex_df_list):
+                outputs[i] = cls.get_outputs(opex_df)
+
+        return outputs
+
+    @staticmethod
+    def get_model_inputs(inputs_dict):
+        '''
+        Escalation, learning curve and after sales distribution of the opex models from the discipline inputs
+        '''
         if 'year_economical_conditions' in inputs_dict['escalation_opex_df']:
             year_economical_conditions = int(
                 inputs_dict['escalation_opex_df'].iloc[0]['year_economical_conditions']
@@ -221,26 +348,20 @@ class OPEXDiscipline(SoSDiscipline):
                 learning_curve_product_dict['until_product_rank']
             ]
 
-        self.opex_model = Opex(
-            escalation_rate=yearly_escalation_rate,
-            year_start_escalation_rate=year_economical_conditions,
-            launch_year=inputs_dict['launch_year'],
-            year_start=inputs_dict['year_start'],
-            year_end=inputs_dict['year_end'],
-            learning_curve_dict=learning_curve_product_dict,
-        )
-
         after_sales_opex_unit = (
             np.array(list(inputs_dict['after_sales_opex_unit'].values())) / 100.0
         )
 
-        opex_df = self.opex_model.compute_opex_by_category(
-            opex_by_category=inputs_dict['opex_by_category'],
-            sales=inputs_dict['product_sales_df'],
-            opex_multiplier=inputs_dict['opex_multiplier'] / 100.0,
-            distrib_after_sales_opex_unit=after_sales_opex_unit,
-        )
+        return {'escalation_rate': yearly_escalation_rate,
+                'year_start_escalation_rate': year_economical_conditions,
+                'learning_curve_dict': learning_curve_product_dict,
+                'after_sales_opex_unit': after_sales_opex_unit}
 
+    @staticmethod
+    def get_outputs(opex_df):
+        '''
+        Outputs of the discipline from the opex dataframe of the model
+        '''
         # opex for all products
         opex_total = opex_df.drop(columns=['learning_curve_coef'])
 
@@ -261,9 +382,11 @@ class OPEXDiscipline(SoSDiscipline):
             ),
             'opex_total': opex_total,
         }
-        self.store_sos_outputs_values(dict_values)
+        return dict_values
 
     def get_chart_filter_list(self):
+        # chart dependencies are imported at first use only, computing runs never load them
+        from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
 
         chart_filters = []
 
@@ -284,7 +407,7 @@ class OPEXDiscipline(SoSDiscipline):
         # For the outputs, making a graph for tco vs year for each range and for specific
         # value of ToT with a shift of five year between then
 
-        instanciated_charts = []
+        chart_list = self.get_chart_filter_list()[0].selected_values
 
         # Overload default value with chart filter
         if filters is not None:
@@ -292,6 +415,29 @@ class OPEXDiscipline(SoSDiscipline):
                 if chart_filter.filter_key == 'charts':
                     chart_list = chart_filter.selected_values
 
+        # charts only depend on the selection and on these data, reuse them if they were already built
+        chart_inputs = {
+            'opex': self.get_sosdisc_outputs('opex'),
+            'opex_total': self.get_sosdisc_outputs('opex_total'),
+            'escalation_opex_df': self.get_sosdisc_inputs('escalation_opex_df'),
+            'opex_by_category': self.get_sosdisc_inputs('opex_by_category'),
+            'opex_multiplier': self.get_sosdisc_inputs('opex_multiplier'),
+        }
+
+        return self.figure_cache.get('OpEx charts', (self.sos_name, chart_list), chart_inputs,
+                                     lambda: self.build_post_processing_list(chart_list))
+
+    def build_post_processing_list(self, chart_list):
+        import plotly.graph_objects as go
+        from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import (
+            InstantiatedPlotlyNativeChart,
+        )
+        from sos_trades_core.tools.post_processing.post_processing_tools import (
+            format_currency_legend,
+        )
+
+        instanciated_charts = []
+
         name = self.sos_name
         opex_unit = self.get_sosdisc_outputs('opex')
         opex_total = self.get_sosdisc_outputs('opex_total')
@@ -316,14 +462,14 @@ class OPEXDiscipline(SoSDiscipline):
 
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(), y=opex_values.tolist(), visible=True, name='OpEx'
+                    x=series_values(years), y=series_values(opex_values), visible=True, name='OpEx'
                 )
             )
 
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=after_sales_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(after_sales_values),
                     visible=True,
                     name='After Sales',
                 )
@@ -391,7 +537,7 @@ class OPEXDiscipline(SoSDiscipline):
                 fig.add_trace(
                     go.Bar(
                         x=[name],
-                        y=opex_values.values.tolist(),
+                        y=series_values(opex_values),
                         name=f'{component}',
                         text=f'{component}',
                         textposition='inside',
@@ -455,16 +601,16 @@ class OPEXDiscipline(SoSDiscipline):
 
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=opex_make_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex_make_values),
                     visible=True,
                     name=f'Operating Expenditure Make',
                 )
             )
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=opex_buy_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex_buy_values),
                     visible=True,
                     name=f'Operating Expenditure Buy',
                 )
@@ -472,8 +618,8 @@ class OPEXDiscipline(SoSDiscipline):
 
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=after_sales_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(after_sales_values),
                     visible=True,
                     name='After Sales',
                 )
@@ -516,16 +662,16 @@ class OPEXDiscipline(SoSDiscipline):
 
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=opex_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex_values),
                     visible=True,
                     name='Total OpEx',
                 )
             )
             fig.add_trace(
                 go.Bar(
-                    x=years.tolist(),
-                    y=after_sales_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(after_sales_values),
                     visible=True,
                     name='Total After Sales',
                 )
@@ -568,8 +714,8 @@ class OPEXDiscipline(SoSDiscipline):
 
             fig.add_trace(
                 go.Scatter(
-                    x=years.tolist(),
-                    y=opex_make_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex_make_values),
                     visible=True,
                     name=f'OpEx Make',
                     mode='lines',
@@ -577,8 +723,8 @@ class OPEXDiscipline(SoSDiscipline):
             )
             fig.add_trace(
                 go.Scatter(
-                    x=years.tolist(),
-                    y=opex_make_wo_lc_values.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex_make_wo_lc_values),
                     visible=True,
                     name=f'OpEx Make without Learning Curve',
                     mode='lines',
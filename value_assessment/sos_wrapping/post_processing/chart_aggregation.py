@@ -0,0 +1,72 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import math
+import numpy as np
+
+OTHER_NAME = 'Other'
+
+# chart filter of the sum disciplines switching the aggregation of their charts, off by default
+AGGREGATION_FILTER_KEY = 'Chart aggregation'
+AGGREGATION_FILTER_VALUES = ['Off', 'On']
+
+
+def select_top_contributors(keys, values, max_contributors, other_name=OTHER_NAME):
+    """
+    Keep the max_contributors - 1 keys with the largest sum of absolute values and sum the others in other_name
+    ::params:: keys : list of contributor names
+    ::params:: values : array (contributors x ...) of their values
+    Returns the kept keys and the array of their values, in the order of keys, other_name last
+    """
+    values = np.asarray(values, dtype=float)
+    if len(keys) <= max_contributors:
+        return list(keys), values
+
+    weights = np.abs(values).reshape(len(keys), -1).sum(axis=1)
+    # stable sort to keep the first keys among equal weights
+    top_index = np.sort(np.argsort(-weights, kind='stable')
+                        [:max(max_contributors - 1, 0)])
+    other_mask = np.ones(len(keys), dtype=bool)
+    other_mask[top_index] = False
+
+    top_keys = [keys[i] for i in top_index] + [other_name]
+    top_values = np.concatenate(
+        [values[top_index], values[other_mask].sum(axis=0, keepdims=True)])
+
+    return top_keys, top_values
+
+
+def bin_years(years, values, max_points):
+    """
+    Sum values over consecutive bins of years so that there are at most max_points bins
+    ::params:: years : sorted array of years
+    ::params:: values : array (... x years)
+    Returns the list of bin labels ('2020-2024', or the year for bins of one year) and the array (... x bins)
+    """
+    years = np.asarray(years)
+    values = np.asarray(values, dtype=float)
+    if len(years) <= max_points:
+        return years, values
+
+    bin_size = math.ceil(len(years) / max_points)
+    bin_starts = np.arange(0, len(years), bin_size)
+    binned_values = np.add.reduceat(values, bin_starts, axis=-1)
+    bin_labels = [f'{years[start]}-{years[min(start + bin_size, len(years)) - 1]}' for start in bin_starts]
+
+    return bin_labels, binned_values
@@ -0,0 +1,71 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+GATHER_SUFFIX = '_gather'
+DOLLARS_SUFFIX = '_dollars'
+
+
+class ChartOutputs():
+    '''
+    Lazy access to the outputs of a discipline used by its post-processing charts
+    An output is fetched at its first access only, under its name in the selected currency, and is not copied:
+    charts must not modify it
+    '''
+
+    # outputs that exist in $ under a _dollars name, before the _gather suffix for gathered outputs
+    CURRENCY_OUTPUTS = ['cashflow_infos', 'cashflow_product', 'pnl_product']
+
+    def __init__(self, get_outputs, output_names, currency='€'):
+        """
+        Init of the ChartOutputs class
+        ::params:: get_outputs : function returning the value of an output from its name (get_sosdisc_outputs)
+        ::params:: output_names : names of the outputs of the discipline
+        ::params:: currency : '€' or '$'
+        """
+        self.get_outputs = get_outputs
+        self.output_names = set(output_names)
+        self.currency = currency
+        self.values = {}
+
+    def get_currency_name(self, name):
+        """
+        Name of the output in the selected currency
+        """
+        if self.currency != '$':
+            return name
+        base_name = name[:-len(GATHER_SUFFIX)
+                         ] if name.endswith(GATHER_SUFFIX) else name
+        if base_name not in self.CURRENCY_OUTPUTS:
+            return name
+
+        return base_name + DOLLARS_SUFFIX + name[len(base_name):]
+
+    def has(self, name):
+        return self.get_currency_name(name) in self.output_names
+
+    def get(self, name):
+        """
+        Value of the output in the selected currency, None if the discipline has no such output
+        """
+        if name not in self.values:
+            currency_name = self.get_currency_name(name)
+            self.values[name] = self.get_outputs(
+                currency_name) if currency_name in self.output_names else None
+
+        return self.values[name]
@@ -0,0 +1,120 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import json
+from copy import deepcopy
+from value_assessment.core.toolbox.result_cache import ResultCache, hash_inputs
+from value_assessment.sos_wrapping.post_processing import series_encoding
+from value_assessment.sos_wrapping.post_processing.series_encoding import encode_typed_arrays, decode_typed_arrays
+
+
+def figure_to_json(fig, min_size=None):
+    """
+    Compact JSON of a plotly figure, numeric series of at least min_size values are base64 typed arrays
+    """
+    # plotly is only imported when charts are built, the cache is created with the disciplines
+    from plotly.utils import PlotlyJSONEncoder
+
+    return json.dumps(encode_typed_arrays(fig.to_plotly_json(), min_size), cls=PlotlyJSONEncoder)
+
+
+def figure_from_json(fig_json):
+    """
+    Plotly figure from figure_to_json output, not validated again as it comes from a valid figure
+    With NUMPY_SERIES, typed arrays are kept in the figure so that its JSON handed to the GUI carries them,
+    otherwise they are decoded to numpy arrays
+    """
+    import plotly.graph_objects as go
+
+    fig_dict = json.loads(fig_json)
+    if not series_encoding.NUMPY_SERIES:
+        fig_dict = decode_typed_arrays(fig_dict)
+
+    return go.Figure(fig_dict, _validate=False)
+
+
+def serialize_chart(chart):
+    """
+    Serialized chart: its plotly figures as compact JSON strings and its other attributes
+    """
+    import plotly.graph_objects as go
+
+    attributes = vars(chart)
+    figures = {attr: figure_to_json(value) for attr, value in attributes.items()
+               if isinstance(value, go.Figure)}
+    others = {attr: value for attr, value in attributes.items()
+              if attr not in figures}
+
+    return type(chart), figures, others
+
+
+def deserialize_chart(serialized_chart):
+    """
+    New chart from a serialized chart
+    """
+    chart_class, figures, others = serialized_chart
+    chart = chart_class.__new__(chart_class)
+    vars(chart).update(others)
+    for attr, fig_json in figures.items():
+        setattr(chart, attr, figure_from_json(fig_json))
+
+    return chart
+
+
+class FigureCache():
+    '''
+    Size-bounded LRU cache of post-processing charts keyed on (chart name, filter selection, chart inputs)
+    Charts are stored serialized and copied by the underlying ResultCache, built and cached charts are both
+    returned from their serialized form so that their figures carry the same typed arrays
+    '''
+
+    def __init__(self, maxsize=256):
+        self.charts = ResultCache(maxsize)
+
+    def get(self, chart_name, selection, chart_inputs, build_charts):
+        """
+        Chart or list of charts built by build_charts() for these selection and inputs, from cache if it was already built
+        ::params:: chart_name : name identifying the charts in the cache
+        ::params:: selection : filter values the charts depend on
+        ::params:: chart_inputs : data the charts are built from (dataframes, dicts, scalars), fingerprinted for the key
+        ::params:: build_charts : function without argument building the chart or the list of charts
+        """
+        key = hash_inputs(chart_name, selection, chart_inputs)
+        serialized_charts = self.charts.get(key)
+        if serialized_charts is None:
+            charts = build_charts()
+            if isinstance(charts, list):
+                serialized_charts = [serialize_chart(chart) for chart in charts]
+            elif charts:
+                serialized_charts = serialize_chart(charts)
+            else:
+                return charts
+            self.charts.put(key, serialized_charts)
+            # the cache keeps the serialized charts as given, the returned charts are built from a copy
+            serialized_charts = deepcopy(serialized_charts)
+
+        if isinstance(serialized_charts, list):
+            return [deserialize_chart(serialized_chart) for serialized_chart in serialized_charts]
+        return deserialize_chart(serialized_charts)
+
+    def cache_info(self):
+        return self.charts.cache_info()
+
+    def clear(self):
+        self.charts.clear()
@@ -22,7 +22,12 @@ from sos_trades_core.tools.post_processing.post_processing_tools import align_tw
 from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
 import pandas as pd
+import numpy as np
 from copy import deepcopy
+from value_assessment.core.toolbox.cashflow_rollup import CashflowRollup
+from value_assessment.sos_wrapping.post_processing.figure_cache import FigureCache
+from value_assessment.sos_wrapping.post_processing.series_encoding import series_values
+from value_assessment.sos_wrapping.post_processing.chart_aggregation import select_top_contributors, bin_years
 
 
 class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
@@ -30,8 +35,53 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
     """ Class to host standard ValueAssessment post post processing charts
     """
 
-    def __init__(self):
+    # outputs needed by each chart of the value block disciplines (names in €, see ChartOutputs)
+    # a chart is only built when it is selected and all its outputs exist
+    CHART_OUTPUTS = {
+        'Cashflow': ['cashflow_infos', 'cashflow_product'],
+        'Cash_in / Cash_out': ['cashflow_infos', 'cashflow_product'],
+        'Detailed Cashflow': ['cashflow_product_gather'],
+        'Summary infos table': ['hypothesis_summary', 'cashflow_infos'],
+        'Quantity': ['cashflow_product'],
+        'Price and Cost': ['cashflow_product'],
+        'Profit and Loss': ['pnl_product'],
+        'Profit and Loss Waterfall': ['pnl_product'],
+        'Value Assessment': ['cashflow_infos', 'cashflow_infos_gather'],
+        'OPEX': ['cashflow_product'],
+        'CAPEX': ['cashflow_product'],
+    }
+
+    # charts with many contributors or years can be aggregated so that their size stays bounded:
+    # top contributors and an Other bucket and bins of years.
+    # Off by default, the sum disciplines switch it on with their Chart aggregation filter
+    AGGREGATE_CHARTS = False
+    MAX_TRACES = 20
+    MAX_YEAR_POINTS = 60
+
+    # charts already built, shared by all disciplines
+    FIGURE_CACHE_SIZE = 256
+    figure_cache = FigureCache(FIGURE_CACHE_SIZE)
+
+    @classmethod
+    def get_charts_to_build(cls, graphs_list, chart_outputs):
+        """
+        Charts of graphs_list that are selected and whose outputs all exist in chart_outputs
+        """
+        return [chart for chart in graphs_list
+                if all(chart_outputs.has(output) for output in cls.CHART_OUTPUTS.get(chart, []))]
+
+    def get_cached_chart(self, chart_name, selection, chart_inputs, build_chart):
+        """
+        Chart built by build_chart(), from the figure cache if it was already built with the same selection and inputs
+        ::params:: selection : tuple of the discipline name and filter values the chart depends on
+        ::params:: chart_inputs : dict of the data the chart is built from
+        """
+        return self.figure_cache.get(chart_name, selection, chart_inputs, build_chart)
+
+    def __init__(self, aggregate_charts=None):
         super().__init__(go.Figure())
+        if aggregate_charts is not None:
+            self.AGGREGATE_CHARTS = aggregate_charts
         self.default_chart = InstantiatedPlotlyNativeChart(go.Figure())
         self.default_legend = self.default_chart.get_default_legend_layout()
 
@@ -68,8 +118,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 free_cashflow = cf_df['cash_flow'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=free_cashflow.tolist(),
+                        x=series_values(years),
+                        y=series_values(free_cashflow),
                         name=f'Free Cashflow',
                         xaxis='x',
                         yaxis='y',
@@ -83,8 +133,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 cumul_discout_cashflow = cf_df['cumulative_discounted_cf'].values
                 fig.add_trace(
                     go.Scatter(
-                        x=years.tolist(),
-                        y=cumul_discout_cashflow.tolist(),
+                        x=series_values(years),
+                        y=series_values(cumul_discout_cashflow),
                         name=f'Cumulative Discounted CashFlow',
                         xaxis='x',
                         yaxis='y2',
@@ -99,8 +149,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 cumul_free_cashflow = cf_df['cumulative_cash_flow'].values
                 fig.add_trace(
                     go.Scatter(
-                        x=years.tolist(),
-                        y=cumul_free_cashflow.tolist(),
+                        x=series_values(years),
+                        y=series_values(cumul_free_cashflow),
                         name=f'Cumulative Free CashFlow',
                         xaxis='x',
                         yaxis='y2',
@@ -171,8 +221,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 cash_in = cf_df['cash_in'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=cash_in.tolist(),
+                        x=series_values(years),
+                        y=series_values(cash_in),
                         name=f'Cash in',
                         xaxis='x',
                         yaxis='y',
@@ -185,8 +235,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 cash_out = cf_df['cash_out'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=cash_out.tolist(),
+                        x=series_values(years),
+                        y=series_values(cash_out),
                         name=f'Cash out',
                         xaxis='x',
                         yaxis='y',
@@ -243,8 +293,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                     cumul_discout_cashflow = cf_df['cumulative_discounted_cf'].values
                     fig.add_trace(
                         go.Scatter(
-                            x=years.tolist(),
-                            y=cumul_discout_cashflow.tolist(),
+                            x=series_values(years),
+                            y=series_values(cumul_discout_cashflow),
                             name=f'{key}',
                             xaxis='x',
                             yaxis='y',
@@ -259,8 +309,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                     cumul_free_cashflow = cf_df['cumulative_cash_flow'].values
                     fig.add_trace(
                         go.Scatter(
-                            x=years.tolist(),
-                            y=cumul_free_cashflow.tolist(),
+                            x=series_values(years),
+                            y=series_values(cumul_free_cashflow),
                             name=f'{key}',
                             xaxis='x',
                             yaxis='y',
@@ -329,10 +379,32 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
             # new_chart.set_csv_data_from_dataframe(cf_df_dict)
         return new_chart
 
+    def aggregate_cashflows(self, cf_df_dict, metric='cash_flow'):
+        """
+        Dataframes (years, metric) of the top MAX_TRACES - 1 contributors and of the Other bucket, summed over bins of
+        years when there are more than MAX_YEAR_POINTS years
+        cf_df_dict is returned as is if it has no more than MAX_TRACES dataframes of no more than MAX_YEAR_POINTS years
+        """
+        metric_df_dict = {key: cf_df[['years', metric]] for key, cf_df in cf_df_dict.items()
+                          if metric in cf_df and 'years' in cf_df}
+        if len(metric_df_dict) <= self.MAX_TRACES and \
+                all(len(cf_df) <= self.MAX_YEAR_POINTS for cf_df in metric_df_dict.values()):
+            return cf_df_dict
+
+        rollup = CashflowRollup(metric_df_dict)
+        keys, values = select_top_contributors(
+            rollup.keys, rollup.get_metric(metric), self.MAX_TRACES)
+        years, values = bin_years(rollup.years, values, self.MAX_YEAR_POINTS)
+
+        return {key: pd.DataFrame({'years': years, metric: key_values}) for key, key_values in zip(keys, values)}
+
     def generate_detailed_cashflow_chart(self, cf_df_dict, name, annotation_upper_left, annotation_upper_right, currency):
         # Create figure
         fig = go.Figure()
 
+        if self.AGGREGATE_CHARTS:
+            cf_df_dict = self.aggregate_cashflows(cf_df_dict)
+
         for granularity, cf_df in cf_df_dict.items():
             # Free Cashflow
             if 'cash_flow' in cf_df and 'years' in cf_df:
@@ -340,8 +412,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 free_cashflow = cf_df['cash_flow'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=free_cashflow.tolist(),
+                        x=series_values(years),
+                        y=series_values(free_cashflow),
                         name=f'{granularity} Free Cashflow',
                         xaxis='x',
                         yaxis='y',
@@ -434,8 +506,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 EBIT = pnl_df['EBIT'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=EBIT.tolist(),
+                        x=series_values(years),
+                        y=series_values(EBIT),
                         name=f'EBIT',
                         xaxis='x',
                         yaxis='y',
@@ -449,8 +521,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 EBIT_cumul = pnl_df['cumulative_EBIT'].values
                 fig.add_trace(
                     go.Scatter(
-                        x=years.tolist(),
-                        y=EBIT_cumul.tolist(),
+                        x=series_values(years),
+                        y=series_values(EBIT_cumul),
                         name=f'Cumulative EBIT',
                         xaxis='x',
                         yaxis='y2',
@@ -522,8 +594,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                 quantity = cf_df['quantity'].values
                 fig.add_trace(
                     go.Bar(
-                        x=years.tolist(),
-                        y=quantity.tolist(),
+                        x=series_values(years),
+                        y=series_values(quantity),
                         name=f'Product quantities',
                         xaxis='x',
                         yaxis='y',
@@ -715,6 +787,15 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
             if 'years' in pnl_df_dict[key_list[0]]:
                 year_list = list(pnl_df_dict[key_list[0]]['years'].unique())
 
+                # revenues and costs (keys x years) of all keys aligned once on their years
+                pnl_keys = [key for key in key_list if all(
+                    ['cash_in_PnL' in pnl_df_dict[key], 'cash_out_PnL' in pnl_df_dict[key]])]
+                pnl_rollup = CashflowRollup(
+                    {key: pnl_df_dict[key][['years', 'cash_in_PnL', 'cash_out_PnL']] for key in pnl_keys})
+                revenues_by_year = pnl_rollup.get_metric('cash_in_PnL')
+                costs_by_year = pnl_rollup.get_metric('cash_out_PnL')
+                year_index = {year: i for i, year in enumerate(pnl_rollup.years)}
+
                 for year_current in year_list:
                     revenues_list = []
                     costs_list = []
@@ -724,19 +805,21 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                     x_list = []
                     x_revenues_list = []
                     x_costs_list = []
-                    for key in key_list:
+                    year_position = year_index.get(year_current)
+                    for key_position, key in enumerate(pnl_keys):
                         lisible_key = key.replace('.', ' ')
-                        yearly_cashflow = pnl_df_dict[key]
-                        if all(['cash_in_PnL' in yearly_cashflow, 'cash_out_PnL' in yearly_cashflow]):
-                            revenues_list.append(yearly_cashflow.loc[(
-                                yearly_cashflow['years'] == year_current)]['cash_in_PnL'].sum())
-                            measure_revenues_list.append('relative')
-                            x_revenues_list.append(f'Revenues {lisible_key}')
-
-                            costs_list.append(yearly_cashflow.loc[(
-                                yearly_cashflow['years'] == year_current)]['cash_out_PnL'].sum())
-                            measure_costs_list.append('relative')
-                            x_costs_list.append(f'Direct Costs {lisible_key}')
+                        if year_position is None:
+                            revenues_list.append(0.)
+                            costs_list.append(0.)
+                        else:
+                            revenues_list.append(
+                                revenues_by_year[key_position, year_position])
+                            costs_list.append(
+                                costs_by_year[key_position, year_position])
+                        measure_revenues_list.append('relative')
+                        x_revenues_list.append(f'Revenues {lisible_key}')
+                        measure_costs_list.append('relative')
+                        x_costs_list.append(f'Direct Costs {lisible_key}')
 
                     y_values = [*revenues_list, 0, *costs_list, 0]
                     if sum(revenues_list) > 0:
@@ -837,8 +920,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
             price = cf_df['sale_price'].values
             fig.add_trace(
                 go.Scatter(
-                    x=years.tolist(),
-                    y=price.tolist(),
+                    x=series_values(years),
+                    y=series_values(price),
                     name=f'Price',
                     xaxis='x',
                     yaxis='y',
@@ -852,8 +935,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
             opex = cf_df['opex'].values
             fig.add_trace(
                 go.Scatter(
-                    x=years.tolist(),
-                    y=opex.tolist(),
+                    x=series_values(years),
+                    y=series_values(opex),
                     name=f'OpEx',
                     xaxis='x',
                     yaxis='y',
@@ -891,8 +974,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                     price = cf_df['sale_price'].values
                     fig.add_trace(
                         go.Scatter(
-                            x=years.tolist(),
-                            y=price.tolist(),
+                            x=series_values(years),
+                            y=series_values(price),
                             name=f'Price {key}',
                             xaxis='x',
                             yaxis='y',
@@ -906,8 +989,8 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
                     opex = cf_df['opex'].values
                     fig.add_trace(
                         go.Scatter(
-                            x=years.tolist(),
-                            y=opex.tolist(),
+                            x=series_values(years),
+                            y=series_values(opex),
                             name=f'OpEx {key}',
                             xaxis='x',
                             yaxis='y',
@@ -969,6 +1052,16 @@ class ValueAssessmentCharts(InstantiatedPlotlyNativeChart):
         if len(scenario_list) == 0:
             scenario_list = [f'{name}']
 
+        contributors = [key for key in total_cashflow_dict if key != 'Total']
+        if self.AGGREGATE_CHARTS and len(contributors) > self.MAX_TRACES:
+            keys, values = select_top_contributors(contributors, [total_cashflow_dict[key] for key in contributors],
+                                                   self.MAX_TRACES)
+            aggregated_dict = {key: key_values.tolist()
+                               for key, key_values in zip(keys, values)}
+            if 'Total' in total_cashflow_dict:
+                aggregated_dict['Total'] = total_cashflow_dict['Total']
+            total_cashflow_dict = aggregated_dict
+
         abs_value = scenario_list
 
         dic = {}
@@ -0,0 +1,133 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import base64
+import numpy as np
+
+# chart series are passed to plotly as numpy arrays, set to False to pass python lists for older consumers
+NUMPY_SERIES = True
+
+# series with at least this number of values are encoded as base64 typed arrays in figure payloads
+TYPED_ARRAY_MIN_SIZE = 256
+
+# plotly.js typed array codes, little-endian
+TYPED_ARRAY_DTYPES = {
+    'f8': '<f8', 'f4': '<f4',
+    'i4': '<i4', 'i2': '<i2', 'i1': 'i1',
+    'u4': '<u4', 'u2': '<u2', 'u1': 'u1',
+}
+
+
+def series_values(values):
+    """
+    Values of a chart series (dataframe column, series or array) as a numpy array, or a list if NUMPY_SERIES is False
+    """
+    values = np.asarray(values)
+    if NUMPY_SERIES:
+        return values
+
+    return values.tolist()
+
+
+def get_typed_array_code(values):
+    """
+    plotly.js typed array code of a numpy array, None if its dtype has no typed array
+    64 bits integers have none, they are stored as 32 bits integers if they fit or as floats
+    """
+    if values.dtype.kind not in 'fiu':
+        return None
+    if values.dtype.kind in 'iu' and values.dtype.itemsize == 8:
+        if values.size > 0 and (values.min() < np.iinfo(np.int32).min or values.max() > np.iinfo(np.int32).max):
+            return 'f8'
+        return 'i4'
+    if values.dtype.kind == 'f' and values.dtype.itemsize not in (4, 8):
+        return 'f8'
+
+    return f'{values.dtype.kind}{values.dtype.itemsize}'
+
+
+def encode_typed_array(values):
+    """
+    Typed array {'dtype', 'bdata', 'shape'} of a numeric numpy array, values base64 encoded
+    """
+    values = np.asarray(values)
+    code = get_typed_array_code(values)
+    if code is None:
+        raise Exception(
+            f'Values of dtype {values.dtype} cannot be encoded as a typed array')
+
+    typed_array = {'dtype': code,
+                   'bdata': base64.b64encode(np.ascontiguousarray(values, dtype=TYPED_ARRAY_DTYPES[code]).tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        typed_array['shape'] = ', '.join(str(dim) for dim in values.shape)
+
+    return typed_array
+
+
+def decode_typed_array(typed_array):
+    """
+    Numpy array of a typed array {'dtype', 'bdata', 'shape'}
+    """
+    values = np.frombuffer(base64.b64decode(typed_array['bdata']),
+                           dtype=TYPED_ARRAY_DTYPES[typed_array['dtype']])
+    if 'shape' in typed_array:
+        values = values.reshape(
+            [int(dim) for dim in str(typed_array['shape']).split(',')])
+
+    return values
+
+
+def is_typed_array(value):
+    return isinstance(value, dict) and 'bdata' in value and 'dtype' in value
+
+
+def encode_typed_arrays(payload, min_size=None):
+    """
+    Copy of a figure payload (dicts and lists from to_plotly_json) where numeric numpy arrays of at least min_size
+    values are typed arrays and other numpy arrays are lists, JSON serializable with the standard json module
+    """
+    if min_size is None:
+        min_size = TYPED_ARRAY_MIN_SIZE
+
+    if isinstance(payload, np.ndarray):
+        if payload.size >= min_size and get_typed_array_code(payload) is not None:
+            return encode_typed_array(payload)
+        return payload.tolist()
+    if isinstance(payload, dict):
+        return {key: encode_typed_arrays(value, min_size) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [encode_typed_arrays(value, min_size) for value in payload]
+    if isinstance(payload, np.generic):
+        return payload.item()
+
+    return payload
+
+
+def decode_typed_arrays(payload):
+    """
+    Copy of a figure payload where typed arrays are numpy arrays
+    """
+    if is_typed_array(payload):
+        return decode_typed_array(payload)
+    if isinstance(payload, dict):
+        return {key: decode_typed_arrays(value) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [decode_typed_arrays(value) for value in payload]
+
+    return payload
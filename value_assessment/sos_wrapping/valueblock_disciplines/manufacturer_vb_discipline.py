@@ -19,13 +19,10 @@ mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 
 
 from sos_trades_core.sos_wrapping.valueblock_discipline import ValueBlockDiscipline
-from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, TwoAxesInstanciatedChart
-from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
-from value_assessment.sos_wrapping.post_processing.post_proc_output import ValueAssessmentCharts
 from value_assessment.core.value_blocks.manufacturer_VB import ManufacturerVB
+from value_assessment.core.toolbox.stage_profiler import PROFILER
 import numpy as np
 import pandas as pd
-from copy import deepcopy
 
 
 class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
@@ -48,6 +45,19 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
     }
     _maturity = 'Research'
 
+    # columns of the cashflow_product and pnl_product outputs
+    CASHFLOW_PRODUCT_COLUMNS = ['years', 'cash_flow', 'cumulative_cash_flow', 'discounted_cf', 'cumulative_discounted_cf',
+                                'cash_in', 'cash_out', 'sale_price', 'quantity',
+                                'capex_amort', 'capex_non_amort', 'capex', 'Inventory',
+                                'opex', 'opex_total_pay', 'opex_total', 'opex_after_sales']
+    PNL_PRODUCT_COLUMNS = ['years', 'EBIT', 'cumulative_EBIT',
+                           'cash_in_PnL', 'cash_out_PnL', 'sale_price', 'quantity',
+                           'capex_amort_EBIT', 'capex_non_amort', 'capex', 'Inventory',
+                           'opex', 'opex_total', 'opex_after_sales']
+
+    # opt-in stage timers, shared by all value assessment disciplines
+    profiler = PROFILER
+
     DESC_IN = {
         'WACC_actor': {'type': 'float', 'unit': '%', 'default': 8., 'range': [0.0, 100.0], 'visibility': ValueBlockDiscipline.SHARED_VISIBILITY, 'namespace': 'ns_public'},
         'year_start': {'default': 2020, 'type': 'int', 'unit': 'year', 'range': [1950, 2100], 'visibility': ValueBlockDiscipline.SHARED_VISIBILITY, 'namespace': 'ns_public'},
@@ -166,24 +176,45 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
                                              None, wacc, 1)
 
     def run(self):
+        name = self.get_disc_full_name()
+        with self.profiler.profile(name):
+            self.compute_outputs(name)
+
+    def compute_outputs(self, name):
 
         # get inputs
-        input_data_dict = self.get_sosdisc_inputs(in_dict=True)
+        with self.profiler.stage(name, 'input fetch'):
+            input_data_dict = self.get_sosdisc_inputs(in_dict=True)
 
-        self.sales_vb_model.configure_data(
-            input_data_dict['product_sales_df'],
-            input_data_dict['opex'], input_data_dict['capex'],
-            input_data_dict['product_sale_price'])
+        with self.profiler.stage(name, 'model compute'):
+            self.sales_vb_model.configure_data(
+                input_data_dict['product_sales_df'],
+                input_data_dict['opex'], input_data_dict['capex'],
+                input_data_dict['product_sale_price'])
 
-        self.sales_vb_model.compute_cashflow()
+            self.sales_vb_model.compute_cashflow_and_pnl()
 
-        cashflow_product = self.sales_vb_model.convert_cf_USD_EUR()
-        cashflow_infos = self.sales_vb_model.convert_cf_infos_USD_EUR()
+        with self.profiler.stage(name, 'currency conversion'):
+            cashflow_product, EBIT_product, cashflow_infos = self.sales_vb_model.convert_cashflow_and_pnl(
+                self.CASHFLOW_PRODUCT_COLUMNS, self.PNL_PRODUCT_COLUMNS)
 
-        self.sales_vb_model.compute_PnL()
-        EBIT_product = self.sales_vb_model.convert_cf_USD_EUR()
+        with self.profiler.stage(name, 'hypothesis summary'):
+            hypothesis_summary = self.compute_hypothesis_summary(
+                input_data_dict, cashflow_product)
 
-        # hypothesis_summary
+        dict_values = {
+            f'cashflow_product': cashflow_product,
+            f'cashflow_infos': cashflow_infos,
+            f'hypothesis_summary': hypothesis_summary,
+
+            f'pnl_product': EBIT_product
+
+        }
+
+        with self.profiler.stage(name, 'output store'):
+            self.store_sos_outputs_values(dict_values)
+
+    def compute_hypothesis_summary(self, input_data_dict, cashflow_product):
         sales = cashflow_product['quantity'].to_list()
         total_sales = np.cumsum(sales)[-1]
         capex = input_data_dict['capex']['capex'].to_list()
@@ -201,24 +232,13 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
         hypothesis_summary = {'total_cumul_sales': int(total_sales), 'year_start_escalation_capex': int(year_start_escalation_capex), 'total_cumul_capex': total_capex,
                               'year_start_escalation_opex': int(year_start_escalation_opex), 'last_year': int(last_year), 'opex_last_year': opex[-1], 'sale_price_last_year': sale_price[-1], 'contribution_margin_last_year': contribution_margin}
 
-        dict_values = {
-            f'cashflow_product': cashflow_product.loc[:, cashflow_product.columns.isin(['years', 'cash_flow', 'cumulative_cash_flow', 'discounted_cf', 'cumulative_discounted_cf',
-                                                                                        'cash_in', 'cash_out', 'sale_price', 'quantity',
-                                                                                        'capex_amort', 'capex_non_amort', 'capex', 'Inventory',
-                                                                                        'opex', 'opex_total_pay', 'opex_total', 'opex_after_sales'])],
-            f'cashflow_infos': cashflow_infos,
-            f'hypothesis_summary': hypothesis_summary,
-
-            f'pnl_product': EBIT_product.loc[:, EBIT_product.columns.isin(['years', 'EBIT', 'cumulative_EBIT',
-                                                                           'cash_in_PnL', 'cash_out_PnL', 'sale_price', 'quantity',
-                                                                           'capex_amort_EBIT', 'capex_non_amort', 'capex', 'Inventory',
-                                                                           'opex', 'opex_total', 'opex_after_sales'])]
-
-        }
-
-        self.store_sos_outputs_values(dict_values)
+        return hypothesis_summary
 
     def get_chart_filter_list(self):
+        # chart dependencies are imported at first use only, computing runs never load them
+        from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
+        from value_assessment.sos_wrapping.post_processing.chart_aggregation import AGGREGATION_FILTER_KEY, \
+            AGGREGATION_FILTER_VALUES
 
         chart_filters = []
 
@@ -241,12 +261,23 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
         chart_filters.append(ChartFilter(name='Currency', filter_values=[
                              '€'], selected_values='€', filter_key='Currency', multiple_selection=False))
 
+        chart_filters.append(ChartFilter(name=AGGREGATION_FILTER_KEY, filter_values=AGGREGATION_FILTER_VALUES,
+                                         selected_values=AGGREGATION_FILTER_VALUES[0],
+                                         filter_key=AGGREGATION_FILTER_KEY, multiple_selection=False))
+
         return chart_filters
 
     def get_post_processing_list(self, chart_filters=None):
+        from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, TwoAxesInstanciatedChart
+        from value_assessment.sos_wrapping.post_processing.post_proc_output import ValueAssessmentCharts
+        from value_assessment.sos_wrapping.post_processing.chart_outputs import ChartOutputs
+        from value_assessment.sos_wrapping.post_processing.chart_aggregation import AGGREGATION_FILTER_KEY, \
+            AGGREGATION_FILTER_VALUES
 
         instanciated_charts = []
         currency = '€'
+        graphs_list = self.get_chart_filter_list()[0].selected_values
+        aggregation = AGGREGATION_FILTER_VALUES[0]
 
         # Overload default value with chart filter
         if chart_filters is not None:
@@ -255,125 +286,107 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
                     graphs_list = chart_filter.selected_values
                 if chart_filter.filter_key == 'Currency':
                     currency = chart_filter.selected_values
+                if chart_filter.filter_key == AGGREGATION_FILTER_KEY:
+                    aggregation = chart_filter.selected_values
+
+        # outputs are fetched at first use by a selected chart, in the currency selected
+        chart_outputs = ChartOutputs(
+            self.get_sosdisc_outputs, self.get_data_out().keys(), currency=currency)
+        charts_to_build = ValueAssessmentCharts.get_charts_to_build(
+            graphs_list, chart_outputs)
+        if len(charts_to_build) == 0:
+            return instanciated_charts
 
         name = self.sos_name.split('.')[-1]
-        bc_charts = ValueAssessmentCharts()
-        cashflow_info = None
-        cashflow_product = None
-        EBIT_product = None
-        hypothesis_summary = None
-
-        # handle retrieval of all outputs depending on the currency selected
-        if currency == '€':
-            if 'cashflow_infos' in self.get_sosdisc_outputs():
-                cashflow_info = deepcopy(
-                    self.get_sosdisc_outputs(f'cashflow_infos'))
-            if 'cashflow_product' in self.get_sosdisc_outputs():
-                cashflow_product = self.get_sosdisc_outputs(
-                    f'cashflow_product')
-            if 'pnl_product' in self.get_sosdisc_outputs():
-                EBIT_product = self.get_sosdisc_outputs(f'pnl_product')
-
-        elif currency == '$':
-            if 'cashflow_infos_dollars' in self.get_sosdisc_outputs():
-                cashflow_info = deepcopy(self.get_sosdisc_outputs(
-                    f'cashflow_infos_dollars'))
-            if 'cashflow_product_dollars' in self.get_sosdisc_outputs():
-                cashflow_product = self.get_sosdisc_outputs(
-                    f'cashflow_product_dollars')
-            if 'pnl_product_dollars' in self.get_sosdisc_outputs():
-                EBIT_product = self.get_sosdisc_outputs(f'pnl_product_dollars')
-
-        if 'hypothesis_summary' in self.get_sosdisc_outputs():
-            hypothesis_summary = deepcopy(
-                self.get_sosdisc_outputs(f'hypothesis_summary'))
+        bc_charts = ValueAssessmentCharts(
+            aggregate_charts=aggregation == AGGREGATION_FILTER_VALUES[-1])
+        cashflow_product = chart_outputs.get('cashflow_product')
+        EBIT_product = chart_outputs.get('pnl_product')
+
+        # charts are reused from the figure cache when built before with the same selection and inputs
+        selection = (self.sos_name, currency, aggregation)
+        cashflow_inputs = {'cashflow_product': cashflow_product,
+                           'cashflow_infos': chart_outputs.get('cashflow_infos')}
 
         annotation_upper_left = {}
         annotation_upper_right = {}
-
-        if cashflow_info is not None:
+        if 'Cashflow' in charts_to_build or 'Cash_in / Cash_out' in charts_to_build:
             annotation_upper_left, annotation_upper_right = bc_charts.generate_annotations(
-                cashflow_info, currency=currency)
-
-        # sales_by_subsystem = self.get_sosdisc_inputs('sales_by_subsystem')
-        opex = self.get_sosdisc_inputs('opex')
-        # if sales_by_subsystem:
-        #     subsystem_name = self.sos_name
-        opex_max = opex['opex'].max()
-        # convert to k€
-        opex_max /= 1000
-        capex = self.get_sosdisc_inputs('capex')
-        # else:
-        #     capex = None
-
-        if 'Summary infos table' in graphs_list:
+                chart_outputs.get('cashflow_infos'), currency=currency)
+
+        if 'Summary infos table' in charts_to_build:
             # setup df
-            if hypothesis_summary is not None:
-                total_summary = deepcopy(hypothesis_summary)
-            total_summary.update(cashflow_info)
-            new_table = bc_charts.generate_total_table(
-                {name: total_summary}, name, currency, graph_data='Total')
+            total_summary = {**chart_outputs.get('hypothesis_summary'),
+                             **chart_outputs.get('cashflow_infos')}
+            new_table = bc_charts.get_cached_chart('Summary infos table', selection, {'total_summary': total_summary},
+                                                   lambda: bc_charts.generate_total_table(
+                                                       {name: total_summary}, name, currency, graph_data='Total'))
             instanciated_charts.append(new_table)
             # new_table.to_plotly().show()
 
-        if 'Cashflow' in graphs_list and cashflow_product is not None:
-            cashflow_chart = bc_charts.generate_cashflow_chart(
-                cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True)
+        if 'Cashflow' in charts_to_build:
+            cashflow_chart = bc_charts.get_cached_chart('Cashflow', selection, cashflow_inputs,
+                                                        lambda: bc_charts.generate_cashflow_chart(
+                                                            cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True))
             if cashflow_chart:
                 instanciated_charts.append(cashflow_chart)
 
-        if 'Cash_in / Cash_out' in graphs_list and cashflow_product is not None:
-            cashflow_chart = bc_charts.generate_cashin_cashout_chart(
-                cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True)
+        if 'Cash_in / Cash_out' in charts_to_build:
+            cashflow_chart = bc_charts.get_cached_chart('Cash_in / Cash_out', selection, cashflow_inputs,
+                                                        lambda: bc_charts.generate_cashin_cashout_chart(
+                                                            cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True))
             if cashflow_chart:
                 instanciated_charts.append(cashflow_chart)
 
-        if 'Profit and Loss' in graphs_list and EBIT_product is not None:
-            pnl_chart = bc_charts.generate_pnl_chart(
-                EBIT_product, name, {}, {}, currency=currency, add_cumulated=True)
+        if 'Profit and Loss' in charts_to_build:
+            pnl_chart = bc_charts.get_cached_chart('Profit and Loss', selection, {'pnl_product': EBIT_product},
+                                                   lambda: bc_charts.generate_pnl_chart(
+                                                       EBIT_product, name, {}, {}, currency=currency, add_cumulated=True))
             if pnl_chart:
                 instanciated_charts.append(pnl_chart)
 
-        if 'Profit and Loss Waterfall' in graphs_list and EBIT_product is not None:
+        if 'Profit and Loss Waterfall' in charts_to_build:
 
             pnl_df_dict = {name: EBIT_product}
-            pnl_waterfall_chart_chart = bc_charts.generate_pnl_waterfall_chart(
-                pnl_df_dict, name, currency=currency)
+            pnl_waterfall_chart_chart = bc_charts.get_cached_chart('Profit and Loss Waterfall', selection, pnl_df_dict,
+                                                                   lambda: bc_charts.generate_pnl_waterfall_chart(
+                                                                       pnl_df_dict, name, currency=currency))
             if pnl_waterfall_chart_chart:
                 instanciated_charts.append(pnl_waterfall_chart_chart)
 
-        if 'Quantity' in graphs_list and cashflow_product is not None:
-            quantity_chart = bc_charts.generate_quantity_chart(
-                cashflow_product, name, {}, {}, add_cumulated=True)
-            if pnl_chart:
+        if 'Quantity' in charts_to_build:
+            quantity_chart = bc_charts.get_cached_chart('Quantity', selection, {'cashflow_product': cashflow_product},
+                                                        lambda: bc_charts.generate_quantity_chart(
+                                                            cashflow_product, name, {}, {}, add_cumulated=True))
+            if quantity_chart:
                 instanciated_charts.append(quantity_chart)
 
-        if 'Price and Cost' in graphs_list and cashflow_product is not None:
-            price_and_cost_chart = bc_charts.generate_price_and_cost_chart(
-                cashflow_product, name, currency=currency)
+        if 'Price and Cost' in charts_to_build:
+            price_and_cost_chart = bc_charts.get_cached_chart('Price and Cost', selection, {'cashflow_product': cashflow_product},
+                                                              lambda: bc_charts.generate_price_and_cost_chart(
+                                                                  cashflow_product, name, currency=currency))
             if price_and_cost_chart:
                 instanciated_charts.append(price_and_cost_chart)
 
-        if 'OPEX' in graphs_list and cashflow_product is not None:
+        # OpEx scale, also used for the CapEx chart
+        legend_letter = ''
+        factor = 1.0
+        if ('OPEX' in charts_to_build or 'CAPEX' in charts_to_build) and 'opex_total' in cashflow_product.columns:
+            max_value = max(
+                cashflow_product['opex_total'].values.tolist()) * 1.05
+
+            if max_value >= 1.0e9:
+                legend_letter = 'bn'
+                factor = 1.0e9
+            elif max_value < 1.0e9 and max_value >= 1.0e6:
+                legend_letter = 'M'
+                factor = 1.0e6
+            elif max_value < 1.0e6 and max_value >= 1.0e3:
+                legend_letter = 'k'
+                factor = 1.0e3
+
+        if 'OPEX' in charts_to_build:
             if 'opex_total' in cashflow_product.columns:
-                max_value = max(
-                    cashflow_product['opex_total'].values.tolist()) * 1.05
-
-                if max_value >= 1.0e9:
-                    max_value = max_value / 1.0e9
-                    legend_letter = 'bn'
-                    factor = 1.0e9
-                elif max_value < 1.0e9 and max_value >= 1.0e6:
-                    max_value = max_value / 1.0e6
-                    legend_letter = 'M'
-                    factor = 1.0e6
-                elif max_value < 1.0e6 and max_value >= 1.0e3:
-                    max_value = max_value / 1.0e3
-                    legend_letter = 'k'
-                    factor = 1.0e3
-                else:
-                    legend_letter = ''
-                    factor = 1.0
                 chart_name = f'{self.sos_name} Total OpEx Costs'
 
                 new_chart_opex = TwoAxesInstanciatedChart('Years', f'OpEx({legend_letter}€)',
@@ -393,8 +406,9 @@ class ManufacturerValueBlockDiscipline(ValueBlockDiscipline):
 
                 instanciated_charts.append(new_chart_opex)
 
-        if 'CAPEX' in graphs_list and cashflow_product is not None:
+        if 'CAPEX' in charts_to_build:
             if 'capex' in cashflow_product.columns:
+                capex = self.get_sosdisc_inputs('capex')
                 total_capex = cashflow_product['capex'].sum()
                 if total_capex >= 1.0e9:
                     total_capex = total_capex / 1.0e9
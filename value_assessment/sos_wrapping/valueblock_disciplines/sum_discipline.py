@@ -17,11 +17,9 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
 
-from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from value_assessment.core.toolbox.toolboxsumCF import toolboxsumCF
+from value_assessment.core.toolbox.stage_profiler import PROFILER
 from sos_trades_core.sos_wrapping.sum_valueblock_discipline import SumValueBlockDiscipline
-from value_assessment.sos_wrapping.post_processing.post_proc_output import ValueAssessmentCharts
-from copy import deepcopy
 
 
 class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
@@ -43,12 +41,21 @@ class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
     }
     _maturity = 'Research'
 
+    # opt-in stage timers, shared by all value assessment disciplines
+    profiler = PROFILER
+
     def init_execution(self):
         self.toolboxsumcf = toolboxsumCF()
 
     def run(self):
-
-        SumValueBlockDiscipline.run(self)
+        name = self.get_disc_full_name()
+        with self.profiler.profile(name):
+            with self.profiler.stage(name, 'children sum'):
+                SumValueBlockDiscipline.run(self)
+            with self.profiler.stage(name, 'cashflow infos'):
+                self.compute_outputs()
+
+    def compute_outputs(self):
         output_dict_generic = self.get_sosdisc_outputs()
         if 'cashflow_product' in output_dict_generic:
             cf_product_dict = output_dict_generic['cashflow_product']
@@ -83,6 +90,10 @@ class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
                            }
 
     def get_chart_filter_list(self):
+        # chart dependencies are imported at first use only, computing runs never load them
+        from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
+        from value_assessment.sos_wrapping.post_processing.chart_aggregation import AGGREGATION_FILTER_KEY, \
+            AGGREGATION_FILTER_VALUES
 
         chart_filters = []
 
@@ -123,12 +134,22 @@ class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
 
         chart_filters.append(ChartFilter(name='Currency', filter_values=[
                              '€', '$'], selected_values='€', filter_key='Currency', multiple_selection=False))
+        chart_filters.append(ChartFilter(name=AGGREGATION_FILTER_KEY, filter_values=AGGREGATION_FILTER_VALUES,
+                                         selected_values=AGGREGATION_FILTER_VALUES[0],
+                                         filter_key=AGGREGATION_FILTER_KEY, multiple_selection=False))
         return chart_filters
 
     def get_post_processing_list(self, chart_filters=None):
+        from value_assessment.sos_wrapping.post_processing.post_proc_output import ValueAssessmentCharts
+        from value_assessment.sos_wrapping.post_processing.chart_outputs import ChartOutputs
+        from value_assessment.sos_wrapping.post_processing.chart_aggregation import AGGREGATION_FILTER_KEY, \
+            AGGREGATION_FILTER_VALUES
 
         instanciated_charts = []
         currency = '€'
+        graphs_list = self.get_chart_filter_list()[0].selected_values
+        granularity_level = 0
+        aggregation = AGGREGATION_FILTER_VALUES[0]
 
         # Overload default value with chart filter
         if chart_filters is not None:
@@ -139,144 +160,108 @@ class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
                     granularity_level = chart_filter.selected_values
                 if chart_filter.filter_key == 'Currency':
                     currency = chart_filter.selected_values
+                if chart_filter.filter_key == AGGREGATION_FILTER_KEY:
+                    aggregation = chart_filter.selected_values
+
+        # outputs are fetched at first use by a selected chart, in the currency selected
+        chart_outputs = ChartOutputs(
+            self.get_sosdisc_outputs, self.get_data_out().keys(), currency=currency)
+        charts_to_build = ValueAssessmentCharts.get_charts_to_build(
+            graphs_list, chart_outputs)
+        if len(charts_to_build) == 0:
+            return instanciated_charts
 
         name = self.sos_name.split('.')[-1]
-        va_charts = ValueAssessmentCharts()
-
-        cashflow_info = None
-        cashflow_product = None
-        cashflow_product_gather = None
-        cashflow_infos_gather = None
-        EBIT_product = None
-        EBIT_product_gather = None
-
-        # handle retrieval of all outputs depending on the currency selected
-        if currency == '€':
-            if 'cashflow_infos' in self.get_sosdisc_outputs():
-                cashflow_info = deepcopy(
-                    self.get_sosdisc_outputs(f'cashflow_infos'))
-            if 'cashflow_infos_gather' in self.get_sosdisc_outputs():
-                cashflow_infos_gather = deepcopy(self.get_sosdisc_outputs(
-                    f'cashflow_infos_gather'))
-            if 'cashflow_product' in self.get_sosdisc_outputs():
-                cashflow_product = self.get_sosdisc_outputs(
-                    f'cashflow_product')
-            if 'cashflow_product_gather' in self.get_sosdisc_outputs():
-                cashflow_product_gather = self.get_sosdisc_outputs(
-                    f'cashflow_product_gather')
-            if 'pnl_product' in self.get_sosdisc_outputs():
-                EBIT_product = self.get_sosdisc_outputs(f'pnl_product')
-            if 'pnl_product_gather' in self.get_sosdisc_outputs():
-                EBIT_product_gather = self.get_sosdisc_outputs(
-                    f'pnl_product_gather')
-
-        elif currency == '$':
-            if 'cashflow_infos_dollars' in self.get_sosdisc_outputs():
-                cashflow_info = deepcopy(self.get_sosdisc_outputs(
-                    f'cashflow_infos_dollars'))
-            if 'cashflow_infos_dollars_gather' in self.get_sosdisc_outputs():
-                cashflow_infos_gather = deepcopy(self.get_sosdisc_outputs(
-                    f'cashflow_infos_dollars_gather'))
-            if 'cashflow_product_dollars' in self.get_sosdisc_outputs():
-                cashflow_product = self.get_sosdisc_outputs(
-                    f'cashflow_product_dollars')
-            if 'cashflow_product_dollars_gather' in self.get_sosdisc_outputs():
-                cashflow_product_gather = self.get_sosdisc_outputs(
-                    f'cashflow_product_dollars_gather')
-            if 'pnl_product_dollars' in self.get_sosdisc_outputs():
-                EBIT_product = self.get_sosdisc_outputs(f'pnl_product_dollars')
-            if 'pnl_product_dollars_gather' in self.get_sosdisc_outputs():
-                EBIT_product_gather = self.get_sosdisc_outputs(
-                    f'pnl_product_dollars_gather')
+        va_charts = ValueAssessmentCharts(
+            aggregate_charts=aggregation == AGGREGATION_FILTER_VALUES[-1])
 
-        annotation_upper_left = {}
-        annotation_upper_right = {}
-        hypothesis_summary = None
-        hypothesis_summary_gather = None
+        cashflow_info = chart_outputs.get('cashflow_infos')
+        cashflow_product = chart_outputs.get('cashflow_product')
+        cashflow_product_gather = chart_outputs.get('cashflow_product_gather')
+        cashflow_infos_gather = chart_outputs.get('cashflow_infos_gather')
 
-        if 'hypothesis_summary' in self.get_sosdisc_outputs():
-            hypothesis_summary = deepcopy(self.get_sosdisc_outputs(
-                f'hypothesis_summary'))
-        if 'hypothesis_summary_gather' in self.get_sosdisc_outputs():
-            hypothesis_summary_gather = deepcopy(self.get_sosdisc_outputs(
-                f'hypothesis_summary_gather'))
+        # charts are reused from the figure cache when built before with the same selection and inputs
+        selection = (self.sos_name, currency, granularity_level, aggregation)
+        cashflow_inputs = {'cashflow_product': cashflow_product,
+                           'cashflow_infos': cashflow_info}
 
-        if cashflow_info is not None:
+        annotation_upper_left = {}
+        annotation_upper_right = {}
+        if 'Cashflow' in charts_to_build or 'Cash_in / Cash_out' in charts_to_build:
             annotation_upper_left, annotation_upper_right = va_charts.generate_annotations(
                 cashflow_info, currency=currency)
 
         granularity_to_draw = []
         if cashflow_product_gather is not None:
-            granularity = {}
-            for k in cashflow_product_gather.keys():
-                g = len(k.split('.'))
-                if g in granularity:
-                    granularity[g].append(k)
-                else:
-                    granularity[g] = [k]
-            if granularity_level in granularity:
-                granularity_to_draw = granularity[granularity_level]
+            granularity_to_draw = [k for k in cashflow_product_gather.keys() if len(
+                k.split('.')) == granularity_level]
 
-        if 'Summary infos table' in graphs_list and hypothesis_summary_gather is not None and cashflow_infos_gather is not None and cashflow_info is not None:
+        if 'Summary infos table' in charts_to_build:
             # setup df
+            hypothesis_summary_gather = chart_outputs.get(
+                'hypothesis_summary_gather')
             cf_info_dict = {}
             if granularity_level == 0:
-                if (hypothesis_summary is not None) & (cashflow_info is not None):
-                    total_summary = deepcopy(hypothesis_summary)
-                    total_summary.update(cashflow_info)
-                    cf_info_dict[name] = total_summary
-            else:
-                total_summary_gather = deepcopy(hypothesis_summary_gather)
+                cf_info_dict[name] = {**chart_outputs.get('hypothesis_summary'),
+                                      **cashflow_info}
+            elif hypothesis_summary_gather is not None and cashflow_infos_gather is not None:
                 for g in cashflow_infos_gather.keys():
                     if (g in granularity_to_draw) & (g in hypothesis_summary_gather.keys()):
-                        total_summary_gather[g].update(
-                            cashflow_infos_gather[g])
-                        cf_info_dict[g] = total_summary_gather[g]
-            new_table = va_charts.generate_total_table(
-                cf_info_dict, name, currency, graph_data='Total')
-            instanciated_charts.append(new_table)
-
-        if 'Cashflow' in graphs_list and cashflow_product is not None:
-            cashflow_chart = va_charts.generate_cashflow_chart(
-                cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True)
+                        cf_info_dict[g] = {**hypothesis_summary_gather[g],
+                                           **cashflow_infos_gather[g]}
+            if len(cf_info_dict) > 0:
+                new_table = va_charts.get_cached_chart('Summary infos table', selection, cf_info_dict,
+                                                       lambda: va_charts.generate_total_table(
+                                                           cf_info_dict, name, currency, graph_data='Total'))
+                instanciated_charts.append(new_table)
+
+        if 'Cashflow' in charts_to_build:
+            cashflow_chart = va_charts.get_cached_chart('Cashflow', selection, cashflow_inputs,
+                                                        lambda: va_charts.generate_cashflow_chart(
+                                                            cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True))
             if cashflow_chart:
                 instanciated_charts.append(cashflow_chart)
 
-        if 'Cash_in / Cash_out' in graphs_list and cashflow_product is not None:
-            cashflow_chart = va_charts.generate_cashin_cashout_chart(
-                cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True)
+        if 'Cash_in / Cash_out' in charts_to_build:
+            cashflow_chart = va_charts.get_cached_chart('Cash_in / Cash_out', selection, cashflow_inputs,
+                                                        lambda: va_charts.generate_cashin_cashout_chart(
+                                                            cashflow_product, name, annotation_upper_left, annotation_upper_right, currency=currency, add_cumulated=True))
             if cashflow_chart:
                 instanciated_charts.append(cashflow_chart)
 
-        if 'Detailed Cashflow' in graphs_list and cashflow_product_gather is not None:
-            cf_df_dict = {}
-            for g in cashflow_product_gather.keys():
-                if g in granularity_to_draw:
-                    cf_df_dict[g] = cashflow_product_gather[g]
+        if 'Detailed Cashflow' in charts_to_build:
+            cf_df_dict = {g: cashflow_product_gather[g]
+                          for g in granularity_to_draw}
 
-            detailed_cashflow_chart = va_charts.generate_detailed_cashflow_chart(
-                cf_df_dict, name, {}, {}, currency=currency)
+            detailed_cashflow_chart = va_charts.get_cached_chart('Detailed Cashflow', selection, cf_df_dict,
+                                                                 lambda: va_charts.generate_detailed_cashflow_chart(
+                                                                     cf_df_dict, name, {}, {}, currency=currency))
             if detailed_cashflow_chart:
                 instanciated_charts.append(detailed_cashflow_chart)
 
-        if 'Profit and Loss' in graphs_list and EBIT_product is not None:
-            pnl_chart = va_charts.generate_pnl_chart(
-                EBIT_product, name, {}, {}, currency=currency, add_cumulated=True)
+        if 'Profit and Loss' in charts_to_build:
+            EBIT_product = chart_outputs.get('pnl_product')
+            pnl_chart = va_charts.get_cached_chart('Profit and Loss', selection, {'pnl_product': EBIT_product},
+                                                   lambda: va_charts.generate_pnl_chart(
+                                                       EBIT_product, name, {}, {}, currency=currency, add_cumulated=True))
             if pnl_chart:
                 instanciated_charts.append(pnl_chart)
 
-        if 'Profit and Loss Waterfall' in graphs_list and EBIT_product_gather is not None:
+        EBIT_product_gather = chart_outputs.get(
+            'pnl_product_gather') if 'Profit and Loss Waterfall' in charts_to_build else None
+        if EBIT_product_gather is not None:
             pnl_df_dict = {}
             for g in EBIT_product_gather.keys():
                 if g in granularity_to_draw:
                     pnl_df_dict[g] = EBIT_product_gather[g]
 
-            pnl_waterfall_chart_chart = va_charts.generate_pnl_waterfall_chart(
-                pnl_df_dict, name, currency=currency)
+            pnl_waterfall_chart_chart = va_charts.get_cached_chart('Profit and Loss Waterfall', selection, pnl_df_dict,
+                                                                   lambda: va_charts.generate_pnl_waterfall_chart(
+                                                                       pnl_df_dict, name, currency=currency))
             if pnl_waterfall_chart_chart:
                 instanciated_charts.append(pnl_waterfall_chart_chart)
 
-        if 'Value Assessment' in graphs_list and cashflow_infos_gather is not None:
+        if 'Value Assessment' in charts_to_build:
             cf_info_dict = {}
             if granularity_level == 0:
                 cf_info_dict[name] = [cashflow_info['total_free_cash_flow']]
@@ -285,8 +270,9 @@ class SumValueAssessmentValueBlockDiscipline(SumValueBlockDiscipline):
                     if g in granularity_to_draw:
                         cf_info_dict[g] = [
                             cashflow_infos_gather[g]['total_free_cash_flow']]
-            value_assessment_chart = va_charts.generate_value_assessment_chart(
-                cf_info_dict, name, currency)
+            value_assessment_chart = va_charts.get_cached_chart('Value Assessment', selection, cf_info_dict,
+                                                                 lambda: va_charts.generate_value_assessment_chart(
+                                                                     cf_info_dict, name, currency))
             instanciated_charts.append(value_assessment_chart)
 
         return instanciated_charts
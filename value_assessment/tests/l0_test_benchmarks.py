@@ -0,0 +1,79 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import tempfile
+from os.path import join
+from value_assessment.benchmarks.benchmark_suite import BenchmarkSuite, save_results, load_results, \
+    compare_results
+from value_assessment.benchmarks.import_time import measure_import
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+
+    def test_01_run_tiny_scale(self):
+        suite = BenchmarkSuite(scale='tiny', repeat=1)
+        # cases of the models only, the others need the execution engine
+        case_names = [name for name in suite.cases.keys()
+                      if name not in ['usecase_RATATOUILLE', 'worker startup'] and not name.startswith('grid search')]
+        results = suite.run(case_names)
+
+        self.assertEqual([result['name'] for result in results['results']], case_names)
+        for result in results['results']:
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(len(result['times']), 1)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = join(tmp_dir, 'results', 'benchmark.json')
+            save_results(results, path)
+            loaded_results = load_results(path)
+        self.assertEqual(loaded_results['metadata']['scale'], 'tiny')
+
+        comparison = compare_results(loaded_results, results)
+        self.assertEqual(len(comparison), len(case_names))
+        self.assertFalse(any(case['regression'] for case in comparison))
+
+    def test_02_compare_results(self):
+        baseline = {'results': [{'name': 'case', 'status': 'ok', 'min': 1.},
+                                {'name': 'skipped_case', 'status': 'skipped'}]}
+        current = {'results': [{'name': 'case', 'status': 'ok', 'min': 1.5},
+                               {'name': 'skipped_case', 'status': 'ok', 'min': 1.}]}
+
+        comparison = compare_results(baseline, current, tolerance=0.2)
+        self.assertEqual(len(comparison), 1)
+        self.assertTrue(comparison[0]['regression'])
+        self.assertAlmostEqual(comparison[0]['ratio'], 1.5)
+
+    def test_03_unknown_scale(self):
+        with self.assertRaises(Exception):
+            BenchmarkSuite(scale='huge')
+
+    def test_04_lazy_chart_imports(self):
+        # the figure cache is created with the disciplines, plotly must only be loaded when charts are built
+        result = measure_import(['value_assessment.sos_wrapping.post_processing.figure_cache'],
+                                chart_modules=['plotly', 'plotly.graph_objects'])
+        self.assertEqual(result['loaded'], [])
+        self.assertGreater(result['import_time'], 0.)
+
+        with self.assertRaises(ImportError):
+            measure_import(['value_assessment.unknown_module'])
+
+
+if __name__ == "__main__":
+    unittest.main()
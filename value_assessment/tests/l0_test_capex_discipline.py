@@ -159,6 +159,28 @@ class CAPEXDiscTest(unittest.TestCase):
         pd.util.testing.assert_frame_equal(
             capex[['capex']], capex_ref[['capex']], 'Error : year_start_escalation can not be set before year start')
 
+    def test_05_result_cache(self):
+        disc = self.ee.dm.get_disciplines_with_name(
+            f'{self.name}.{self.model_name}')[0]
+        disc.result_cache.clear()
+        disc.__class__.RESULT_CACHE = True
+        try:
+            self.ee.load_study_from_input_dict(self.values_dict)
+            self.ee.execute()
+            capex = self.ee.dm.get_value(f'{self.name}.{self.model_name}.capex')
+
+            # second run of the same inputs reuses the outputs, the model is set as for a computed run
+            disc.capex_model = None
+            disc.run()
+            self.assertEqual(disc.result_cache.cache_info().hits, 1)
+            self.assertIsNotNone(disc.capex_model)
+            self.assertEqual(disc.capex_model.launch_year, self.launch_year)
+            pd.util.testing.assert_frame_equal(
+                self.ee.dm.get_value(f'{self.name}.{self.model_name}.capex'), capex)
+        finally:
+            disc.__class__.RESULT_CACHE = False
+            disc.result_cache.clear()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+from value_assessment.core.toolbox.cashflow_rollup import CashflowRollup
+
+
+class CashflowRollupTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.cf_df_dict = {}
+        for i in range(10):
+            years = np.arange(2020 + i, 2040)
+            self.cf_df_dict[f'product{i}'] = pd.DataFrame({'years': years,
+                                                           'cash_flow': rng.uniform(-100., 100., len(years)),
+                                                           'quantity': rng.uniform(0., 10., len(years))})
+        # product without quantity
+        self.cf_df_dict['product0'] = self.cf_df_dict['product0'].drop(columns=['quantity'])
+
+    def test_01_aligned_metrics(self):
+        rollup = CashflowRollup(self.cf_df_dict)
+        self.assertEqual(rollup.values.shape, (10, 20, 2))
+        self.assertListEqual(rollup.metrics, ['cash_flow', 'quantity'])
+        np.testing.assert_array_equal(rollup.years, np.arange(2020, 2040))
+
+        cash_flow = rollup.get_metric('cash_flow')
+        # product3 starts in 2023
+        np.testing.assert_array_equal(cash_flow[3, :3], 0.)
+        np.testing.assert_array_equal(cash_flow[3, 3:], self.cf_df_dict['product3']['cash_flow'].values)
+
+        ref_total = pd.concat(self.cf_df_dict.values()).groupby('years')['cash_flow'].sum()
+        np.testing.assert_allclose(cash_flow.sum(axis=0), ref_total.values)
+
+    def test_02_missing_metric(self):
+        rollup = CashflowRollup(self.cf_df_dict)
+
+        np.testing.assert_array_equal(rollup.get_metric('quantity')[0], 0.)
+        np.testing.assert_array_equal(rollup.get_metric('EBIT'), np.zeros((10, 20)))
+
+
+if __name__ == "__main__":
+    unittest.main()
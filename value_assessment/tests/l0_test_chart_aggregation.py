@@ -0,0 +1,78 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+from value_assessment.sos_wrapping.post_processing.chart_aggregation import select_top_contributors, bin_years, OTHER_NAME
+from value_assessment.sos_wrapping.post_processing.post_proc_output import ValueAssessmentCharts
+
+
+class ChartAggregationTest(unittest.TestCase):
+
+    def test_01_top_contributors(self):
+        keys = ['product1', 'product2', 'product3', 'product4']
+        values = np.array([[1., -1.], [-10., 5.], [0.5, 0.], [3., 3.]])
+
+        top_keys, top_values = select_top_contributors(keys, values, 3)
+        self.assertEqual(top_keys, ['product2', 'product4', OTHER_NAME])
+        np.testing.assert_array_equal(
+            top_values, [[-10., 5.], [3., 3.], [1.5, -1.]])
+        np.testing.assert_array_equal(
+            top_values.sum(axis=0), values.sum(axis=0))
+
+        top_keys, top_values = select_top_contributors(keys, values, 4)
+        self.assertEqual(top_keys, keys)
+
+    def test_02_bin_years(self):
+        years = np.arange(2020, 2031)
+        values = np.array([np.ones(11), np.arange(11.)])
+
+        bin_labels, binned_values = bin_years(years, values, 4)
+        self.assertEqual(bin_labels, ['2020-2022', '2023-2025',
+                                      '2026-2028', '2029-2030'])
+        np.testing.assert_array_equal(
+            binned_values, [[3., 3., 3., 2.], [3., 12., 21., 19.]])
+
+        bin_labels, binned_values = bin_years(years, values, 11)
+        np.testing.assert_array_equal(bin_labels, years)
+
+    def test_03_aggregation_switch(self):
+        years = np.arange(2020, 2100)
+        cf_df_dict = {f'product{i}': pd.DataFrame({'years': years, 'cash_flow': np.full(len(years), float(i))})
+                      for i in range(30)}
+
+        # charts are not aggregated by default
+        self.assertFalse(ValueAssessmentCharts.AGGREGATE_CHARTS)
+        chart = ValueAssessmentCharts().generate_detailed_cashflow_chart(
+            cf_df_dict, 'Sum', {}, {}, '€')
+        self.assertEqual(len(chart.plotly_fig.data), 30)
+
+        chart = ValueAssessmentCharts(aggregate_charts=True).generate_detailed_cashflow_chart(
+            cf_df_dict, 'Sum', {}, {}, '€')
+        self.assertEqual(len(chart.plotly_fig.data),
+                         ValueAssessmentCharts.MAX_TRACES)
+        self.assertEqual(chart.plotly_fig.data[-1].name,
+                         f'{OTHER_NAME} Free Cashflow')
+        self.assertLessEqual(len(chart.plotly_fig.data[0].x),
+                             ValueAssessmentCharts.MAX_YEAR_POINTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
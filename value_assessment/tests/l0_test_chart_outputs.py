@@ -0,0 +1,68 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import pandas as pd
+from value_assessment.sos_wrapping.post_processing.chart_outputs import ChartOutputs
+
+
+class ChartOutputsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.outputs = {
+            'cashflow_infos': {'npv': 1.},
+            'cashflow_infos_dollars': {'npv': 1.2},
+            'cashflow_product_gather': {'product1': pd.DataFrame({'years': [2020]})},
+            'cashflow_product_dollars_gather': {'product1': pd.DataFrame({'years': [2020]})},
+            'hypothesis_summary': {'last_year': 2030},
+        }
+        self.fetched = []
+
+    def get_outputs(self, name):
+        self.fetched.append(name)
+        return self.outputs[name]
+
+    def test_01_lazy_fetch_without_copy(self):
+        chart_outputs = ChartOutputs(self.get_outputs, self.outputs.keys())
+        self.assertEqual(self.fetched, [])
+
+        self.assertIs(chart_outputs.get('cashflow_infos'),
+                      self.outputs['cashflow_infos'])
+        chart_outputs.get('cashflow_infos')
+        self.assertEqual(self.fetched, ['cashflow_infos'])
+
+        self.assertIsNone(chart_outputs.get('pnl_product'))
+        self.assertFalse(chart_outputs.has('pnl_product'))
+        self.assertEqual(self.fetched, ['cashflow_infos'])
+
+    def test_02_currency_names(self):
+        chart_outputs = ChartOutputs(
+            self.get_outputs, self.outputs.keys(), currency='$')
+
+        self.assertEqual(chart_outputs.get('cashflow_infos')['npv'], 1.2)
+        self.assertIs(chart_outputs.get('cashflow_product_gather'),
+                      self.outputs['cashflow_product_dollars_gather'])
+        self.assertIs(chart_outputs.get('hypothesis_summary'),
+                      self.outputs['hypothesis_summary'])
+        self.assertEqual(self.fetched, [
+                         'cashflow_infos_dollars', 'cashflow_product_dollars_gather', 'hypothesis_summary'])
+
+
+if __name__ == "__main__":
+    unittest.main()
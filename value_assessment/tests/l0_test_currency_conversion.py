@@ -0,0 +1,102 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from value_assessment.core.toolbox.currency_conversion import scale_dataframe, get_exchange_rate
+from value_assessment.core.toolbox.vb_meta import ValueBlock
+
+
+class CurrencyConversionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'years': [2020, 2021, 2022],
+                                'quantity': [10., 20., 30.],
+                                'cash_in': [100., 200., 300.],
+                                'cash_out': [-50, -60, -70]})
+        self.df_ref = self.df.copy()
+        self.to_ignore = ['years', 'quantity']
+
+    def test_01_exchange_rate(self):
+        self.assertEqual(get_exchange_rate(0.8, 'USD', 'EUR'), 0.8)
+        self.assertEqual(get_exchange_rate(0.8, 'EUR', 'USD'), 1. / 0.8)
+        self.assertEqual(get_exchange_rate(0.8, 'EUR', 'EUR'), 1)
+
+    def test_02_identity_rate(self):
+        for exchange_rate in [1, 1., None]:
+            converted_df = scale_dataframe(
+                self.df, exchange_rate, self.to_ignore)
+
+            self.assertIsNot(converted_df, self.df)
+            assert_frame_equal(converted_df, self.df_ref)
+            # nothing is copied
+            self.assertTrue(np.shares_memory(
+                converted_df['cash_in'].values, self.df['cash_in'].values))
+
+    def test_03_scale_monetary_columns_only(self):
+        converted_df = scale_dataframe(self.df, 0.8, self.to_ignore)
+
+        self.assertListEqual(list(converted_df.columns),
+                             list(self.df.columns))
+        np.testing.assert_array_equal(
+            converted_df['years'], self.df_ref['years'])
+        np.testing.assert_array_equal(
+            converted_df['quantity'], self.df_ref['quantity'])
+        np.testing.assert_allclose(
+            converted_df['cash_in'], self.df_ref['cash_in'] * 0.8)
+        np.testing.assert_allclose(
+            converted_df['cash_out'], self.df_ref['cash_out'] * 0.8)
+        self.assertEqual(converted_df['cash_out'].dtype, float)
+
+    def test_04_input_not_mutated(self):
+        converted_df = scale_dataframe(self.df, 0.8, self.to_ignore)
+        assert_frame_equal(self.df, self.df_ref)
+
+        # writing in the converted dataframe leaves the input unchanged
+        converted_df['quantity'] *= 2.
+        converted_df.loc[0, 'cash_in'] = -1.
+        assert_frame_equal(self.df, self.df_ref)
+
+    def test_05_convert_values(self):
+        value_block = ValueBlock(2020, 2022, 'actor', 0.08, 0.8)
+        infos = {'npv': 1000., 'irr': 0.1,
+                 'year_break_even_cashflow': 'NA'}
+        infos_ref = dict(infos)
+
+        converted_infos = value_block.convert_values_USD_EUR(
+            infos, to_ignore=['irr', 'year_break_even_cashflow'])
+        self.assertDictEqual(converted_infos, {'npv': 800., 'irr': 0.1,
+                                               'year_break_even_cashflow': 'NA'})
+        self.assertDictEqual(infos, infos_ref)
+
+        converted_dict = value_block.convert_values_USD_EUR(
+            {'product': self.df}, to_ignore=self.to_ignore, currency_from='EUR', currency_to='USD')
+        np.testing.assert_allclose(
+            converted_dict['product']['cash_in'], self.df_ref['cash_in'] / 0.8)
+        assert_frame_equal(self.df, self.df_ref)
+
+        self.assertAlmostEqual(value_block.convert_values_USD_EUR(10.), 8.)
+        with self.assertRaises(Exception):
+            value_block.convert_values_USD_EUR([10.])
+
+
+if __name__ == "__main__":
+    unittest.main()
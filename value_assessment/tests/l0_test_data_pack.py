@@ -0,0 +1,78 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import tempfile
+from os.path import join, dirname
+import numpy as np
+import pandas as pd
+from value_assessment.core.toolbox.data_pack import DataPack, CsvDataDir, write_data_pack, \
+    convert_csv_to_data_pack, open_usecase_data
+
+
+class DataPackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dirs = [join(dirname(__file__), '..', 'sos_processes', process, 'data')
+                          for process in ['generic_value_assessment', 'generic_value_assessment_grid_search_sensitivity']]
+
+    def test_01_convert_usecase_data(self):
+        for data_dir in self.data_dirs:
+            csv_data = CsvDataDir(data_dir)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                data_pack = DataPack(convert_csv_to_data_pack(
+                    data_dir, join(tmp_dir, 'data.vapack')))
+                for table in data_pack.tables:
+                    for key in data_pack.get_keys(table):
+                        pd.testing.assert_frame_equal(data_pack.get_table(table, key),
+                                                      csv_data.get_table(table, key))
+
+    def test_02_product_tables(self):
+        tables = {'product_sales_df': {f'product{i}': pd.DataFrame({'years': np.arange(2020, 2020 + i + 1),
+                                                                    'quantity': np.arange(i + 1.)})
+                                       for i in range(100)},
+                  'design_space': {None: pd.DataFrame({'shortest_name': ['a', np.nan],
+                                                       'selected': [True, False]})}}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_data_pack(tables, tmp_dir)
+            data_pack = DataPack(tmp_dir)
+
+            self.assertEqual(len(data_pack.get_keys('product_sales_df')), 100)
+            pd.testing.assert_frame_equal(data_pack.get_table('product_sales_df', 'product42'),
+                                          tables['product_sales_df']['product42'])
+            pd.testing.assert_frame_equal(data_pack.get_table('design_space'),
+                                          tables['design_space'][None])
+            with self.assertRaises(Exception):
+                data_pack.get_table('product_sales_df', 'product100')
+
+    def test_03_open_usecase_data(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pd.DataFrame({'years': [2020], 'quantity': [1.]}).to_csv(
+                join(tmp_dir, 'product1_product_sales_df.csv'), index=False)
+            self.assertIsInstance(open_usecase_data(tmp_dir), CsvDataDir)
+
+            convert_csv_to_data_pack(tmp_dir)
+            usecase_data = open_usecase_data(tmp_dir)
+            self.assertIsInstance(usecase_data, DataPack)
+            self.assertEqual(usecase_data.get_table(
+                'product_sales_df', 'product1')['quantity'].tolist(), [1.])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from value_assessment.sos_wrapping.post_processing.figure_cache import FigureCache
+
+
+class Chart():
+
+    def __init__(self, fig, chart_name):
+        self.fig = fig
+        self.chart_name = chart_name
+        self.annotations = {'Total': [1.]}
+
+
+class FigureCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cf_df = pd.DataFrame({'years': np.arange(2020, 2031),
+                                   'cash_flow': np.linspace(-1.e6, 2.e6, 11)})
+        self.nb_builds = 0
+
+    def build_chart(self):
+        self.nb_builds += 1
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=self.cf_df['years'].tolist(),
+                             y=self.cf_df['cash_flow'].tolist(), name='Free Cashflow'))
+        fig.update_layout(barmode='relative')
+
+        return Chart(fig, 'Cashflow')
+
+    def test_01_cache_hit(self):
+        figure_cache = FigureCache()
+        chart = figure_cache.get('Cashflow', ('product', '€'), {
+            'cashflow_product': self.cf_df}, self.build_chart)
+        cached_chart = figure_cache.get('Cashflow', ('product', '€'), {
+            'cashflow_product': self.cf_df.copy()}, self.build_chart)
+
+        self.assertEqual(self.nb_builds, 1)
+        self.assertIsNot(cached_chart, chart)
+        self.assertEqual(cached_chart.fig.to_plotly_json(),
+                         chart.fig.to_plotly_json())
+        self.assertEqual(cached_chart.chart_name, 'Cashflow')
+
+        # cached charts cannot be modified through returned charts
+        cached_chart.annotations['Total'].append(2.)
+        self.assertEqual(figure_cache.get('Cashflow', ('product', '€'), {
+            'cashflow_product': self.cf_df}, self.build_chart).annotations, {'Total': [1.]})
+
+    def test_02_cache_miss(self):
+        figure_cache = FigureCache(maxsize=1)
+        figure_cache.get('Cashflow', ('product', '€'), {
+                         'cashflow_product': self.cf_df}, self.build_chart)
+        figure_cache.get('Cashflow', ('product', '$'), {
+                         'cashflow_product': self.cf_df}, self.build_chart)
+        modified_df = self.cf_df.copy()
+        modified_df.loc[0, 'cash_flow'] = 0.
+        figure_cache.get('Cashflow', ('product', '$'), {
+                         'cashflow_product': modified_df}, self.build_chart)
+        self.assertEqual(self.nb_builds, 3)
+
+        # first chart was evicted
+        figure_cache.get('Cashflow', ('product', '€'), {
+                         'cashflow_product': self.cf_df}, self.build_chart)
+        self.assertEqual(self.nb_builds, 4)
+        self.assertEqual(figure_cache.cache_info().currsize, 1)
+
+    def test_03_chart_list(self):
+        figure_cache = FigureCache()
+        charts = figure_cache.get('OpEx charts', ('opex', ['Cashflow']), {'opex': self.cf_df},
+                                  lambda: [self.build_chart(), self.build_chart()])
+        cached_charts = figure_cache.get('OpEx charts', ('opex', ['Cashflow']), {'opex': self.cf_df},
+                                         lambda: [self.build_chart(), self.build_chart()])
+
+        self.assertEqual(self.nb_builds, 2)
+        self.assertEqual(len(cached_charts), 2)
+        self.assertEqual(cached_charts[1].fig.to_plotly_json(),
+                         charts[1].fig.to_plotly_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
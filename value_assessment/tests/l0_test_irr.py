@@ -0,0 +1,99 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+from value_assessment.core.toolbox.IRR import IRR, IRRBatch
+from value_assessment.core.toolbox.cashflow_batch import CashflowBatch
+from value_assessment.core.toolbox.vb_meta import ValueBlock
+
+
+class IRRTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cashflow_list = [
+            np.array([-100., 30., 40., 50., 20.]),
+            # positive irr on a long quarterly horizon
+            np.concatenate([-np.ones(50) * 100., np.ones(150) * 60.]),
+            # several sign changes with leading and trailing zeros
+            np.array([0., 0., -500., -300., 200., 400., 400., -100., 300., 0.]),
+            # no positive irr
+            np.array([-100., 20., 20., 20.]),
+            np.array([100., 20., 20.]),
+            np.zeros(5),
+        ]
+
+    def test_01_bracket_vs_roots(self):
+        for cashflow in self.cashflow_list:
+            irr_roots = IRR(cashflow, method=IRR.ROOTS).compute_irr()
+            irr_bracket = IRR(cashflow, method=IRR.BRACKET).compute_irr()
+            if irr_roots == 'NA':
+                self.assertEqual(irr_bracket, 'NA')
+            else:
+                self.assertAlmostEqual(irr_bracket, irr_roots, delta=1e-10)
+
+    def test_02_npv_at_irr(self):
+        cashflow = self.cashflow_list[2]
+        irr = IRR(cashflow).compute_irr()
+        npv = np.sum(cashflow / (1 + irr) ** np.arange(len(cashflow)))
+
+        self.assertAlmostEqual(npv, 0., delta=1e-8)
+
+    def test_03_batch_irr(self):
+        nb_periods = max(len(cashflow) for cashflow in self.cashflow_list)
+        cashflow_matrix = np.array([np.pad(cashflow, (0, nb_periods - len(cashflow)))
+                                    for cashflow in self.cashflow_list])
+
+        irr_batch = IRRBatch(cashflow_matrix).compute_irr()
+
+        for i, cashflow in enumerate(self.cashflow_list):
+            irr = IRR(cashflow).compute_irr()
+            if irr == 'NA':
+                self.assertTrue(np.isnan(irr_batch[i]))
+            else:
+                self.assertAlmostEqual(irr_batch[i], irr, delta=1e-10)
+
+    def test_04_batch_cf_infos(self):
+        years = np.arange(2020, 2030)
+        cashflow_matrix = np.array([[-100., -50., 20., 40., 60., 60., 60., 60., 60., 60.],
+                                    [-100., -50., 10., 10., 10., 10., 10., 10., 10., 10.]])
+        wacc = np.array([0.08, 0.05])
+
+        cf_infos = CashflowBatch(cashflow_matrix, years, wacc).compute_cf_infos()
+
+        for i in range(len(cashflow_matrix)):
+            value_block = ValueBlock(
+                years[0], years[-1], None, wacc[i], 1.)
+            value_block.init_ledger(['cash_in', 'cash_out'])
+            value_block.ledger['cash_in'] = np.maximum(cashflow_matrix[i], 0.)
+            value_block.ledger['cash_out'] = np.minimum(
+                cashflow_matrix[i], 0.)
+            value_block._compute_discounted_cashflow(wacc[i])
+            value_block.compute_cf_df_info()
+
+            for key, value in value_block.get_cashflow_infos().items():
+                if value == 'NA':
+                    self.assertTrue(np.isnan(cf_infos[key][i]))
+                else:
+                    self.assertAlmostEqual(
+                        cf_infos[key][i], value, delta=1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+from value_assessment.core.value_blocks.manufacturer_VB import ManufacturerVB
+
+
+class ManufacturerVBModelTest(unittest.TestCase):
+    """
+    Test of ManufacturerVB
+    """
+
+    def setUp(self):
+        self.year_start = 2020
+        self.year_end = 2029
+        self.years = np.arange(self.year_start, self.year_end + 1)
+        self.quantity = np.array(
+            [0., 0., 10.5, 20.25, 30.75, 30., 25.5, 20., 15.9, 10.1])
+
+        self.opex = pd.DataFrame({'years': self.years,
+                                  'opex': np.linspace(1000., 1500., len(self.years)),
+                                  'opex_after_sales': np.full(len(self.years), 20.)})
+        self.capex = pd.DataFrame({'years': self.years,
+                                   'capex': np.full(len(self.years), 1.e5),
+                                   'contingency': np.full(len(self.years), 1.e3),
+                                   'capex_type1': np.full(len(self.years), 4.e4),
+                                   'capex_type2': np.full(len(self.years), 6.e4)})
+        self.price = pd.DataFrame({'years': self.years,
+                                   'sale_price': np.full(len(self.years), 5000.)})
+        self.manufacturer_dict = {
+            'opex_payment_term_percentage': pd.DataFrame({'percentage_at_delivery_year-1': [20.],
+                                                          'percentage_at_delivery_year-2': [10.]}),
+            'nb_years_capex_amort': pd.DataFrame({'Distribution Category': ['type1', 'type2'],
+                                                  'Nb years': [0, 5]})}
+
+    def compute_value_block(self, opex, sales):
+        value_block = ManufacturerVB(self.year_start, self.year_end, 2022, self.manufacturer_dict,
+                                     actor_wacc=0.08, exchange_rate_USD_EUR=1.)
+        value_block.configure_data(sales, opex, self.capex, self.price)
+        value_block.compute_cashflow()
+
+        return value_block
+
+    def test_01_opex_quantity_kept_with_fractional_sales(self):
+        # opex computed by the opex model carry the sales quantity, which is not truncated
+        opex = self.opex.copy()
+        opex['quantity'] = self.quantity
+        sales = pd.DataFrame({'years': self.years, 'quantity': self.quantity})
+
+        value_block = self.compute_value_block(opex, sales)
+
+        np.testing.assert_array_equal(
+            value_block.ledger['quantity'], self.quantity)
+        np.testing.assert_allclose(
+            value_block.ledger['cash_in'], self.quantity * 5000.)
+        np.testing.assert_allclose(value_block.ledger['opex_total'],
+                                   self.quantity * self.opex['opex'].values)
+
+    def test_02_truncated_sales_quantity_without_opex_quantity(self):
+        sales = pd.DataFrame({'years': self.years, 'quantity': self.quantity})
+
+        value_block = self.compute_value_block(self.opex.copy(), sales)
+
+        np.testing.assert_array_equal(
+            value_block.ledger['quantity'], np.trunc(self.quantity))
+        np.testing.assert_allclose(
+            value_block.ledger['cash_in'], np.trunc(self.quantity) * 5000.)
+
+
+    def test_03_cashflow_and_pnl_in_one_pass(self):
+        sales = pd.DataFrame({'years': self.years, 'quantity': self.quantity})
+        value_block = self.compute_value_block(self.opex.copy(), sales)
+        value_block.compute_PnL()
+
+        one_pass_value_block = ManufacturerVB(self.year_start, self.year_end, 2022, self.manufacturer_dict,
+                                              actor_wacc=0.08, exchange_rate_USD_EUR=1.)
+        one_pass_value_block.configure_data(
+            sales, self.opex.copy(), self.capex, self.price)
+        one_pass_value_block.compute_cashflow_and_pnl()
+
+        pd.testing.assert_frame_equal(
+            one_pass_value_block.cf_df, value_block.cf_df)
+        self.assertEqual(one_pass_value_block.get_cashflow_infos(),
+                         value_block.get_cashflow_infos())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+import pandas as pd
+from value_assessment.core.value_blocks.manufacturer_VB import ManufacturerVB
+from value_assessment.core.toolbox.multiplier_sweep import MultiplierSweep, MultiplierSweepSum
+from value_assessment.core.toolbox.toolboxsumCF import toolboxsumCF
+
+
+class MultiplierSweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.year_start = 2020
+        self.year_end = 2040
+        self.launch_year = 2025
+        years = np.arange(self.year_start, self.year_end + 1)
+        launched = years >= self.launch_year
+
+        self.sales = pd.DataFrame(
+            {'years': years, 'quantity': np.where(launched, 40., 0.)})
+        self.price = pd.DataFrame(
+            {'years': years, 'sale_price': np.where(launched, 1000., 0.)})
+        self.opex = pd.DataFrame({'years': years,
+                                  'opex': np.where(launched, 600., 0.) * 1.02 ** np.arange(len(years)),
+                                  'opex_after_sales': np.where(launched, 20., 0.),
+                                  'opex_comp1': np.where(launched, 600., 0.)})
+        self.capex = pd.DataFrame({'years': years,
+                                   'capex': np.where(launched, 0., 5000.),
+                                   'contingency': np.where(launched, 0., 500.),
+                                   'capex_development1': np.where(launched, 0., 3000.),
+                                   'capex_development2': np.where(launched, 0., 1500.)})
+        self.manufacturer_dict = {
+            'opex_payment_term_percentage': pd.DataFrame({'percentage_at_delivery_year-1': [20.],
+                                                          'percentage_at_delivery_year-2': [10.]}),
+            'nb_years_capex_amort': pd.DataFrame({'Distribution Category': ['development1'],
+                                                  'Nb years': [5]})}
+
+    def get_value_block(self):
+        return ManufacturerVB(self.year_start, self.year_end, self.launch_year,
+                              self.manufacturer_dict, None, 0.08, 1)
+
+    def test_01_sweep_vs_value_block(self):
+        opex_multipliers, capex_multipliers = [multipliers.ravel() for multipliers in np.meshgrid(
+            np.linspace(0., 200., 5), np.linspace(50., 150., 3))]
+
+        sweep = MultiplierSweep(self.get_value_block(), self.sales, self.opex, self.capex, self.price)
+        cf_infos = sweep.compute_cf_infos(opex_multipliers, capex_multipliers)
+        EBIT = sweep.compute_column(opex_multipliers, capex_multipliers, 'EBIT')
+
+        for i, (opex_multiplier, capex_multiplier) in enumerate(zip(opex_multipliers, capex_multipliers)):
+            opex = self.opex.copy()
+            opex[['opex', 'opex_after_sales']] *= opex_multiplier / 100.
+            capex = self.capex.copy()
+            capex[['capex', 'contingency', 'capex_development1', 'capex_development2']] *= capex_multiplier / 100.
+
+            value_block = self.get_value_block()
+            value_block.configure_data(self.sales.copy(), opex, capex, self.price.copy())
+            value_block.compute_cashflow()
+            value_block.compute_PnL()
+
+            np.testing.assert_allclose(EBIT[i], value_block.ledger['EBIT'], atol=1e-6)
+            for key, value in value_block.cf_infos.items():
+                if value == 'NA':
+                    self.assertTrue(np.isnan(cf_infos[key][i]))
+                else:
+                    self.assertAlmostEqual(cf_infos[key][i], value, delta=1e-6 * max(1., abs(value)))
+
+    def test_02_sweep_sum_vs_value_blocks(self):
+        # second product with a lower price and twice the capex
+        price_2 = self.price.copy()
+        price_2['sale_price'] *= 0.8
+        capex_2 = self.capex.copy()
+        capex_2[['capex', 'contingency', 'capex_development1', 'capex_development2']] *= 2.
+        inputs = {'product_1': (self.capex, self.price),
+                  'product_2': (capex_2, price_2)}
+
+        sweeps = {name: MultiplierSweep(self.get_value_block(), self.sales, self.opex, capex, price)
+                  for name, (capex, price) in inputs.items()}
+        opex_multipliers = {'product_1': np.array([0., 50., 100., 150.]),
+                            'product_2': np.array([100., 100., 80., 120.])}
+        capex_multipliers = {'product_1': np.array([100., 0., 100., 200.]),
+                             'product_2': np.array([50., 100., 100., 100.])}
+        cf_infos_list = MultiplierSweepSum(sweeps).compute_cf_infos(
+            opex_multipliers, capex_multipliers)
+
+        self.assertEqual(len(cf_infos_list), 4)
+        for i, cf_infos in enumerate(cf_infos_list):
+            cf_sum = None
+            for name, (capex, price) in inputs.items():
+                opex = self.opex.copy()
+                opex[['opex', 'opex_after_sales']] *= opex_multipliers[name][i] / 100.
+                capex = capex.copy()
+                capex[['capex', 'contingency', 'capex_development1', 'capex_development2']] *= \
+                    capex_multipliers[name][i] / 100.
+
+                value_block = self.get_value_block()
+                value_block.configure_data(self.sales.copy(), opex, capex, price.copy())
+                value_block.compute_cashflow()
+                cf_df = pd.DataFrame({column: value_block.ledger[column] for column in
+                                      ['cash_flow', 'cumulative_cash_flow', 'cumulative_discounted_cf']})
+                cf_sum = cf_df if cf_sum is None else cf_sum + cf_df
+            cf_sum.insert(0, 'years', value_block.ledger.years)
+
+            cf_infos_ref = toolboxsumCF().compute_cf_df_info(cf_sum)
+            self.assertListEqual(list(cf_infos), list(cf_infos_ref))
+            for key, value in cf_infos_ref.items():
+                if value == 'NA':
+                    self.assertEqual(cf_infos[key], 'NA')
+                else:
+                    self.assertAlmostEqual(cf_infos[key], value, delta=1e-6 * max(1., abs(value)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,8 @@ import unittest
 import numpy as np
 import pandas as pd
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
+from value_assessment.core.opex import Opex
+from value_assessment.sos_wrapping.opex.opex_discipline import OPEXDiscipline
 
 
 class OPEXDiscTest(unittest.TestCase):
@@ -161,5 +163,60 @@ class OPEXDiscTest(unittest.TestCase):
             opex[['opex']], opex_ref[['opex']])
 
 
+class OPEXBatchDriverTest(unittest.TestCase):
+    '''
+    OPEXDiscipline.compute_outputs_batch used as a standalone driver API, from inputs dicts and without execution engine
+    '''
+
+    def setUp(self):
+        sales_df = pd.DataFrame(
+            {'years': np.arange(2020, 2051), 'quantity': 50.0})
+        sales_df.loc[sales_df['years'] < 2030, 'quantity'] = 0
+        default_inputs = {key: value['default'] for key, value in OPEXDiscipline.DESC_IN.items()
+                          if 'default' in value}
+
+        self.inputs_dict = dict(default_inputs, launch_year=2030, year_start=2025, year_end=2050,
+                                escalation_opex_df=pd.DataFrame({'year_economical_conditions': [2021],
+                                                                 'yearly_escalation_rate': [2.0]}),
+                                opex_by_category=pd.DataFrame({'components': ['comp1', 'comp2', 'comp3'],
+                                                               'opex': [1863., 1864., 1683.]}),
+                                product_sales_df=sales_df, opex_multiplier=100.)
+        # second product with other components, launch year and learning curve
+        self.other_inputs_dict = dict(self.inputs_dict, launch_year=2027, opex_multiplier=80.,
+                                      opex_by_category=pd.DataFrame({'components': ['comp3', 'comp6'],
+                                                                     'opex': [500., 250.]}),
+                                      learning_curve_product_dict={'percentage_make': 40.,
+                                                                   'learning_curve_coefficient': [0.85, 0.95],
+                                                                   'until_product_rank': [50., 400.]})
+        # third product with other years, computed in its own batch
+        self.late_inputs_dict = dict(self.inputs_dict, year_start=2028)
+
+    def compute_outputs(self, inputs_dict):
+        # outputs of one discipline run, as computed by OPEXDiscipline.compute_outputs
+        model_inputs = OPEXDiscipline.get_model_inputs(inputs_dict)
+        opex_model = Opex(escalation_rate=model_inputs['escalation_rate'],
+                          year_start_escalation_rate=model_inputs['year_start_escalation_rate'],
+                          launch_year=inputs_dict['launch_year'], year_start=inputs_dict['year_start'],
+                          year_end=inputs_dict['year_end'], learning_curve_dict=model_inputs['learning_curve_dict'])
+        opex_df = opex_model.compute_opex_by_category(opex_by_category=inputs_dict['opex_by_category'],
+                                                      sales=inputs_dict['product_sales_df'],
+                                                      opex_multiplier=inputs_dict['opex_multiplier'] / 100.0,
+                                                      distrib_after_sales_opex_unit=model_inputs['after_sales_opex_unit'])
+
+        return OPEXDiscipline.get_outputs(opex_df)
+
+    def test_01_compute_outputs_batch(self):
+        inputs_dict_list = [self.inputs_dict,
+                            self.other_inputs_dict, self.late_inputs_dict]
+        outputs_list = OPEXDiscipline.compute_outputs_batch(inputs_dict_list)
+
+        self.assertEqual(len(outputs_list), len(inputs_dict_list))
+        for inputs_dict, outputs in zip(inputs_dict_list, outputs_list):
+            expected_outputs = self.compute_outputs(inputs_dict)
+            for output_name in ['opex', 'opex_total']:
+                pd.util.testing.assert_frame_equal(
+                    outputs[output_name], expected_outputs[output_name], check_exact=False)
+
+
 if __name__ == "__main__":
     unittest.main()
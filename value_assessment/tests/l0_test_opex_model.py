@@ -21,7 +21,9 @@ import unittest
 import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
-from value_assessment.core.opex import Opex
+from value_assessment.core.opex import Opex, OpexBatch
+from value_assessment.core.toolbox.escalation import get_escalation_factor
+from value_assessment.core.toolbox.learning_curve import LearningCurve, LearningCurveBatch
 
 
 class OpexModelTest(unittest.TestCase):
@@ -106,6 +108,115 @@ class OpexModelTest(unittest.TestCase):
         assert_frame_equal(opex_df[['years', 'opex_wo_escalation',
                                     'learning_curve_coef', 'opex_Make', 'opex_Buy', 'opex', 'opex_after_sales']], new_ref_opex)
 
+    def test_03_learning_curve_large_quantities(self):
+        learning_curve_dict = {
+            'percentage_make': 100., 'learning_curve_coefficient': [0.8, 0.9, 0.95], 'until_product_rank': [50., 2000., 100000.]}
+        sales_df = pd.DataFrame(
+            {'years': np.arange(2020, 2051), 'quantity': 25000.0})
+        sales_df.loc[sales_df['years'] < 2030, 'quantity'] = 0
+        self.opex_model.sales_df = sales_df
+
+        lc_df = self.opex_model.compute_learning_curve_coef(
+            learning_curve_dict)
+
+        # reference : coefficient of each product rank summed one by one
+        ranks = np.arange(1, int(sales_df['quantity'].sum()) + 1)
+        exponents = np.log(
+            learning_curve_dict['learning_curve_coefficient']) / np.log(2)
+        rank_coef = ranks ** exponents[0]
+        for i in range(1, len(exponents)):
+            rank_prev = learning_curve_dict['until_product_rank'][i - 1]
+            coef_prev = rank_coef[int(rank_prev) - 1]
+            rank_coef = np.where(ranks > rank_prev, coef_prev *
+                                 (ranks / rank_prev) ** exponents[i], rank_coef)
+        rank_ref = int(max(learning_curve_dict['until_product_rank']))
+        rank_coef = np.where(ranks > rank_ref,
+                             rank_coef[rank_ref - 1], rank_coef) / rank_coef[rank_ref - 1]
+        cumulative_coef = np.concatenate(([0.], np.cumsum(rank_coef)))
+
+        cumulative_quantity = sales_df['quantity'].cumsum().values.astype(int)
+        ref_coef = np.diff(np.concatenate(
+            ([0.], cumulative_coef[cumulative_quantity]))) / sales_df['quantity'].values
+        ref_coef[sales_df['quantity'].values == 0] = 0.
+
+        np.testing.assert_allclose(
+            lc_df['learning_curve_coef'].values, ref_coef, rtol=1e-9)
+
+    def test_04_batch_compute(self):
+        learning_curve_dicts = [self.learning_curve_dict, {
+            'percentage_make': 60., 'learning_curve_coefficient': [0.85], 'until_product_rank': [100.]}]
+        launch_years = [self.launch_year, 2027]
+        opex_multipliers = [1.0, 0.5]
+        sales_years = np.arange(2027, 2046)
+        sales_quantity = np.array([self.sales_df.set_index('years').loc[sales_years, 'quantity'].values,
+                                   np.arange(len(sales_years)) * 10.])
+        # second product does not use comp5
+        opex_by_category = np.array([self.opex_by_category['opex'].values,
+                                     [100., 200., 300., 400., np.nan]])
+
+        opex_batch_model = OpexBatch(
+            escalation_rate=self.escalation_opex / 100.,
+            year_start_escalation_rate=self.year_escalation_opex,
+            launch_years=launch_years,
+            year_start=self.year_start,
+            year_end=self.year_end,
+            learning_curve_dicts=learning_curve_dicts)
+        opex_df_list = opex_batch_model.compute_opex_by_category(
+            opex_by_category=opex_by_category,
+            components=self.opex_by_category['components'].values.tolist(),
+            sales_years=sales_years,
+            sales_quantity=sales_quantity,
+            distrib_after_sales_opex_unit=self.after_sales_opex_unit,
+            opex_multiplier=np.array(opex_multipliers))
+
+        for i, opex_df in enumerate(opex_df_list):
+            opex_model = Opex(
+                escalation_rate=self.escalation_opex / 100.,
+                year_start_escalation_rate=self.year_escalation_opex,
+                launch_year=launch_years[i],
+                year_start=self.year_start,
+                year_end=self.year_end,
+                learning_curve_dict=learning_curve_dicts[i])
+            opex_by_category_i = self.opex_by_category.loc[~np.isnan(
+                opex_by_category[i])].copy()
+            opex_by_category_i['opex'] = opex_by_category[i][~np.isnan(
+                opex_by_category[i])]
+            ref_opex_df = opex_model.compute_opex_by_category(
+                opex_by_category=opex_by_category_i,
+                sales=pd.DataFrame(
+                    {'years': sales_years, 'quantity': sales_quantity[i]}),
+                opex_multiplier=opex_multipliers[i],
+                distrib_after_sales_opex_unit=self.after_sales_opex_unit)
+
+            assert_frame_equal(opex_df, ref_opex_df, check_dtype=False)
+
+    def test_05_escalation_factor_cache(self):
+        factor = self.opex_model.escalation_factor()
+
+        self.assertIs(factor, get_escalation_factor(
+            2025, 2050, 0.02, 2021.0))
+        self.assertFalse(factor.flags.writeable)
+        np.testing.assert_allclose(
+            factor, 1.02 ** (np.arange(2025, 2051) - 2021))
+
+    def test_06_learning_curve_batch(self):
+        # products with one to three segments, the shorter ones are padded
+        learning_curve_coefficients = [[0.8, 0.9], [0.85], [0.9, 0.8, 0.95]]
+        until_product_ranks = [[50., 200.], [100.], [20., 500., 3000.]]
+        quantity = np.array([np.arange(30.) * 10.,
+                             np.full(30, 7.),
+                             np.concatenate([np.zeros(5), np.full(25, 150.)])])
+        quantity[1, 3] = 2.5
+        cumulative_quantity = np.cumsum(quantity, axis=1)
+
+        batch_coef = LearningCurveBatch(learning_curve_coefficients, until_product_ranks).compute_yearly_coef(
+            quantity, cumulative_quantity)
+
+        for i in range(len(quantity)):
+            ref_coef = LearningCurve(learning_curve_coefficients[i], until_product_ranks[i]).compute_yearly_coef(
+                quantity[i], cumulative_quantity[i])
+            np.testing.assert_allclose(batch_coef[i], ref_coef, rtol=1e-12)
+
 
 if __name__ == "__main__":
     unittest.main()
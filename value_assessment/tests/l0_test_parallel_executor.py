@@ -0,0 +1,58 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+from value_assessment.core.toolbox.IRR import IRR
+from value_assessment.core.toolbox.parallel_executor import ParallelSampleExecutor
+
+
+class IRRSampleEvaluator():
+    '''
+    IRR of a reference cashflow with its investment scaled by the sample
+    '''
+
+    def __init__(self, cashflow):
+        self.cashflow = np.asarray(cashflow, dtype=float)
+
+    def evaluate(self, sample):
+        cashflow = self.cashflow.copy()
+        cashflow[cashflow < 0] *= sample
+
+        return IRR(cashflow).compute_irr()
+
+
+class ParallelSampleExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cashflow = np.concatenate([-np.ones(5) * 100., np.ones(20) * 40.])
+        self.samples = np.linspace(0.5, 3., 23)
+
+    def test_01_parallel_vs_serial(self):
+        serial_results = ParallelSampleExecutor(
+            IRRSampleEvaluator, (self.cashflow,)).execute(self.samples)
+        parallel_results = ParallelSampleExecutor(
+            IRRSampleEvaluator, (self.cashflow,), n_processes=2, chunk_size=4).execute(self.samples)
+
+        self.assertEqual(len(serial_results), len(self.samples))
+        self.assertListEqual(parallel_results, serial_results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import numpy as np
+from value_assessment.core.toolbox.period_index import PeriodIndex, QUARTERLY
+from value_assessment.core.toolbox.IRR import IRR
+from value_assessment.core.opex import Opex
+from value_assessment.core.capex import Capex
+from value_assessment.core.value_blocks.manufacturer_VB import ManufacturerVB
+from value_assessment.benchmarks.generators import YEAR_START, generate_opex_inputs, generate_capex_inputs, \
+    generate_manufacturer_inputs
+
+
+class PeriodIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.nb_years = 20
+        self.period_index = PeriodIndex(
+            YEAR_START, YEAR_START + self.nb_years - 1, QUARTERLY)
+
+    def sum_by_year(self, values):
+        return np.asarray(values).reshape(self.nb_years, QUARTERLY).sum(axis=1)
+
+    def test_01_period_index(self):
+        period_index = PeriodIndex(2020, 2022, QUARTERLY)
+
+        self.assertEqual(len(period_index), 12)
+        self.assertListEqual(period_index.times[:5].tolist(), [2020., 2020.25, 2020.5, 2020.75, 2021.])
+        self.assertListEqual(period_index.periods_since(2021)[:6].tolist(), [-4, -3, -2, -1, 0, 1])
+        self.assertListEqual(period_index.years_since(2021)[3:6].tolist(), [-1, 0, 0])
+        self.assertEqual(period_index.nb_periods_in(2), 8)
+        self.assertAlmostEqual(period_index.yearly_rate(period_index.periodic_rate(0.07)), 0.07)
+
+        yearly_index = PeriodIndex(2020, 2022)
+        self.assertListEqual(yearly_index.times.tolist(), [2020, 2021, 2022])
+        self.assertEqual(yearly_index.periodic_rate(0.07), 0.07)
+
+        with self.assertRaises(Exception):
+            PeriodIndex(2020, 2022, 2.5)
+
+    def test_02_capex_quarterly(self):
+        model_args, compute_args = generate_capex_inputs(self.nb_years, 3, seed=1)
+        yearly_capex = Capex(**model_args).compute_capex_by_category(**compute_args)
+        quarterly_capex = Capex(**dict(model_args, periods_per_year=QUARTERLY)).compute_capex_by_category(
+            **compute_args)
+
+        self.assertEqual(len(quarterly_capex), self.nb_years * QUARTERLY)
+        for column in yearly_capex.columns:
+            if column != 'years':
+                np.testing.assert_allclose(self.sum_by_year(quarterly_capex[column]), yearly_capex[column],
+                                           rtol=1e-10, atol=1e-6)
+
+    def test_03_opex_quarterly(self):
+        model_args, compute_args = generate_opex_inputs(self.nb_years, 3, 2, 40, seed=1)
+        # quantities of the quarters are whole numbers
+        compute_args['sales']['quantity'] *= QUARTERLY
+        yearly_opex = Opex(**model_args).compute_opex_by_category(**compute_args)
+
+        quarterly_args = dict(compute_args, sales=self.period_index.split_dataframe(
+            compute_args['sales'], ['quantity']))
+        quarterly_opex = Opex(**dict(model_args, periods_per_year=QUARTERLY)).compute_opex_by_category(
+            **quarterly_args)
+
+        self.assertEqual(len(quarterly_opex), self.nb_years * QUARTERLY)
+        # opex without learning curve are the ones of the year, the learning curve applies to the total quantity
+        np.testing.assert_allclose(quarterly_opex['opex_comp0'], self.period_index.expand(yearly_opex['opex_comp0']))
+        np.testing.assert_allclose(self.sum_by_year(quarterly_opex['opex_wo_escalation'] * quarterly_opex['quantity']),
+                                   yearly_opex['opex_wo_escalation'] * yearly_opex['quantity'], rtol=1e-10)
+
+    def test_04_manufacturer_quarterly(self):
+        model_args, data_args = generate_manufacturer_inputs(self.nb_years, 3, 2, 40, seed=1)
+        data_args['sales_qty_product']['quantity'] *= QUARTERLY
+        # profitable product to have an IRR
+        data_args['price_product']['sale_price'] *= 5.
+        yearly_vb = ManufacturerVB(**model_args)
+        yearly_vb.configure_data(**data_args)
+        yearly_vb.compute_cashflow()
+
+        capex_columns = [column for column in data_args['capex_product'].columns if column != 'years']
+        quarterly_data_args = {
+            'sales_qty_product': self.period_index.split_dataframe(data_args['sales_qty_product'], ['quantity']),
+            'opex_product': self.period_index.split_dataframe(data_args['opex_product'], []),
+            'capex_product': self.period_index.split_dataframe(data_args['capex_product'], capex_columns),
+            'price_product': self.period_index.split_dataframe(data_args['price_product'], [])}
+        quarterly_vb = ManufacturerVB(**dict(model_args, periods_per_year=QUARTERLY))
+        quarterly_vb.configure_data(**quarterly_data_args)
+        quarterly_vb.compute_cashflow()
+
+        self.assertEqual(len(quarterly_vb.ledger['cash_flow']), self.nb_years * QUARTERLY)
+        self.assertAlmostEqual(quarterly_vb.cf_infos['total_free_cash_flow'],
+                               yearly_vb.cf_infos['total_free_cash_flow'], delta=1e-3)
+        self.assertEqual(quarterly_vb.cf_infos['year_break_even_cashflow'],
+                         yearly_vb.cf_infos['year_break_even_cashflow'])
+        # cash flows split evenly over the quarters have the same yearly IRR
+        self.assertAlmostEqual(quarterly_vb.cf_infos['irr'], yearly_vb.cf_infos['irr'], delta=1e-8)
+
+    def test_05_irr_without_root(self):
+        # quarterly cash flow of a product that never pays back, no IRR without the polynomial roots
+        cashflow = np.concatenate([-np.ones(40) * 100., np.ones(200) * 10., -np.ones(40) * 50.])
+        irr = IRR(cashflow)
+        x_grid = np.linspace(1., 0., IRR.GRID_SIZE + 1)
+        npv_grid = np.dot(np.vander(x_grid, len(cashflow), increasing=True), cashflow)
+
+        self.assertTrue(irr.has_no_root(cashflow, x_grid, npv_grid))
+        self.assertEqual(irr.compute_irr(), 'NA')
+        self.assertEqual(IRR(cashflow, method=IRR.ROOTS).compute_irr(), 'NA')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import pandas as pd
+from value_assessment.core.toolbox.result_cache import ResultCache, hash_inputs
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inputs_dict = {
+            'capex_multiplier': 100.,
+            'capex_input_values': pd.DataFrame({'Distribution Category': ['Facility'],
+                                                'Capex value': [400000.]}),
+            'learning_curve_product_dict': {'learning_curve_coefficient': [0.9], 'until_product_rank': [100]},
+        }
+
+    def test_01_hash_inputs(self):
+        same_inputs_dict = {key: self.inputs_dict[key] for key in reversed(list(self.inputs_dict))}
+        self.assertEqual(hash_inputs(self.inputs_dict), hash_inputs(same_inputs_dict))
+
+        modified_inputs_dict = dict(self.inputs_dict)
+        modified_inputs_dict['capex_input_values'] = self.inputs_dict['capex_input_values'].copy()
+        modified_inputs_dict['capex_input_values'].loc[0, 'Capex value'] += 1.
+        self.assertNotEqual(hash_inputs(self.inputs_dict), hash_inputs(modified_inputs_dict))
+
+    def test_02_lru(self):
+        result_cache = ResultCache(maxsize=2)
+        result_cache.put('key1', {'capex': self.inputs_dict['capex_input_values']})
+        result_cache.put('key2', {})
+
+        # cached values are not modified through returned results
+        result = result_cache.get('key1')
+        result['capex'].loc[0, 'Capex value'] = 0.
+        self.assertEqual(result_cache.get('key1')['capex'].loc[0, 'Capex value'], 400000.)
+
+        # key2 is the least recently used one
+        result_cache.put('key3', {})
+        self.assertIsNone(result_cache.get('key2'))
+        self.assertEqual(result_cache.cache_info(), (2, 1, 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from value_assessment.sos_wrapping.post_processing import series_encoding
+from value_assessment.sos_wrapping.post_processing.series_encoding import series_values, encode_typed_array, \
+    decode_typed_array, encode_typed_arrays, decode_typed_arrays
+from value_assessment.sos_wrapping.post_processing.figure_cache import figure_to_json, figure_from_json
+
+
+class SeriesEncodingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cf_df = pd.DataFrame({'years': np.arange(2020, 2051),
+                                   'cash_flow': np.linspace(-1.e6, 2.e6, 31)})
+
+    def tearDown(self):
+        series_encoding.NUMPY_SERIES = True
+
+    def test_01_series_values(self):
+        years = series_values(self.cf_df['years'])
+        self.assertIsInstance(years, np.ndarray)
+        np.testing.assert_array_equal(years, self.cf_df['years'].values)
+
+        series_encoding.NUMPY_SERIES = False
+        self.assertEqual(series_values(self.cf_df['years']),
+                         self.cf_df['years'].values.tolist())
+
+    def test_02_typed_arrays(self):
+        for values in [self.cf_df['cash_flow'].values, self.cf_df['years'].values,
+                       np.arange(6, dtype=np.int16).reshape(2, 3), np.array([3.e9, 1.], dtype=np.float32)]:
+            typed_array = encode_typed_array(values)
+            decoded_values = decode_typed_array(typed_array)
+            np.testing.assert_array_equal(decoded_values, values)
+            self.assertEqual(decoded_values.shape, values.shape)
+
+        # 64 bits integers are stored on 32 bits if they fit, as floats otherwise
+        self.assertEqual(encode_typed_array(
+            np.array([1, 2], dtype=np.int64))['dtype'], 'i4')
+        self.assertEqual(encode_typed_array(
+            np.array([1, 2 ** 40], dtype=np.int64))['dtype'], 'f8')
+        with self.assertRaises(Exception):
+            encode_typed_array(np.array(['a', 'b']))
+
+    def test_03_payload(self):
+        payload = {'data': [{'x': self.cf_df['years'].values, 'y': self.cf_df['cash_flow'].values,
+                             'text': np.array(['a'] * 31), 'name': 'Free Cashflow'}],
+                   'layout': {'width': np.int64(800)}}
+        encoded_payload = json.loads(json.dumps(
+            encode_typed_arrays(payload, min_size=10)))
+        self.assertIn('bdata', encoded_payload['data'][0]['y'])
+        self.assertEqual(encoded_payload['data'][0]['text'], ['a'] * 31)
+        self.assertEqual(encoded_payload['layout']['width'], 800)
+
+        decoded_payload = decode_typed_arrays(encoded_payload)
+        np.testing.assert_array_equal(
+            decoded_payload['data'][0]['y'], self.cf_df['cash_flow'].values)
+
+        # small arrays stay lists
+        self.assertEqual(encode_typed_arrays(payload, min_size=100)['data'][0]['x'],
+                         self.cf_df['years'].values.tolist())
+
+    def test_04_figure_json(self):
+        fig = go.Figure(go.Bar(x=series_values(self.cf_df['years']), y=series_values(self.cf_df['cash_flow']),
+                               name='Free Cashflow'))
+        fig_json = figure_to_json(fig, min_size=10)
+
+        # with numpy series, the figure handed over keeps the typed arrays in its JSON
+        cached_fig = figure_from_json(fig_json)
+        self.assertIn('bdata', json.loads(cached_fig.to_json())['data'][0]['y'])
+        np.testing.assert_array_equal(
+            decode_typed_array(cached_fig.to_plotly_json()['data'][0]['y']), self.cf_df['cash_flow'].values)
+        self.assertEqual(cached_fig.data[0].name, 'Free Cashflow')
+
+        series_encoding.NUMPY_SERIES = False
+        decoded_fig = figure_from_json(fig_json)
+        np.testing.assert_array_equal(
+            np.asarray(decoded_fig.data[0].y), self.cf_df['cash_flow'].values)
+
+    def test_05_instanciated_series(self):
+        # two axes charts built on numpy series are converted and serialized by the pinned plotly 5.3
+        from plotly.utils import PlotlyJSONEncoder
+        from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, \
+            TwoAxesInstanciatedChart
+
+        chart = TwoAxesInstanciatedChart('Years', 'Cashflow (€)', chart_name='Free Cashflow')
+        chart.series.append(InstanciatedSeries(series_values(self.cf_df['years']),
+                                               series_values(self.cf_df['cash_flow']), 'Free Cashflow', 'bar'))
+        fig = chart.to_plotly()
+
+        fig_dict = json.loads(json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder))
+        self.assertEqual(fig_dict['data'][0]['x'], self.cf_df['years'].tolist())
+        self.assertEqual(fig_dict['data'][0]['y'], self.cf_df['cash_flow'].tolist())
+
+        fig_json = figure_to_json(fig, min_size=10)
+        self.assertIn('bdata', json.loads(fig_json)['data'][0]['y'])
+        np.testing.assert_array_equal(
+            decode_typed_arrays(json.loads(fig_json))['data'][0]['y'], self.cf_df['cash_flow'].values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
+'''
+
+import unittest
+import tempfile
+from os.path import exists
+import numpy as np
+import pandas as pd
+from value_assessment.core.toolbox.stage_profiler import StageProfiler, REPORT_COLUMNS
+
+
+class StageProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = StageProfiler()
+        self.dataframe_init = pd.DataFrame.__init__
+
+    def tearDown(self):
+        self.profiler.disable()
+        pd.DataFrame.__init__ = self.dataframe_init
+
+    def test_01_disabled(self):
+        with self.profiler.profile('Study.Product1.OpEx'):
+            with self.profiler.stage('Study.Product1.OpEx', 'model compute'):
+                pd.DataFrame({'years': np.arange(2020, 2051)})
+
+        report = self.profiler.get_report()
+        self.assertEqual(list(report.columns), REPORT_COLUMNS)
+        self.assertEqual(len(report), 0)
+
+    def test_02_stages(self):
+        self.profiler.enable(trace_memory=True, count_dataframes=True)
+        for _ in range(2):
+            with self.profiler.stage('Study.Product1.OpEx', 'input fetch'):
+                pass
+            with self.profiler.stage('Study.Product1.OpEx', 'model compute'):
+                pd.DataFrame({'values': np.ones(100000)})
+                pd.DataFrame({'years': np.arange(2020, 2051)})
+        with self.profiler.stage('Study.Product2.OpEx', 'model compute'):
+            pass
+        self.profiler.disable()
+        self.assertIs(pd.DataFrame.__init__, self.dataframe_init)
+
+        report = self.profiler.get_report().set_index(['discipline', 'stage'])
+        self.assertEqual(len(report), 3)
+        compute = report.loc[('Study.Product1.OpEx', 'model compute')]
+        self.assertEqual(compute['calls'], 2)
+        self.assertEqual(compute['dataframes'], 4)
+        self.assertGreaterEqual(compute['peak_memory'], 800000)
+        self.assertGreater(compute['wall_time'], 0.)
+        self.assertEqual(
+            report.loc[('Study.Product1.OpEx', 'input fetch')]['dataframes'], 0)
+
+        self.profiler.reset()
+        self.assertEqual(len(self.profiler.get_report()), 0)
+
+    def test_03_cprofile_dump(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.profiler.enable(cprofile_dir=tmp_dir)
+            with self.profiler.profile('Study.Product1.OpEx'):
+                np.cumsum(np.ones(1000))
+            self.assertTrue(exists(self.profiler.get_cprofile_path('Study.Product1.OpEx')))
+
+
+if __name__ == "__main__":
+    unittest.main()